@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import RoomNight, RoomType
 
-# Register your models here.
+
+@admin.register(RoomType)
+class RoomTypeAdmin(admin.ModelAdmin):
+    list_display = ['hotel', 'name', 'max_guests', 'total_rooms']
+    list_filter = ['max_guests']
+    search_fields = ['hotel__name', 'name']
+    autocomplete_fields = ['hotel']
+
+
+@admin.register(RoomNight)
+class RoomNightAdmin(admin.ModelAdmin):
+    list_display = ['room_type', 'date', 'booked', 'total']
+    list_filter = ['date']
+    search_fields = ['room_type__hotel__name', 'room_type__name']
+    date_hierarchy = 'date'
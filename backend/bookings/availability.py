@@ -0,0 +1,52 @@
+# backend/bookings/availability.py
+"""Set-based availability queries over the per-night room inventory.
+
+A room type is free for a stay when none of the nights in
+``[check_in, check_out)`` is sold out. Missing ``RoomNight`` rows count as
+fully free, so the check is a single anti-join against the (small) set of
+sold-out nights rather than a walk over bookings. Hotels with no room types
+configured have no inventory to check and are treated as available.
+"""
+from datetime import date, timedelta
+
+from django.db.models import Exists, F, OuterRef, Q
+
+from .models import RoomNight, RoomType
+
+MAX_STAY_NIGHTS = 30
+
+
+def parse_stay(check_in, check_out, guests='2'):
+    """Parse query-string values into ``(check_in, check_out, guests)``; ``None`` if no dates given"""
+    if not check_in or not check_out:
+        return None
+    check_in, check_out = date.fromisoformat(check_in), date.fromisoformat(check_out)
+    if not check_in < check_out <= check_in + timedelta(days=MAX_STAY_NIGHTS):
+        raise ValueError(f'check_out must be 1 to {MAX_STAY_NIGHTS} nights after check_in')
+    guests = int(guests or 2)
+    if guests < 1:
+        raise ValueError('guests must be at least 1')
+    return check_in, check_out, guests
+
+
+def stay_nights(check_in, check_out):
+    return [check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)]
+
+
+def sold_out_nights(check_in, check_out):
+    return RoomNight.objects.filter(
+        room_type=OuterRef('pk'), date__gte=check_in, date__lt=check_out, booked__gte=F('total')
+    )
+
+
+def available_room_types(check_in, check_out, guests):
+    return RoomType.objects.filter(max_guests__gte=guests, total_rooms__gt=0).filter(
+        ~Exists(sold_out_nights(check_in, check_out))
+    )
+
+
+def filter_available(hotels, check_in, check_out, guests):
+    """Hotels with a room type free for every night of the stay, or with no room types set up yet"""
+    rooms = available_room_types(check_in, check_out, guests).filter(hotel=OuterRef('pk'))
+    unmanaged = ~Exists(RoomType.objects.filter(hotel=OuterRef('pk')))
+    return hotels.filter(Q(Exists(rooms)) | Q(unmanaged))
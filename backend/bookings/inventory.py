@@ -0,0 +1,32 @@
+# backend/bookings/inventory.py
+"""Transactional room inventory changes.
+
+Reservations use a conditional ``UPDATE ... SET booked = booked + 1 WHERE
+booked < total``. The database re-checks the condition under the row lock,
+so two requests racing for the last room cannot both succeed; callers run
+``reserve`` inside ``transaction.atomic`` so a stay that is short on any
+night rolls back the nights it already took.
+"""
+from django.db.models import F
+
+from .availability import stay_nights
+from .models import RoomNight
+
+
+class SoldOut(Exception):
+    pass
+
+
+def reserve(room_type, check_in, check_out):
+    nights = stay_nights(check_in, check_out)
+    # Materialize missing nights at full capacity; existing rows are left alone
+    RoomNight.objects.bulk_create(
+        [RoomNight(room_type=room_type, date=night, total=room_type.total_rooms) for night in nights],
+        ignore_conflicts=True,
+    )
+    taken = RoomNight.objects.filter(
+        room_type=room_type, date__gte=check_in, date__lt=check_out, booked__lt=F('total')
+    ).update(booked=F('booked') + 1)
+    if taken != len(nights):
+        raise SoldOut(f'{room_type} is sold out for part of {check_in} - {check_out}')
+
@@ -0,0 +1,72 @@
+# backend/bookings/management/commands/bench_availability.py
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bookings.availability import filter_available, stay_nights
+from bookings.models import RoomNight, RoomType
+from hotels.management.commands._bench import rolled_back, seed_hotels, timed
+from hotels.models import Hotel
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the set-based availability search against a per-room-type loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=5000)
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--occupancy', type=float, default=0.75, help='Average share of rooms booked per night')
+        parser.add_argument('--runs', type=int, default=10)
+
+    def seed_inventory(self, days, occupancy, rng):
+        room_types = [
+            RoomType(hotel_id=hotel_id, name=name, max_guests=guests, total_rooms=rng.randint(2, 40))
+            for hotel_id in Hotel.objects.values_list('id', flat=True)
+            for name, guests in (('Standard', 2), ('Family', 4), ('Suite', 3))
+        ]
+        RoomType.objects.bulk_create(room_types, batch_size=2000)
+        today = timezone.localdate()
+        nights = []
+        for room_type in RoomType.objects.all().iterator():
+            for offset in range(days):
+                booked = min(room_type.total_rooms, int(rng.gauss(occupancy, 0.2) * room_type.total_rooms))
+                if booked > 0:
+                    nights.append(RoomNight(
+                        room_type=room_type, date=today + timedelta(days=offset),
+                        total=room_type.total_rooms, booked=booked,
+                    ))
+        RoomNight.objects.bulk_create(nights, batch_size=5000)
+        return len(nights)
+
+    def naive(self, check_in, check_out, guests):
+        # What a loop over bookings looks like: one inventory query per room type
+        available = set()
+        nights = stay_nights(check_in, check_out)
+        for room_type in RoomType.objects.filter(max_guests__gte=guests):
+            booked = dict(RoomNight.objects.filter(
+                room_type=room_type, date__gte=check_in, date__lt=check_out
+            ).values_list('date', 'booked'))
+            if all(booked.get(night, 0) < room_type.total_rooms for night in nights):
+                available.add(room_type.hotel_id)
+        return available
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        with rolled_back():
+            seed_hotels(options['hotels'])
+            rows = self.seed_inventory(options['days'], options['occupancy'], rng)
+            self.stdout.write(f"{options['hotels']} hotels, {RoomType.objects.count()} room types, {rows} inventory rows")
+            today = timezone.localdate()
+            for nights, guests in ((1, 2), (3, 2), (7, 4)):
+                check_in = today + timedelta(days=rng.randint(0, options['days'] - nights))
+                check_out = check_in + timedelta(days=nights)
+                hotels = filter_available(Hotel.objects.filter(is_available=True), check_in, check_out, guests)
+                set_time, set_ids = timed(lambda: set(hotels.values_list('id', flat=True)), options['runs'])
+                naive_time, naive_ids = timed(lambda: self.naive(check_in, check_out, guests), 1)
+                self.stdout.write(
+                    f'{nights} night(s), {guests} guests: {len(set_ids):>6} hotels  '
+                    f'set-based {set_time * 1000:8.2f} ms  loop {naive_time * 1000:9.2f} ms  '
+                    f'{"same results" if set_ids == naive_ids else "RESULTS DIFFER"}'
+                )
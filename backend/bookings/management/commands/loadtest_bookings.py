@@ -0,0 +1,88 @@
+# backend/bookings/management/commands/loadtest_bookings.py
+import logging
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import RoomNight, RoomType
+from hotels.models import Hotel
+from users.models import Booking
+
+
+class Command(BaseCommand):
+    help = 'Fire parallel booking requests at a few rooms and verify nothing is oversold'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--rooms', type=int, default=5)
+        parser.add_argument('--nights', type=int, default=3)
+        parser.add_argument('--retry-share', type=float, default=0.25,
+                            help='Share of requests that replay an earlier idempotency key')
+
+    def handle(self, *args, **options):
+        # Worker threads use their own connections, so the data has to be committed
+        # (and is removed again at the end) rather than wrapped in a transaction.
+        run = uuid.uuid4().hex[:8]
+        hotel = Hotel.objects.create(
+            name=f'Load test {run}', description='', country='Turkey', city='Istanbul', address='',
+            latitude=Decimal('41'), longitude=Decimal('29'), base_price=Decimal('100.00'),
+        )
+        room_type = RoomType.objects.create(hotel=hotel, name='Standard', total_rooms=options['rooms'])
+        users = [
+            get_user_model().objects.create_user(f'load-{run}-{i}@example.com', 'x', country='TR', city='IST')
+            for i in range(options['workers'])
+        ]
+        check_in = timezone.localdate() + timedelta(days=30)
+        payload = {
+            'room_type_id': room_type.id,
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=options['nights'])).isoformat(),
+            'guests': 2,
+        }
+        fresh = options['requests'] - int(options['requests'] * options['retry_share'])
+
+        def fire(index):
+            # Requests past ``fresh`` replay the key (and user) of an earlier request
+            key_index = index if index < fresh else index - fresh
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(users[key_index % len(users)])
+            response = client.post(
+                reverse('create_booking'), payload, content_type='application/json',
+                HTTP_IDEMPOTENCY_KEY=f'{run}-{key_index}',
+            )
+            connection.close()
+            return response.status_code
+
+        # Hundreds of expected 409s would otherwise drown the report
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                statuses = Counter(pool.map(fire, range(options['requests'])))
+            elapsed = time.perf_counter() - start
+
+            nights = list(RoomNight.objects.filter(room_type=room_type).values_list('booked', 'total'))
+            bookings = Booking.objects.filter(room_type=room_type).count()
+            oversold = sum(max(booked - total, 0) for booked, total in nights) + max(bookings - options['rooms'], 0)
+            self.stdout.write(f"{options['requests']} requests, {options['workers']} workers in {elapsed:.2f}s "
+                              f"({options['requests'] / elapsed:.1f} req/s)")
+            self.stdout.write(f'Responses: {dict(sorted(statuses.items()))}')
+            self.stdout.write(f'Bookings created: {bookings} for {options["rooms"]} rooms; nights booked/total: {nights}')
+            style = self.style.SUCCESS if oversold == 0 else self.style.ERROR
+            self.stdout.write(style(f'Oversold: {oversold}'))
+        finally:
+            Booking.objects.filter(room_type=room_type).delete()
+            hotel.delete()
+            for user in users:
+                user.delete()
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('hotels', '0004_hotel_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('max_guests', models.PositiveIntegerField(default=2)),
+                ('total_rooms', models.PositiveIntegerField(default=1)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_types', to='hotels.hotel')),
+            ],
+            options={
+                'unique_together': {('hotel', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.PositiveIntegerField()),
+                ('booked', models.PositiveIntegerField(default=0)),
+                ('room_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='bookings.roomtype')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('booked__gte', models.F('total'))), fields=['room_type', 'date'], name='roomnight_sold_out_idx')],
+                'unique_together': {('room_type', 'date')},
+            },
+        ),
+    ]
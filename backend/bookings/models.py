@@ -1,3 +1,49 @@
+# backend/bookings/models.py
 from django.db import models
+from django.utils import timezone
+from hotels.models import Hotel
 
-# Create your models here.
+
+class RoomType(models.Model):
+    hotel = models.ForeignKey(Hotel, related_name='room_types', on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+    max_guests = models.PositiveIntegerField(default=2)
+    total_rooms = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        unique_together = ['hotel', 'name']
+    
+    def __str__(self):
+        return f"{self.hotel.name} - {self.name}"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Nights already materialized keep their own total; resize the future ones
+        RoomNight.objects.filter(room_type=self, date__gte=timezone.localdate()).exclude(
+            total=self.total_rooms
+        ).update(total=self.total_rooms)
+
+
+class RoomNight(models.Model):
+    """Inventory for one room type on one night.
+
+    Rows are created on first booking; a missing row means every room of the
+    type is still free that night.
+    """
+    room_type = models.ForeignKey(RoomType, related_name='nights', on_delete=models.CASCADE)
+    date = models.DateField()
+    total = models.PositiveIntegerField()
+    booked = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['room_type', 'date']
+        indexes = [
+            # Availability only ever asks "is any night in the range sold out?"
+            models.Index(
+                fields=['room_type', 'date'], name='roomnight_sold_out_idx',
+                condition=models.Q(booked__gte=models.F('total')),
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.room_type} {self.date} ({self.booked}/{self.total})"
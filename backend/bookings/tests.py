@@ -1,3 +1,119 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.urls import reverse
+
+from hotels.models import Hotel
+from users.models import Booking, User
+from hotels.tests import make_hotel
+from .availability import filter_available, parse_stay
+from .models import RoomNight, RoomType
+
+
+class AvailabilitySearchTests(TestCase):
+    def setUp(self):
+        self.check_in = date(2030, 6, 1)
+        self.full = make_hotel(name='Full House')
+        self.free = make_hotel(name='Free Inn')
+        self.no_rooms = make_hotel(name='No Rooms')
+        self.small = make_hotel(name='Small Place')
+        full_room = RoomType.objects.create(hotel=self.full, name='Standard', total_rooms=2)
+        RoomType.objects.create(hotel=self.free, name='Standard', total_rooms=1)
+        RoomType.objects.create(hotel=self.small, name='Single', max_guests=1)
+        # Sold out on the second night only
+        RoomNight.objects.create(room_type=full_room, date=self.check_in + timedelta(days=1), total=2, booked=2)
+        RoomNight.objects.create(room_type=full_room, date=self.check_in, total=2, booked=1)
+
+    def available(self, nights, guests=2, start=0):
+        check_in = self.check_in + timedelta(days=start)
+        hotels = filter_available(Hotel.objects.all(), check_in, check_in + timedelta(days=nights), guests)
+        return set(hotels.values_list('name', flat=True))
+
+    def test_one_sold_out_night_blocks_the_whole_stay(self):
+        self.assertEqual(self.available(1), {'Full House', 'Free Inn', 'No Rooms'})
+        self.assertEqual(self.available(3), {'Free Inn', 'No Rooms'})
+        self.assertEqual(self.available(1, start=2), {'Full House', 'Free Inn', 'No Rooms'})
+
+    def test_guest_count_filters_room_types(self):
+        self.assertEqual(self.available(1, guests=1), {'Full House', 'Free Inn', 'Small Place', 'No Rooms'})
+        self.assertEqual(self.available(1, guests=3), {'No Rooms'})
+
+    def test_hotels_without_inventory_stay_listed(self):
+        # Nothing backfills room types, so unconfigured hotels must not vanish from dated searches
+        self.assertIn('No Rooms', self.available(7, guests=4))
+        RoomType.objects.create(hotel=self.no_rooms, name='Single', max_guests=1)
+        self.assertNotIn('No Rooms', self.available(7, guests=4))
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.available(7)
+
+    def test_search_endpoint_uses_the_stay(self):
+        url = reverse('search_hotels')
+        params = {'check_in': '2030-06-01', 'check_out': '2030-06-04', 'guests': '2'}
+        self.assertEqual({h['name'] for h in self.client.get(url, params).json()}, {'Free Inn', 'No Rooms'})
+        self.assertEqual(len(self.client.get(url, {'check_in': '', 'check_out': ''}).json()), 4)
+        params['check_out'] = '2030-05-30'
+        self.assertEqual(self.client.get(url, params).status_code, 400)
+
+    def test_parse_stay(self):
+        self.assertIsNone(parse_stay('', '2030-01-02'))
+        self.assertEqual(parse_stay('2030-01-01', '2030-01-02', ''), (date(2030, 1, 1), date(2030, 1, 2), 2))
+        with self.assertRaises(ValueError):
+            parse_stay('2030-01-01', '2030-03-01')
+
+
+class CreateBookingTests(TestCase):
+    def setUp(self):
+        self.hotel = make_hotel(base_price=Decimal('100.00'), special_discount=10)
+        self.room = RoomType.objects.create(hotel=self.hotel, name='Standard', total_rooms=1)
+        self.user = User.objects.create_user('guest@example.com', 'x', country='Turkey', city='Istanbul')
+        self.client.force_login(self.user)
+        self.payload = {'room_type_id': self.room.id, 'check_in': '2030-06-01', 'check_out': '2030-06-03', 'guests': 2}
+
+    def book(self, key=None, **overrides):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(
+            reverse('create_booking'), {**self.payload, **overrides}, content_type='application/json', **headers
+        )
+
+    def booked(self):
+        return list(RoomNight.objects.order_by('date').values_list('booked', flat=True))
+
+    def test_last_room_cannot_be_sold_twice(self):
+        response = self.book()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['total_price'], 180.0)
+        self.assertEqual(self.book().status_code, 409)
+        self.assertEqual(self.booked(), [1, 1])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_partial_sell_out_rolls_back_taken_nights(self):
+        RoomNight.objects.create(room_type=self.room, date=date(2030, 6, 2), total=1, booked=1)
+        self.assertEqual(self.book().status_code, 409)
+        self.assertFalse(RoomNight.objects.filter(date=date(2030, 6, 1), booked__gt=0).exists())
+        self.assertEqual(self.booked(), [1])
+
+    def test_idempotent_retry_returns_the_original_booking(self):
+        self.room.total_rooms = 5
+        self.room.save()
+        first = self.book(key='abc')
+        retry = self.book(key='abc')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json()['id'], first.json()['id'])
+        self.assertEqual(self.booked(), [1, 1])
+        self.assertEqual(self.book(key='abc', guests=1).status_code, 422)
+
+    def test_malformed_idempotency_keys_are_rejected(self):
+        self.assertEqual(self.book(idempotency_key=12345).status_code, 400)
+        self.assertEqual(self.book(idempotency_key=['abc']).status_code, 400)
+        self.assertEqual(self.book(key='k' * 65).status_code, 400)
+        self.assertEqual(Booking.objects.count(), 0)
 
-# Create your tests here.
+    def test_requires_login_and_valid_input(self):
+        self.assertEqual(self.book(check_out='2030-05-01').status_code, 400)
+        self.assertEqual(self.book(guests=3).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.book().status_code, 401)
@@ -1,3 +1,130 @@
-from django.shortcuts import render
+# backend/bookings/views.py
+from decimal import Decimal
 
-# Create your views here.
+from django.db import IntegrityError, transaction
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework import status
+
+from hotels import pricing
+from users.models import Booking
+from .availability import parse_stay
+from .inventory import SoldOut, reserve
+from .models import RoomType
+
+
+def _booking_data(booking):
+    return {
+        'id': booking.id,
+        'hotel_id': booking.hotel_id,
+        'room_type_id': booking.room_type_id,
+        'check_in': booking.check_in.isoformat(),
+        'check_out': booking.check_out.isoformat(),
+        'guests': booking.guests,
+        'base_price': float(booking.base_price),
+        'discount_applied': float(booking.discount_applied),
+        'total_price': float(booking.total_price),
+        'status': booking.status,
+    }
+
+
+def _same_request(booking, room_type_id, check_in, check_out, guests):
+    return (booking.room_type_id, booking.check_in, booking.check_out, booking.guests) == (
+        room_type_id, check_in, check_out, guests
+    )
+
+
+def _replay(booking, room_type_id, check_in, check_out, guests):
+    """Answer a retried request with the booking its key already created"""
+    if not _same_request(booking, room_type_id, check_in, check_out, guests):
+        return Response(
+            {'error': 'Bu işlem anahtarı farklı bir rezervasyon için kullanıldı'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    return Response(_booking_data(booking), status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def create_booking(request):
+    """Create a new booking, taking one room for every night of the stay"""
+    try:
+        if not request.user.is_authenticated:
+            return Response({'error': 'Rezervasyon için giriş yapmalısınız'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        data = request.data
+        try:
+            room_type_id = int(data.get('room_type_id'))
+            stay = parse_stay(data.get('check_in'), data.get('check_out'), str(data.get('guests') or ''))
+        except (TypeError, ValueError):
+            stay = None
+        if stay is None:
+            return Response(
+                {'error': 'room_type_id, check_in, check_out ve guests geçerli olmalıdır'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        check_in, check_out, guests = stay
+        
+        key = request.headers.get('Idempotency-Key') or data.get('idempotency_key') or None
+        if key is not None and (not isinstance(key, str) or len(key) > 64):
+            return Response(
+                {'error': 'İşlem anahtarı en fazla 64 karakterlik bir metin olmalıdır'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if key:
+            existing = Booking.objects.filter(user=request.user, idempotency_key=key).first()
+            if existing:
+                return _replay(existing, room_type_id, check_in, check_out, guests)
+        
+        room_type = RoomType.objects.select_related('hotel').filter(
+            id=room_type_id, hotel__is_available=True
+        ).first()
+        if room_type is None:
+            return Response({'error': 'Oda tipi bulunamadı'}, status=status.HTTP_404_NOT_FOUND)
+        if guests > room_type.max_guests:
+            return Response({'error': 'Misafir sayısı oda kapasitesini aşıyor'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        hotel = room_type.hotel
+        stay = pricing.price_stay(pricing.quote_hotel(hotel), check_in, check_out)
+        base_price = pricing.from_cents(stay.total.base)
+        discount = Decimal(hotel.special_discount)
+        total_price = pricing.from_cents(stay.total.discounted)
+        
+        try:
+            with transaction.atomic():
+                reserve(room_type, check_in, check_out)
+                booking = Booking.objects.create(
+                    user=request.user, hotel=hotel, room_type=room_type,
+                    check_in=check_in, check_out=check_out, guests=guests,
+                    base_price=base_price, discount_applied=discount, total_price=total_price,
+                    status='confirmed', idempotency_key=key,
+                )
+        except SoldOut:
+            return Response({'error': 'Seçilen tarihlerde müsait oda yok'}, status=status.HTTP_409_CONFLICT)
+        except IntegrityError:
+            # A concurrent retry with the same key won the race; its inventory stands
+            existing = Booking.objects.filter(user=request.user, idempotency_key=key).first() if key else None
+            if existing is None:
+                raise
+            return _replay(existing, room_type_id, check_in, check_out, guests)
+        
+        return Response(_booking_data(booking), status=status.HTTP_201_CREATED)
+    except Exception as e:
+        return Response(
+            {'error': 'Rezervasyon oluşturulurken hata oluştu'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def user_bookings(request):
+    """Get user's bookings"""
+    try:
+        # For now, return empty list - we'll implement this later
+        return Response([])
+    except Exception as e:
+        return Response(
+            {'error': 'Rezervasyonlar yüklenirken hata oluştu'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
@@ -1,7 +1,14 @@
 # backend/hotels/admin.py - Enhanced version with inline amenities
 from django.contrib import admin
+from django.db import transaction
+from . import detail_cache
 from .models import Hotel, Amenity, HotelAmenity, HotelImage
 
+
+def refresh_detail_cache(hotel_id):
+    # After commit, so other processes can never read the new version before the payload
+    transaction.on_commit(lambda: detail_cache.refresh(hotel_id))
+
 # Inline for adding amenities directly in hotel edit page
 class HotelAmenityInline(admin.TabularInline):
     model = HotelAmenity
@@ -20,7 +27,8 @@ class HotelAdmin(admin.ModelAdmin):
     list_filter = ['country', 'city', 'is_available', 'is_flagged', 'rating']
     search_fields = ['name', 'city', 'country', 'description']
     list_editable = ['is_available', 'is_flagged']
-    ordering = ['-points', '-rating']
+    ordering = ['-rank_score', 'id']
+    readonly_fields = ['rank_score']
     
     # Add inlines to edit amenities and images directly from hotel page
     inlines = [HotelAmenityInline, HotelImageInline]
@@ -36,12 +44,17 @@ class HotelAdmin(admin.ModelAdmin):
             'fields': ('base_price', 'member_price', 'special_discount')
         }),
         ('Ratings', {
-            'fields': ('points', 'rating', 'total_reviews')
+            'fields': ('points', 'rating', 'total_reviews', 'rank_score')
         }),
         ('Status', {
             'fields': ('is_available', 'is_flagged')
         }),
     )
+    
+    def save_related(self, request, form, formsets, change):
+        """Write the hotel and its amenity and image inlines through to the detail cache"""
+        super().save_related(request, form, formsets, change)
+        refresh_detail_cache(form.instance.id)
 
 @admin.register(Amenity)
 class AmenityAdmin(admin.ModelAdmin):
@@ -53,10 +66,18 @@ class HotelAmenityAdmin(admin.ModelAdmin):
     list_display = ['hotel', 'amenity']
     list_filter = ['amenity']
     search_fields = ['hotel__name', 'amenity__name']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_detail_cache(obj.hotel_id)
 
 @admin.register(HotelImage)
 class HotelImageAdmin(admin.ModelAdmin):
     list_display = ['hotel', 'caption', 'is_main', 'created_at']
     list_filter = ['is_main', 'created_at']
     search_fields = ['hotel__name', 'caption']
-    list_editable = ['is_main']
\ No newline at end of file
+    list_editable = ['is_main']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_detail_cache(obj.hotel_id)
\ No newline at end of file
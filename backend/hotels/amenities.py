@@ -0,0 +1,61 @@
+# backend/hotels/amenities.py
+"""Per-hotel amenity bitmask.
+
+``Hotel.amenity_mask`` has bit ``id - 1`` set for every amenity the hotel
+offers, so "pool AND wifi AND parking" is one ``mask & wanted = wanted``
+test instead of a join per amenity. A signed 64-bit column holds amenity ids
+1-63; filters on larger ids fall back to ``EXISTS`` subqueries.
+"""
+from django.db.models import Exists, F, OuterRef, Q
+
+from .models import Hotel, HotelAmenity
+
+MAX_MASKED_ID = 63
+
+
+def amenity_bit(amenity_id):
+    return 1 << (amenity_id - 1) if 1 <= amenity_id <= MAX_MASKED_ID else 0
+
+
+def split_mask(amenity_ids):
+    """``(mask, unmasked_ids)`` for ``amenity_ids``"""
+    mask, unmasked = 0, []
+    for amenity_id in amenity_ids:
+        bit = amenity_bit(amenity_id)
+        if bit:
+            mask |= bit
+        else:
+            unmasked.append(amenity_id)
+    return mask, unmasked
+
+
+def _has_amenity(amenity_id):
+    return Exists(HotelAmenity.objects.filter(hotel=OuterRef('pk'), amenity_id=amenity_id))
+
+
+def filter_all(queryset, amenity_ids):
+    """Hotels offering every amenity in ``amenity_ids``"""
+    mask, unmasked = split_mask(amenity_ids)
+    if mask:
+        queryset = queryset.alias(required_amenities=F('amenity_mask').bitand(mask)).filter(required_amenities=mask)
+    for amenity_id in unmasked:
+        queryset = queryset.filter(_has_amenity(amenity_id))
+    return queryset
+
+
+def filter_any(queryset, amenity_ids):
+    """Hotels offering at least one amenity in ``amenity_ids``"""
+    mask, unmasked = split_mask(amenity_ids)
+    condition = Q(pk__in=[])
+    if mask:
+        queryset = queryset.alias(offered_amenities=F('amenity_mask').bitand(mask))
+        condition |= ~Q(offered_amenities=0)
+    for amenity_id in unmasked:
+        condition |= Q(_has_amenity(amenity_id))
+    return queryset.filter(condition)
+
+
+def sync_amenity_mask(hotel_id):
+    mask, _ = split_mask(HotelAmenity.objects.filter(hotel_id=hotel_id).values_list('amenity_id', flat=True))
+    Hotel.objects.filter(id=hotel_id).update(amenity_mask=mask)
+    return mask
@@ -0,0 +1,110 @@
+# backend/hotels/cache.py
+"""Rendered-response caching for hot hotel endpoints.
+
+Cached entries live under a generation-stamped key. Invalidation bumps the
+generation instead of deleting, so a rebuild that started before a write can
+only ever store its (stale) body under the old, unreachable key.
+
+The generation is only meaningful if every worker reads the same one, so
+with a per-process cache (``settings.SHARED_CACHE`` false) nothing is
+cached and the endpoints send no generation-based validators.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .renderers import dumps
+
+WEEKEND_NAMESPACE = 'hotels:weekend'
+WEEKEND_TIMEOUT = 60 * 60
+# How long a rebuild may hold the lock, and how long other requests wait for it
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.02
+
+
+def _generation(namespace):
+    key = f'{namespace}:generation'
+    generation = cache.get(key)
+    if generation is None:
+        # A fresh, never-before-used stamp in case the old one was evicted
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _modified(namespace):
+    key = f'{namespace}:modified'
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, time.time(), None)
+        modified = cache.get(key)
+    return modified
+
+
+def invalidate(namespace):
+    key = f'{namespace}:generation'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    cache.set(f'{namespace}:modified', time.time(), None)
+
+
+def enabled():
+    # A write handled by one worker cannot bump another worker's LocMem generation
+    return settings.SHARED_CACHE
+
+
+def version(namespace):
+    """``(generation, modified timestamp)`` of ``namespace``, for conditional GETs
+
+    Both change on every invalidation, so they validate a cached body
+    without reading or rendering it.
+    """
+    return _generation(namespace), _modified(namespace)
+
+
+def cached_bytes(namespace, build, timeout, variant=''):
+    """Return cached bytes for ``namespace``, calling ``build`` at most once per miss
+
+    Concurrent misses race for a short lock; the loser polls for the
+    winner's result instead of hammering the database with the same rebuild.
+    ``variant`` keeps differently shaped bodies (e.g. sparse fieldsets) apart;
+    all of them share the namespace's generation.
+    """
+    if not enabled():
+        return build()
+    key = f'{namespace}:{_generation(namespace)}'
+    if variant:
+        key = f'{key}:{variant}'
+    body = cache.get(key)
+    if body is not None:
+        return body
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            body = build()
+            cache.set(key, body, timeout)
+        finally:
+            cache.delete(lock_key)
+        return body
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        body = cache.get(key)
+        if body is not None:
+            return body
+    # The rebuild is taking too long; serve this request uncached
+    return build()
+
+
+def render_json(data):
+    return dumps(data)
+
+
+def invalidate_weekend():
+    invalidate(WEEKEND_NAMESPACE)
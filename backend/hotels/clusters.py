@@ -0,0 +1,146 @@
+# backend/hotels/clusters.py
+"""Hierarchical geohash grid for zoomed-out map requests.
+
+For every geohash precision from 1 to ``MAX_PRECISION`` each non-empty cell
+keeps its hotel count, coordinate sums (for the centroid) and cheapest
+price. The grid is built from one query and then patched per hotel from
+model signals: moving a hotel touches one cell per level instead of
+re-aggregating the catalogue. Requests start from the geohash cover of
+their bounding box and descend only into non-empty cells inside it, so the
+cost follows the viewport rather than the size of the grid.
+"""
+import threading
+import time
+
+from . import geo
+from .indexes import RefreshingIndex
+from .models import Hotel
+
+MAX_PRECISION = 6
+# Zoom levels below this get clusters; closer zooms get individual markers
+MAX_CLUSTER_ZOOM = 12
+
+
+def precision_for_zoom(zoom):
+    """Geohash precision whose cells are roughly a marker's size at ``zoom``"""
+    return max(1, min(MAX_PRECISION, (zoom + 1) // 2))
+
+
+class _Cell:
+    __slots__ = ('members', 'sum_lat', 'sum_lng', 'min_price')
+
+    def __init__(self):
+        self.members = set()
+        self.sum_lat = 0.0
+        self.sum_lng = 0.0
+        self.min_price = None
+
+
+class ClusterIndex(RefreshingIndex):
+    max_age_setting = 'HOTEL_CLUSTER_MAX_AGE'
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._levels = {precision: {} for precision in range(1, MAX_PRECISION + 1)}
+        self._hotels = {}
+
+    def build(self, rows=None):
+        if rows is None:
+            rows = Hotel.objects.filter(is_available=True).values_list(
+                'id', 'geohash', 'latitude', 'longitude', 'base_price'
+            )
+        fresh = ClusterIndex()
+        for hotel_id, geohash, latitude, longitude, price in rows:
+            fresh._add(hotel_id, geohash, latitude, longitude, price)
+        with self._lock:
+            self._levels = fresh._levels
+            self._hotels = fresh._hotels
+            self.built_at = time.monotonic()
+
+    def update_hotel(self, hotel):
+        entry = (hotel.geohash, float(hotel.latitude), float(hotel.longitude), float(hotel.base_price))
+        with self._lock:
+            if self._hotels.get(hotel.id) == entry and hotel.is_available:
+                return
+            self._remove(hotel.id)
+            if hotel.is_available and hotel.geohash:
+                self._add(hotel.id, *entry)
+
+    def remove_hotel(self, hotel_id):
+        with self._lock:
+            self._remove(hotel_id)
+
+    def _add(self, hotel_id, geohash, latitude, longitude, price):
+        if not geohash:
+            return
+        latitude, longitude, price = float(latitude), float(longitude), float(price)
+        self._hotels[hotel_id] = (geohash, latitude, longitude, price)
+        for precision, cells in self._levels.items():
+            cell = cells.get(geohash[:precision])
+            if cell is None:
+                cell = cells[geohash[:precision]] = _Cell()
+            cell.members.add(hotel_id)
+            cell.sum_lat += latitude
+            cell.sum_lng += longitude
+            if cell.min_price is None or price < cell.min_price:
+                cell.min_price = price
+
+    def _remove(self, hotel_id):
+        entry = self._hotels.pop(hotel_id, None)
+        if entry is None:
+            return
+        geohash, latitude, longitude, price = entry
+        for precision, cells in self._levels.items():
+            key = geohash[:precision]
+            cell = cells[key]
+            cell.members.discard(hotel_id)
+            if not cell.members:
+                del cells[key]
+                continue
+            cell.sum_lat -= latitude
+            cell.sum_lng -= longitude
+            if price <= cell.min_price:
+                # The cheapest hotel left; rescan just this cell's members
+                cell.min_price = min(self._hotels[member][3] for member in cell.members)
+
+    def _cells_in(self, bbox, precision):
+        """``(key, cell)`` for the non-empty cells at ``precision`` that overlap ``bbox``"""
+        boxes = geo.split_antimeridian(*bbox)
+        frontier = list({prefix[:precision] for prefix in geo.covering_cells(*bbox)})
+        while frontier:
+            prefix = frontier.pop()
+            if prefix and prefix not in self._levels[len(prefix)]:
+                continue
+            if len(prefix) == precision:
+                yield prefix, self._levels[precision][prefix]
+                continue
+            children = self._levels[len(prefix) + 1]
+            frontier.extend(
+                prefix + char for char in geo.BASE32
+                if prefix + char in children and geo.overlaps(geo.cell_bounds(prefix + char), boxes)
+            )
+
+    def clusters(self, bbox, zoom, limit):
+        south, west, north, east = bbox
+        precision = precision_for_zoom(zoom)
+        result = []
+        with self._lock:
+            for key, cell in self._cells_in(bbox, precision):
+                count = len(cell.members)
+                lat, lng = cell.sum_lat / count, cell.sum_lng / count
+                in_lng = west <= lng <= east if west <= east else (lng >= west or lng <= east)
+                if south <= lat <= north and in_lng:
+                    result.append({
+                        'geohash': key, 'count': count, 'lat': round(lat, 6), 'lng': round(lng, 6),
+                        'min_price': cell.min_price,
+                    })
+        result.sort(key=lambda cluster: (-cluster['count'], cluster['geohash']))
+        return result[:limit]
+
+index = ClusterIndex()
+
+
+def clusters(bbox, zoom, limit):
+    index.refresh()
+    return index.clusters(bbox, zoom, limit)
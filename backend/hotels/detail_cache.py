@@ -0,0 +1,178 @@
+# backend/hotels/detail_cache.py
+"""Two-tier cache for rendered hotel detail payloads.
+
+Tier one is a bounded LRU with a TTL in each process; tier two is the
+shared Django cache. Entries are keyed by the hotel's version
+(``updated_at`` plus the payload format), which the detail view already
+reads for its ETag, so a committed write is seen by every process at once:
+older entries are simply never asked for again and age out. Admin saves
+write the new payload through to both tiers, so the first visitor after an
+edit does not pay for the rebuild.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Hotel
+from .projections import PAYLOAD_VERSION, detail_queryset, hotel_detail_payload
+from .renderers import dumps
+
+
+class LRUCache:
+    """A thread-safe LRU of at most ``maxsize`` entries, each living ``ttl`` seconds"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local = LRUCache(
+    maxsize=getattr(settings, 'HOTEL_DETAIL_CACHE_SIZE', 512),
+    ttl=getattr(settings, 'HOTEL_DETAIL_CACHE_TTL', 60),
+)
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def version(updated_at):
+    return f'{PAYLOAD_VERSION}-{int(updated_at.timestamp() * 1_000_000)}'
+
+
+def _shared_key(hotel_id, hotel_version):
+    return f'hotels:detail:{hotel_id}:{hotel_version}'
+
+
+def _timeout():
+    return getattr(settings, 'HOTEL_DETAIL_CACHE_TIMEOUT', 60 * 60)
+
+
+def _render_many(hotel_ids):
+    """``{id: body}`` for the available hotels among ``hotel_ids``, in three queries"""
+    hotels = detail_queryset(Hotel.objects.filter(id__in=hotel_ids, is_available=True))
+    return {hotel.id: dumps(hotel_detail_payload(hotel)) for hotel in hotels}
+
+
+def _store_many(bodies, versions):
+    cache.set_many({_shared_key(hotel_id, versions[hotel_id]): body for hotel_id, body in bodies.items()}, _timeout())
+    for hotel_id, body in bodies.items():
+        # One local slot per hotel: a newer version replaces the older one
+        local.set(hotel_id, (versions[hotel_id], body))
+
+
+def detail_bodies(updated_ats):
+    """Rendered detail JSON for ``{hotel_id: updated_at}``, as ``{hotel_id: body}``
+
+    Each tier is asked once for everything the tier before it missed: the
+    local LRU, then one ``get_many``, then one batch render. Hotels that no
+    longer exist or are unavailable are left out.
+    """
+    bodies, versions = {}, {}
+    for hotel_id, updated_at in updated_ats.items():
+        hotel_version = version(updated_at)
+        entry = local.get(hotel_id)
+        if entry is not None and entry[0] == hotel_version:
+            _count('local_hits')
+            bodies[hotel_id] = entry[1]
+        else:
+            versions[hotel_id] = hotel_version
+    if versions:
+        shared = cache.get_many([_shared_key(hotel_id, hotel_version) for hotel_id, hotel_version in versions.items()])
+        for hotel_id, hotel_version in list(versions.items()):
+            body = shared.get(_shared_key(hotel_id, hotel_version))
+            if body is not None:
+                _count('shared_hits')
+                local.set(hotel_id, (hotel_version, body))
+                bodies[hotel_id] = body
+                del versions[hotel_id]
+    if versions:
+        _count('misses', len(versions))
+        # Rendered after the versions were read, so no body is older than its key
+        rendered = _render_many(list(versions))
+        _store_many(rendered, versions)
+        bodies.update(rendered)
+    return bodies
+
+
+def detail_body(hotel_id, updated_at):
+    """Rendered detail JSON for the hotel at ``updated_at``; raises Hotel.DoesNotExist"""
+    body = detail_bodies({hotel_id: updated_at}).get(hotel_id)
+    if body is None:
+        raise Hotel.DoesNotExist
+    return body
+
+
+def refresh(hotel_id):
+    """Write the hotel's current payload through to both tiers; call after the write commits"""
+    updated_at = Hotel.objects.filter(id=hotel_id, is_available=True).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        local.delete(hotel_id)
+        return
+    _store_many(_render_many([hotel_id]), {hotel_id: version(updated_at)})
+    _count('refreshes')
+
+
+def stats():
+    """This process's hit/miss counters and tier-one occupancy, for tuning size and TTL"""
+    with _counters_lock:
+        counts = {name: _counters[name] for name in ('local_hits', 'shared_hits', 'misses', 'refreshes')}
+    lookups = counts['local_hits'] + counts['shared_hits'] + counts['misses']
+    return {
+        **counts,
+        'hit_rate': round((counts['local_hits'] + counts['shared_hits']) / lookups, 4) if lookups else None,
+        'local_size': len(local),
+        'local_maxsize': local.maxsize,
+        'local_ttl': local.ttl,
+        'evictions': local.evictions,
+        'expirations': local.expirations,
+    }
+
+
+def reset():
+    local.clear()
+    local.evictions = local.expirations = 0
+    with _counters_lock:
+        _counters.clear()
@@ -0,0 +1,292 @@
+# backend/hotels/facets.py
+"""In-process bitmaps for search facet counts.
+
+Every available hotel gets a bit position. Cities, countries, price buckets,
+rating thresholds, amenities and "has a discount" each keep a bitmap (a
+Python int) of the hotels they cover, so counting one facet value under the
+current filter is an AND plus ``bit_count()`` rather than a ``GROUP BY`` per
+facet. Unfiltered facets of a whole city or country are cached per place;
+writes drop only the cached places they touch.
+"""
+import threading
+import time
+
+from . import pricing
+from .filters import NO_FILTERS
+from .indexes import RefreshingIndex
+from .models import Amenity, Hotel, HotelAmenity
+from .suggest import fold
+
+# Lower edges of the price buckets, in currency units; the last one is open-ended
+PRICE_EDGES = (0, 50, 100, 200, 300, 500)
+RATING_THRESHOLDS = (9, 8, 7, 6)
+ALL = ('all',)
+DISCOUNTED = ('discount',)
+
+
+def _bitmap(slots):
+    # Set bits in a bytearray first: OR-ing bits into an int one by one is quadratic
+    slots = list(slots)
+    if not slots:
+        return 0
+    buffer = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _price_bucket(cents):
+    return max(index for index, edge in enumerate(PRICE_EDGES) if cents >= edge * 100)
+
+
+class _Row:
+    __slots__ = ('hotel_id', 'city', 'country', 'price', 'rating', 'discounted', 'amenities')
+
+    def __init__(self, hotel_id, city, country, base_price, rating, special_discount, amenities=()):
+        self.hotel_id = hotel_id
+        self.city = fold(city)
+        self.country = fold(country)
+        self.price = pricing.to_cents(base_price)
+        self.rating = float(rating)
+        self.discounted = special_discount > 0
+        self.amenities = set(amenities)
+
+    def keys(self):
+        """Every bitmap this hotel belongs to"""
+        yield ALL
+        yield ('place', self.city)
+        if self.country != self.city:
+            yield ('place', self.country)
+        yield ('price', _price_bucket(self.price))
+        for threshold in RATING_THRESHOLDS:
+            if self.rating >= threshold:
+                yield ('rating', threshold)
+        for amenity_id in self.amenities:
+            yield ('amenity', amenity_id)
+        if self.discounted:
+            yield DISCOUNTED
+
+
+class FacetIndex(RefreshingIndex):
+    max_age_setting = 'HOTEL_FACET_MAX_AGE'
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._rows = []
+        self._bits = {}
+        self._amenity_names = {}
+        self._place_facets = {}
+
+    # Building and incremental maintenance
+
+    def build(self):
+        amenities = {}
+        for hotel_id, amenity_id in HotelAmenity.objects.filter(hotel__is_available=True).values_list(
+            'hotel_id', 'amenity_id'
+        ):
+            amenities.setdefault(hotel_id, []).append(amenity_id)
+        rows = [
+            _Row(*values, amenities=amenities.get(values[0], ()))
+            for values in Hotel.objects.filter(is_available=True).values_list(
+                'id', 'city', 'country', 'base_price', 'rating', 'special_discount'
+            )
+        ]
+        groups = {}
+        for slot, row in enumerate(rows):
+            for key in row.keys():
+                groups.setdefault(key, []).append(slot)
+        bits = {key: _bitmap(slots) for key, slots in groups.items()}
+        names = dict(Amenity.objects.values_list('id', 'name'))
+        with self._lock:
+            self._rows = rows
+            self._slots = {row.hotel_id: slot for slot, row in enumerate(rows)}
+            self._bits = bits
+            self._amenity_names = names
+            self._place_facets = {}
+            self.built_at = time.monotonic()
+
+    def _flip(self, slot, present):
+        row, bit = self._rows[slot], 1 << slot
+        for key in row.keys():
+            bits = self._bits.get(key, 0)
+            bits = bits | bit if present else bits & ~bit
+            if bits:
+                self._bits[key] = bits
+            else:
+                self._bits.pop(key, None)
+        self._place_facets.pop(row.city, None)
+        self._place_facets.pop(row.country, None)
+        self._place_facets.pop(None, None)
+
+    def update_hotel(self, hotel):
+        with self._lock:
+            slot = self._slots.get(hotel.id)
+            amenities = ()
+            if slot is not None:
+                amenities = self._rows[slot].amenities
+                self._flip(slot, False)
+            if not hotel.is_available:
+                if slot is not None:
+                    del self._slots[hotel.id]
+                    self._rows[slot] = None
+                return
+            row = _Row(
+                hotel.id, hotel.city, hotel.country, hotel.base_price, hotel.rating, hotel.special_discount,
+                amenities=amenities,
+            )
+            if slot is None:
+                slot = self._slots[hotel.id] = len(self._rows)
+                self._rows.append(row)
+            else:
+                self._rows[slot] = row
+            self._flip(slot, True)
+
+    def remove_hotel(self, hotel_id):
+        with self._lock:
+            slot = self._slots.pop(hotel_id, None)
+            if slot is not None:
+                self._flip(slot, False)
+                self._rows[slot] = None
+
+    def set_amenity(self, hotel_id, amenity_id, present):
+        with self._lock:
+            slot = self._slots.get(hotel_id)
+            if slot is None:
+                return
+            self._flip(slot, False)
+            if present:
+                self._rows[slot].amenities.add(amenity_id)
+            else:
+                self._rows[slot].amenities.discard(amenity_id)
+            self._flip(slot, True)
+
+    def rename_amenity(self, amenity_id, name):
+        with self._lock:
+            self._amenity_names[amenity_id] = name
+            self._place_facets.clear()
+
+    # Lookups
+
+    def scope(self, hotel_ids):
+        """Bitmap of the given hotels, for filters the index cannot answer (text, stay dates)"""
+        with self._lock:
+            return _bitmap(self._slots[hotel_id] for hotel_id in hotel_ids if hotel_id in self._slots)
+
+    def _scan(self, matches):
+        # Ranges that do not line up with the precomputed buckets
+        return _bitmap(slot for slot, row in enumerate(self._rows) if row is not None and matches(row))
+
+    def _price_bits(self, filters):
+        if filters.min_price is None and filters.max_price is None:
+            return None
+        low = pricing.to_cents(filters.min_price or 0)
+        high = pricing.to_cents(filters.max_price) if filters.max_price is not None else None
+        edges = [edge * 100 for edge in PRICE_EDGES]
+        # An inclusive max_price never lines up with a bucket's exclusive upper edge
+        if high is None and low in edges:
+            bits = 0
+            for bucket in range(edges.index(low), len(edges)):
+                bits |= self._bits.get(('price', bucket), 0)
+            return bits
+        return self._scan(lambda row: row.price >= low and (high is None or row.price <= high))
+
+    def _rating_bits(self, filters):
+        if filters.min_rating is None:
+            return None
+        if filters.min_rating in RATING_THRESHOLDS:
+            return self._bits.get(('rating', int(filters.min_rating)), 0)
+        minimum = float(filters.min_rating)
+        return self._scan(lambda row: row.rating >= minimum)
+
+    def _amenity_bits(self, filters):
+        if not filters.amenities and not filters.any_amenities:
+            return None
+        bits = self._bits.get(ALL, 0)
+        for amenity_id in filters.amenities:
+            bits &= self._bits.get(('amenity', amenity_id), 0)
+        if filters.any_amenities:
+            offered = 0
+            for amenity_id in filters.any_amenities:
+                offered |= self._bits.get(('amenity', amenity_id), 0)
+            bits &= offered
+        return bits
+
+    def counts(self, scope=None, filters=NO_FILTERS, destination=''):
+        """Facet counts for the hotels in ``scope`` (a bitmap; None means all)
+
+        Each facet is counted under every filter except its own, so choosing a
+        price bucket still shows how many hotels the other buckets hold.
+        """
+        with self._lock:
+            everything = self._bits.get(ALL, 0)
+            place = fold(destination) or None
+            if scope is None:
+                scope, place = everything, None
+            # Only a scope that is exactly a whole city or country may use its cached facets
+            cacheable = filters == NO_FILTERS and (
+                place is None and scope == everything or scope == self._bits.get(('place', place))
+            )
+            if cacheable and place in self._place_facets:
+                return self._place_facets[place]
+            result = self._counts(scope, filters)
+            if cacheable:
+                self._place_facets[place] = result
+            return result
+
+    def _counts(self, scope, filters):
+        price = self._price_bits(filters)
+        rating = self._rating_bits(filters)
+        amenities = self._amenity_bits(filters)
+        discount = self._bits.get(DISCOUNTED, 0) if filters.discount_only else None
+
+        def narrowed(*parts):
+            bits = scope
+            for part in parts:
+                if part is not None:
+                    bits &= part
+            return bits
+
+        matching = narrowed(price, rating, amenities, discount)
+        without_price = narrowed(rating, amenities, discount)
+        without_rating = narrowed(price, amenities, discount)
+        amenity_counts = [
+            {'id': amenity_id, 'name': name, 'count': (matching & self._bits.get(('amenity', amenity_id), 0)).bit_count()}
+            for amenity_id, name in self._amenity_names.items()
+        ]
+        return {
+            'total': matching.bit_count(),
+            'price': [
+                {
+                    'min': edge,
+                    'max': PRICE_EDGES[bucket + 1] if bucket + 1 < len(PRICE_EDGES) else None,
+                    'count': (without_price & self._bits.get(('price', bucket), 0)).bit_count(),
+                }
+                for bucket, edge in enumerate(PRICE_EDGES)
+            ],
+            'rating': [
+                {'min': threshold, 'count': (without_rating & self._bits.get(('rating', threshold), 0)).bit_count()}
+                for threshold in RATING_THRESHOLDS
+            ],
+            'amenities': sorted(
+                (entry for entry in amenity_counts if entry['count']),
+                key=lambda entry: (-entry['count'], entry['name']),
+            ),
+            'discount': (narrowed(price, rating, amenities) & self._bits.get(DISCOUNTED, 0)).bit_count(),
+        }
+
+
+index = FacetIndex()
+
+
+def facet_counts(scoped, filters, destination='', narrowed=True):
+    """Facets for a search whose text and stay filters produced ``scoped``
+
+    With ``narrowed=False`` (no destination or stay) the whole catalogue is
+    the scope and no query runs at all; otherwise one ``id`` query maps the
+    matches onto the bitmaps.
+    """
+    index.refresh()
+    scope = index.scope(scoped.values_list('id', flat=True)) if narrowed else None
+    return index.counts(scope, filters, destination)
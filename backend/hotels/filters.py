@@ -0,0 +1,62 @@
+# backend/hotels/filters.py
+"""Search filters beyond the destination: price, rating, amenities, discount.
+
+Prices filter on ``base_price``, the per-night price shown on result cards.
+"""
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from . import amenities as amenity_masks
+
+Filters = namedtuple('Filters', ['min_price', 'max_price', 'min_rating', 'amenities', 'any_amenities', 'discount_only'])
+NO_FILTERS = Filters(None, None, None, (), (), False)
+TRUE_VALUES = {'1', 'true', 'yes'}
+
+
+def _amount(raw, name):
+    if raw in (None, ''):
+        return None
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        raise ValueError(f'{name} must be a number')
+    if not value.is_finite() or value < 0:
+        raise ValueError(f'{name} must be a non-negative number')
+    return value
+
+
+def _ids(raw, name):
+    try:
+        return tuple(sorted({int(part) for part in (raw or '').split(',') if part.strip()}))
+    except ValueError:
+        raise ValueError(f'{name} must be a comma-separated list of amenity ids')
+
+
+def parse_filters(params):
+    """Read the filter query parameters; raises ValueError on bad input"""
+    min_price = _amount(params.get('min_price'), 'min_price')
+    max_price = _amount(params.get('max_price'), 'max_price')
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError('min_price must not exceed max_price')
+    min_rating = _amount(params.get('min_rating'), 'min_rating')
+    amenities = _ids(params.get('amenities'), 'amenities')
+    any_amenities = _ids(params.get('any_amenities'), 'any_amenities')
+    discount_only = params.get('discount_only', '').lower() in TRUE_VALUES
+    return Filters(min_price, max_price, min_rating, amenities, any_amenities, discount_only)
+
+
+def apply_filters(queryset, filters):
+    if filters.min_price is not None:
+        queryset = queryset.filter(base_price__gte=filters.min_price)
+    if filters.max_price is not None:
+        queryset = queryset.filter(base_price__lte=filters.max_price)
+    if filters.min_rating is not None:
+        queryset = queryset.filter(rating__gte=filters.min_rating)
+    # Every amenity in ``amenities`` and at least one in ``any_amenities``
+    if filters.amenities:
+        queryset = amenity_masks.filter_all(queryset, filters.amenities)
+    if filters.any_amenities:
+        queryset = amenity_masks.filter_any(queryset, filters.any_amenities)
+    if filters.discount_only:
+        queryset = queryset.filter(special_discount__gt=0)
+    return queryset
@@ -0,0 +1,160 @@
+# backend/hotels/geo.py
+"""Geohash helpers for the map endpoint.
+
+Every hotel stores the geohash of its coordinates. A viewport is covered by a
+handful of geohash cells and each cell becomes a ``BETWEEN`` range on the
+indexed ``geohash`` column, so map queries never scan the whole table.
+"""
+import math
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 9
+# Upper bound on the ranges OR'ed together for one viewport
+MAX_CELLS = 16
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    latitude, longitude = float(latitude), float(longitude)
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        bounds, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_bounds(geohash):
+    """(south, west, north, east) of the cell named by ``geohash``"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lng_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if value >> shift & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def overlaps(bounds, boxes):
+    """Whether the box ``bounds`` intersects any of ``boxes`` (as from ``split_antimeridian``)"""
+    south, west, north, east = bounds
+    return any(s <= north and n >= south and w <= east and e >= west for s, w, n, e in boxes)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell at ``precision``"""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lng_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _covering_cells(south, west, north, east, precision):
+    height, width = cell_size(precision)
+    cells = set()
+    lat = math.floor(south / height) * height
+    while lat <= north:
+        lng = math.floor(west / width) * width
+        while lng <= east:
+            center_lat = min(max(lat + height / 2, -90.0), 90.0)
+            center_lng = min(max(lng + width / 2, -180.0), 180.0)
+            cells.add(encode(center_lat, center_lng, precision))
+            lng += width
+        lat += height
+    return cells
+
+
+def split_antimeridian(south, west, north, east):
+    if west <= east:
+        return [(south, west, north, east)]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def covering_cells(south, west, north, east, max_cells=MAX_CELLS):
+    """The finest set of at most ``max_cells`` geohash prefixes covering the box"""
+    boxes = split_antimeridian(south, west, north, east)
+    best = {''}
+    for precision in range(1, PRECISION + 1):
+        height, width = cell_size(precision)
+        estimate = sum(
+            (math.floor(n / height) - math.floor(s / height) + 1) * (math.floor(e / width) - math.floor(w / width) + 1)
+            for s, w, n, e in boxes
+        )
+        if estimate > max_cells:
+            break
+        best = set().union(*(_covering_cells(*box, precision) for box in boxes))
+    return sorted(best)
+
+
+def _successor(prefix):
+    # Smallest string sorting after every string that starts with ``prefix``
+    while prefix:
+        position = BASE32.index(prefix[-1])
+        if position + 1 < len(BASE32):
+            return prefix[:-1] + BASE32[position + 1]
+        prefix = prefix[:-1]
+    return None
+
+
+def prefix_ranges_q(prefixes, field='geohash'):
+    """Index-friendly range lookups equivalent to ``field__startswith`` on each prefix"""
+    query = Q()
+    for prefix in prefixes:
+        condition = Q(**{f'{field}__gte': prefix})
+        upper = _successor(prefix)
+        if upper is not None:
+            condition &= Q(**{f'{field}__lt': upper})
+        query |= condition
+    return query
+
+
+def bbox_q(south, west, north, east):
+    boxes = split_antimeridian(south, west, north, east)
+    bounds = Q()
+    for s, w, n, e in boxes:
+        bounds |= Q(latitude__gte=s, latitude__lte=n, longitude__gte=w, longitude__lte=e)
+    return prefix_ranges_q(covering_cells(south, west, north, east)) & bounds
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(latitude))
+    lng_delta = 180.0 if cos_lat < 1e-9 else min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    south, north = max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0)
+    west, east = longitude - lng_delta, longitude + lng_delta
+    if lng_delta >= 180.0:
+        west, east = -180.0, 180.0
+    else:
+        west = west + 360.0 if west < -180.0 else west
+        east = east - 360.0 if east > 180.0 else east
+    return south, west, north, east
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,137 @@
+# backend/hotels/images.py
+"""Resized image derivatives for hotel photos.
+
+Derivatives are content addressed: their storage name comes from the SHA-256
+of the original file plus the variant, so an unchanged photo is never
+resized twice and a replaced one can never be served a stale derivative.
+URLs point at ``hotel_image_variant``, which renders a missing derivative on
+first request; ``generate_all`` renders them up front. Photos Pillow refuses
+to decode (decompression bombs, unreadable files) have no derivatives and
+are served as the original instead.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from collections import namedtuple
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+Variant = namedtuple('Variant', ['width', 'height', 'crop'])
+
+# Cards and thumbnails are cropped to a fixed frame; large keeps its aspect ratio
+VARIANTS = {
+    'thumb': Variant(160, 120, True),
+    'card': Variant(480, 320, True),
+    'large': Variant(1280, 960, False),
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+CONTENT_TYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+DERIVATIVE_DIR = 'derivatives'
+HASH_CHUNK_SIZE = 1024 * 1024
+# Decoding errors no retry can fix, unlike storage I/O errors
+UNDECODABLE = (Image.DecompressionBombError, UnidentifiedImageError)
+
+
+class UnknownVariant(ValueError):
+    pass
+
+
+def content_hash(field_file):
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        field_file.seek(0)
+        for chunk in iter(lambda: field_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    finally:
+        field_file.seek(0)
+    return digest.hexdigest()
+
+
+def derivative_name(digest, variant, extension):
+    return f'{DERIVATIVE_DIR}/{digest[:2]}/{digest}-{variant}.{extension}'
+
+
+def variant_url(digest, variant, extension):
+    return reverse('hotel_image_variant', args=[digest, variant, extension])
+
+
+def render(source, variant, extension):
+    """Resize the image file ``source`` into ``variant`` encoded as ``extension``"""
+    if variant not in VARIANTS or extension not in FORMATS:
+        raise UnknownVariant(f'{variant}.{extension}')
+    spec = VARIANTS[variant]
+    image_format, options = FORMATS[extension]
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if spec.crop:
+            image = ImageOps.fit(image, (spec.width, spec.height), Image.LANCZOS)
+        else:
+            image.thumbnail((spec.width, spec.height), Image.LANCZOS)
+        keep_alpha = image_format == 'WEBP' and image.mode in ('RGBA', 'LA')
+        image = image.convert('RGBA' if keep_alpha else 'RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _store(name, data):
+    # Atomic rename on local disk, so concurrent first requests never see a partial file
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(data))
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(handle, 'wb') as output:
+        output.write(data)
+    os.replace(temporary, path)
+
+
+def ensure_derivative(hotel_image, variant, extension):
+    """Storage name of the derivative, rendering it first if it does not exist yet"""
+    name = derivative_name(hotel_image.content_hash, variant, extension)
+    if not default_storage.exists(name):
+        with hotel_image.image.open('rb') as source:
+            _store(name, render(source, variant, extension))
+    return name
+
+
+def generate_all(hotel_image):
+    """Render every derivative; False if the photo cannot be decoded at all"""
+    try:
+        for variant in VARIANTS:
+            for extension in FORMATS:
+                ensure_derivative(hotel_image, variant, extension)
+    except UNDECODABLE:
+        return False
+    return True
+
+
+def srcset(hotel_image, extension, absolute=None):
+    absolute = absolute or (lambda url: url)
+    return ', '.join(
+        f'{absolute(variant_url(hotel_image.content_hash, variant, extension))} {spec.width}w'
+        for variant, spec in VARIANTS.items()
+    )
+
+
+def image_sources(hotel_image, absolute=None):
+    """``src``/``srcset`` fields for one photo; ``absolute`` turns paths into full URLs"""
+    if not hotel_image.content_hash:
+        return {'src': None, 'srcset': '', 'webp_srcset': ''}
+    absolute = absolute or (lambda url: url)
+    return {
+        'src': absolute(variant_url(hotel_image.content_hash, 'card', 'jpg')),
+        'srcset': srcset(hotel_image, 'jpg', absolute),
+        'webp_srcset': srcset(hotel_image, 'webp', absolute),
+    }
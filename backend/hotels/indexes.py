@@ -0,0 +1,51 @@
+# backend/hotels/indexes.py
+"""Refresh policy shared by the in-process hotel indexes.
+
+Each index is built from the database and then patched per hotel as writes
+in this process commit (see signals.py). Writes made by other worker
+processes only show up after a periodic rebuild; ``refresh`` lets one
+request per process run it while the rest keep reading the old index.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+DEFAULT_MAX_AGE = 900
+
+
+class RefreshingIndex:
+    """Base for indexes with a ``build()`` that swaps in a fresh snapshot
+
+    Subclasses set ``max_age_setting`` to the setting holding their maximum
+    age in seconds.
+    """
+    max_age_setting = None
+
+    def __init__(self):
+        self._build_lock = threading.Lock()
+        self.built_at = None
+
+    def build(self):
+        raise NotImplementedError
+
+    def is_stale(self):
+        max_age = getattr(settings, self.max_age_setting, DEFAULT_MAX_AGE)
+        return self.built_at is None or time.monotonic() - self.built_at > max_age
+
+    def refresh(self):
+        """Rebuild if stale, at most once at a time per process
+
+        Before the first build there is nothing to serve, so callers queue
+        behind it; afterwards a caller that finds a rebuild running goes on
+        with the old index instead of waiting or starting another.
+        """
+        if not self.is_stale():
+            return
+        if not self._build_lock.acquire(blocking=self.built_at is None):
+            return
+        try:
+            if self.is_stale():  # The build we queued behind may have done it
+                self.build()
+        finally:
+            self._build_lock.release()
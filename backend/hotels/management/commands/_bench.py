@@ -0,0 +1,77 @@
+# backend/hotels/management/commands/_bench.py
+"""Shared helpers for the benchmark management commands.
+
+Benchmarks seed synthetic data inside a transaction that is always rolled
+back, so they can be pointed at a development database without leaving
+anything behind.
+"""
+import random
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import transaction
+
+from hotels import ranking
+from hotels.models import Hotel
+
+CITIES = [
+    ('Turkey', 'Istanbul'), ('Turkey', 'Ankara'), ('Turkey', 'Izmir'), ('Turkey', 'Antalya'),
+    ('Turkey', 'Bodrum'), ('Greece', 'Athens'), ('Italy', 'Rome'), ('France', 'Paris'),
+    ('Spain', 'Barcelona'), ('Germany', 'Berlin'), ('Netherlands', 'Amsterdam'),
+    ('United Kingdom', 'London'),
+]
+NAME_WORDS = ['Grand', 'Palace', 'Boutique', 'Suites', 'Resort', 'Inn', 'Garden', 'Bay', 'Park', 'Royal']
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is discarded afterwards"""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def seed_hotels(count, seed=42, batch_size=2000):
+    rng = random.Random(seed)
+    hotels = []
+    for i in range(count):
+        country, city = rng.choice(CITIES)
+        hotels.append(Hotel(
+            name=f'{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {city} {i}',
+            description='Benchmark hotel',
+            country=country,
+            city=city,
+            address=f'{i} Benchmark Street',
+            latitude=Decimal(rng.uniform(36, 52)).quantize(Decimal('0.000001')),
+            longitude=Decimal(rng.uniform(-1, 44)).quantize(Decimal('0.000001')),
+            base_price=Decimal(rng.randint(4000, 90000)) / 100,
+            special_discount=rng.choice([0, 0, 0, 10, 15, 25]),
+            points=rng.randint(0, 1000),
+            rating=Decimal(rng.randint(100, 999)) / 100,
+            total_reviews=rng.randint(0, 5000),
+        ))
+    for hotel in hotels:
+        # bulk_create skips save(), which normally keeps the rank score current
+        hotel.rank_score = ranking.score(hotel)
+    Hotel.objects.bulk_create(hotels, batch_size=batch_size)
+    return count
+
+
+def timed(fn, runs):
+    """Run ``fn`` ``runs`` times; return (median seconds, last result)"""
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2], result
@@ -0,0 +1,37 @@
+# backend/hotels/management/commands/bench_destination_search.py
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from hotels.models import Hotel
+from hotels.search import filter_destination, fts_available
+from ._bench import rolled_back, seed_hotels, timed
+
+
+class Command(BaseCommand):
+    help = 'Compare the icontains destination scan against the destination search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=100000)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--terms', nargs='+', default=['istanbul', 'palace', 'ams', 'royal bay', 'zzz'])
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.stdout.write(f"Seeding {options['hotels']} hotels...")
+            seed_hotels(options['hotels'])
+            self.stdout.write(f'FTS index available: {fts_available()}')
+            for term in options['terms']:
+                legacy = Hotel.objects.filter(
+                    Q(is_available=True) &
+                    (Q(city__icontains=term) | Q(country__icontains=term) | Q(name__icontains=term))
+                )
+                indexed = filter_destination(Hotel.objects.filter(is_available=True), term)
+                legacy_time, legacy_ids = timed(lambda: set(legacy.values_list('id', flat=True)), options['runs'])
+                indexed_time, indexed_ids = timed(lambda: set(indexed.values_list('id', flat=True)), options['runs'])
+                self.stdout.write(
+                    f'{term!r:>12}: {len(indexed_ids):>6} hits  '
+                    f'icontains {legacy_time * 1000:8.2f} ms  '
+                    f'index {indexed_time * 1000:8.2f} ms  '
+                    f'speedup {legacy_time / max(indexed_time, 1e-9):6.1f}x  '
+                    f'{"same results" if legacy_ids == indexed_ids else "RESULTS DIFFER"}'
+                )
@@ -0,0 +1,44 @@
+# backend/hotels/management/commands/bench_json.py
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from hotels import renderers
+from hotels.models import Hotel
+from hotels.pagination import MAX_PAGE_SIZE
+from hotels.projections import detail_queryset, hotel_cards, hotel_detail_payload
+from hotels.views import LISTING_ORDERING
+from ._bench import rolled_back, seed_hotels, timed
+
+
+class Command(BaseCommand):
+    help = 'Compare the stock DRF JSON renderer against FastJSONRenderer on hot payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=5000)
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer falls back to the stock path'))
+        with rolled_back():
+            self.stdout.write(f"Seeding {options['hotels']} hotels...")
+            seed_hotels(options['hotels'])
+            listed = Hotel.objects.filter(is_available=True).order_by(*LISTING_ORDERING)
+            payloads = {
+                'weekend': hotel_cards(listed[:10]),
+                'search page': hotel_cards(listed[:MAX_PAGE_SIZE]),
+                'detail': hotel_detail_payload(detail_queryset().get(id=listed[0].id)),
+                'all cards': hotel_cards(listed),
+            }
+        stock, fast = JSONRenderer(), renderers.FastJSONRenderer()
+        for name, payload in payloads.items():
+            stock_time, stock_body = timed(lambda: stock.render(payload), options['runs'])
+            fast_time, fast_body = timed(lambda: fast.render(payload), options['runs'])
+            megabytes = len(stock_body) / 1e6
+            self.stdout.write(
+                f'{name:12} {len(stock_body):>10,} B  '
+                f'stock {megabytes / max(stock_time, 1e-9):8.1f} MB/s  '
+                f'fast {megabytes / max(fast_time, 1e-9):8.1f} MB/s  '
+                f'speedup {stock_time / max(fast_time, 1e-9):5.1f}x  '
+                f'{"same bytes" if stock_body == fast_body else "BYTES DIFFER"}'
+            )
@@ -0,0 +1,69 @@
+# backend/hotels/management/commands/bench_pricing.py
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.management.base import BaseCommand
+
+from hotels import pricing
+from hotels.models import Hotel
+from ._bench import rolled_back, seed_hotels, timed
+
+CENT = Decimal('0.01')
+
+
+def legacy_member_price(hotel):
+    # The old Hotel.get_member_price, as written
+    if hotel.member_price:
+        return hotel.member_price
+    return hotel.base_price * 0.9
+
+
+def decimal_prices(hotels):
+    """What the per-hotel Decimal arithmetic costs once it no longer crashes"""
+    prices = {}
+    for hotel in hotels:
+        member = hotel.member_price or (hotel.base_price * Decimal('0.9')).quantize(CENT, ROUND_HALF_UP)
+        discounted = (hotel.base_price * (100 - hotel.special_discount) / 100).quantize(CENT, ROUND_HALF_UP)
+        prices[hotel.id] = (hotel.base_price, member, discounted)
+    return prices
+
+
+class Command(BaseCommand):
+    help = 'Compare Decimal price arithmetic against the integer-cent pricing engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=50000)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.stdout.write(f"Seeding {options['hotels']} hotels...")
+            seed_hotels(options['hotels'])
+            # A third of the hotels set an explicit member price
+            ids = list(Hotel.objects.values_list('id', flat=True)[::3])
+            Hotel.objects.filter(id__in=ids).update(member_price=Decimal('49.99'))
+            
+            crashes = 0
+            for hotel in Hotel.objects.all():
+                try:
+                    legacy_member_price(hotel)
+                except TypeError:
+                    crashes += 1
+            self.stdout.write(f'Legacy get_member_price raises TypeError for {crashes} hotel(s)')
+            
+            # Both sides price the same loaded instances, so only the arithmetic is timed.
+            # Integer cents buy exact, crash-free prices, not speed: a ratio below 1 means cents is slower.
+            hotels = list(Hotel.objects.all())
+            legacy_time, legacy = timed(lambda: decimal_prices(hotels), options['runs'])
+            cents_time, quotes = timed(
+                lambda: {hotel.id: pricing.quote_hotel(hotel) for hotel in hotels}, options['runs']
+            )
+            same = all(
+                tuple(pricing.from_cents(cents) for cents in quotes[hotel_id]) == prices
+                for hotel_id, prices in legacy.items()
+            ) and len(quotes) == len(legacy)
+            self.stdout.write(
+                f'Decimal {legacy_time * 1000:8.1f} ms  '
+                f'cents {cents_time * 1000:8.1f} ms  '
+                f'ratio (Decimal/cents) {legacy_time / max(cents_time, 1e-9):5.2f}  '
+                f'{"same prices" if same else "PRICES DIFFER"}'
+            )
@@ -0,0 +1,20 @@
+# backend/hotels/management/commands/rank_hotels.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from hotels.cache import invalidate_weekend
+from hotels.ranking import rerank, weights
+
+
+class Command(BaseCommand):
+    help = 'Recompute every hotel rank score; run nightly and after changing HOTEL_RANKING_WEIGHTS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = rerank(batch_size=options['batch_size'])
+        if changed:
+            invalidate_weekend()
+        self.stdout.write(self.style.SUCCESS(f'Re-ranked {changed} hotel(s) with weights {weights()}'))
@@ -0,0 +1,25 @@
+# backend/hotels/management/commands/report_seq_scans.py
+from django.core.management.base import BaseCommand
+
+from hotels.query_shapes import explain, hot_queries, sequential_scans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every production query shape and report the ones that fall back to sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan of every query')
+
+    def handle(self, *args, **options):
+        failing = 0
+        for name, queryset in hot_queries().items():
+            plan = explain(queryset)
+            scans = sequential_scans(plan)
+            if scans:
+                failing += 1
+                self.stdout.write(self.style.WARNING(f'{name}: sequential scan on {", ".join(scans)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: indexed'))
+            if options['verbose_plans'] or scans:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+        self.stdout.write(f'{failing} query shape(s) still fall back to sequential scans')
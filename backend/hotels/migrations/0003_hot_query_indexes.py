@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0002_destination_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-points', '-rating'], name='hotel_weekend_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-rating', '-points', 'id'], name='hotel_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hotelimage',
+            index=models.Index(fields=['hotel', '-is_main', '-created_at'], name='hotelimage_main_idx'),
+        ),
+    ]
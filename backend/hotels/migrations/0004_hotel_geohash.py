@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+def backfill_geohash(apps, schema_editor):
+    from hotels import geo
+    Hotel = apps.get_model('hotels', 'Hotel')
+    hotels = list(Hotel.objects.only('id', 'latitude', 'longitude'))
+    for hotel in hotels:
+        hotel.geohash = geo.encode(hotel.latitude, hotel.longitude)
+    Hotel.objects.bulk_update(hotels, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['geohash'], name='hotel_geohash_idx'),
+        ),
+    ]
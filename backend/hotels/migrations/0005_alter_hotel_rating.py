@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0004_hotel_geohash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hotel',
+            name='rating',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=4),
+        ),
+    ]
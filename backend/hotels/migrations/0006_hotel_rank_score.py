@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+
+def backfill_rank_score(apps, schema_editor):
+    from hotels import ranking
+    Hotel = apps.get_model('hotels', 'Hotel')
+    hotels = list(Hotel.objects.only('id', *ranking.INPUT_FIELDS))
+    for hotel in hotels:
+        hotel.rank_score = ranking.score(hotel)
+    Hotel.objects.bulk_update(hotels, ['rank_score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0005_alter_hotel_rating'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='hotel',
+            options={'ordering': ['-rank_score', 'id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='hotel',
+            name='hotel_weekend_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='hotel',
+            name='hotel_search_idx',
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='rank_score',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.RunPython(backfill_rank_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-rank_score', 'id'], name='hotel_rank_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+def backfill_amenity_mask(apps, schema_editor):
+    from hotels.amenities import split_mask
+    Hotel = apps.get_model('hotels', 'Hotel')
+    HotelAmenity = apps.get_model('hotels', 'HotelAmenity')
+    offered = {}
+    for hotel_id, amenity_id in HotelAmenity.objects.values_list('hotel_id', 'amenity_id'):
+        offered.setdefault(hotel_id, []).append(amenity_id)
+    hotels = list(Hotel.objects.filter(id__in=offered).only('id'))
+    for hotel in hotels:
+        hotel.amenity_mask = split_mask(offered[hotel.id])[0]
+    Hotel.objects.bulk_update(hotels, ['amenity_mask'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0006_hotel_rank_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='amenity_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_amenity_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    from hotels.images import content_hash
+    HotelImage = apps.get_model('hotels', 'HotelImage')
+    hashed = []
+    for hotel_image in HotelImage.objects.exclude(image=''):
+        try:
+            hotel_image.content_hash = content_hash(hotel_image.image)
+        except OSError:
+            continue
+        hashed.append(hotel_image)
+    HotelImage.objects.bulk_update(hashed, ['content_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0007_hotel_amenity_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotelimage',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
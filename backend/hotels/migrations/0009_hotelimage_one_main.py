@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+def keep_newest_main(apps, schema_editor):
+    # The newest main photo is the one the site showed (ordering -is_main, -created_at)
+    HotelImage = apps.get_model('hotels', 'HotelImage')
+    seen = set()
+    demote = []
+    for image_id, hotel_id in HotelImage.objects.filter(is_main=True).order_by(
+        'hotel_id', '-created_at', '-id'
+    ).values_list('id', 'hotel_id'):
+        if hotel_id in seen:
+            demote.append(image_id)
+        seen.add(hotel_id)
+    HotelImage.objects.filter(id__in=demote).update(is_main=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0008_hotelimage_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_newest_main, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='hotelimage',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_main', True)), fields=('hotel',), name='hotelimage_one_main'),
+        ),
+    ]
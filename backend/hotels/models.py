@@ -1,5 +1,7 @@
 # backend/hotels/models.py
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from . import geo, images, pricing, ranking
 
 class Hotel(models.Model):
     name = models.CharField(max_length=200)
@@ -9,6 +11,7 @@ class Hotel(models.Model):
     address = models.TextField()
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    geohash = models.CharField(max_length=12, blank=True, default='', editable=False)  # Map index, kept in sync by save()
     
     # Pricing
     base_price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -17,8 +20,10 @@ class Hotel(models.Model):
     
     # Ratings and features
     points = models.PositiveIntegerField(default=0)  # For weekend sorting
-    rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
+    rating = models.DecimalField(max_digits=4, decimal_places=2, default=0.0)  # Review average, up to 10.00
     total_reviews = models.PositiveIntegerField(default=0)
+    rank_score = models.FloatField(default=0.0, editable=False)  # Listing order, see ranking.py
+    amenity_mask = models.BigIntegerField(default=0, editable=False)  # Bit id-1 per amenity, see amenities.py
     
     # Status
     is_available = models.BooleanField(default=True)
@@ -27,16 +32,38 @@ class Hotel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-points', '-rating']
+        ordering = ['-rank_score', 'id']
+        indexes = [
+            # Weekend and search are both top-N range scans of this one partial index
+            models.Index(
+                fields=['-rank_score', 'id'], name='hotel_rank_idx',
+                condition=models.Q(is_available=True),
+            ),
+            # Not partial: each OR'ed geohash range must be able to use it on its own
+            models.Index(fields=['geohash'], name='hotel_geohash_idx'),
+        ]
     
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        """Keep the geohash map index and the rank score in sync with their inputs"""
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        self.rank_score = ranking.score(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'latitude', 'longitude'} & update_fields:
+                update_fields.add('geohash')
+            if set(ranking.INPUT_FIELDS) & update_fields:
+                update_fields.add('rank_score')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+    
     def get_member_price(self):
         """Calculate member price (10% discount if not explicitly set)"""
-        if self.member_price:
-            return self.member_price
-        return self.base_price * 0.9
+        return pricing.from_cents(pricing.quote_hotel(self).member)
 
 class Amenity(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -63,10 +90,46 @@ class HotelImage(models.Model):
     image = models.ImageField(upload_to='hotel_images/')
     caption = models.CharField(max_length=200, blank=True)
     is_main = models.BooleanField(default=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False, db_index=True)  # Names derivatives
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-is_main', '-created_at']
+        indexes = [
+            # Serves images.filter(is_main=True).first() without a sort
+            models.Index(fields=['hotel', '-is_main', '-created_at'], name='hotelimage_main_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hotel'], condition=models.Q(is_main=True), name='hotelimage_one_main',
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.hotel.name} - Image"
\ No newline at end of file
+        return f"{self.hotel.name} - Image"
+    
+    def get_constraints(self):
+        # Forms validate constraints before save() gets to demote the old main photo, so promoting
+        # a new one would always fail there; the database still enforces one main photo per hotel
+        return [
+            (model, [constraint for constraint in constraints if constraint.name != 'hotelimage_one_main'])
+            for model, constraints in super().get_constraints()
+        ]
+    
+    def save(self, *args, **kwargs):
+        """Hash new uploads for content-addressed derivatives; keep one main photo per hotel"""
+        previous_hash = self.content_hash
+        if self.image and (not self.image._committed or not self.content_hash):
+            try:
+                self.content_hash = images.content_hash(self.image)
+            except OSError:
+                self.content_hash = ''  # File missing from storage; originals only
+        with transaction.atomic():
+            if self.is_main:
+                # Promoting a photo demotes the previous main one
+                HotelImage.objects.filter(hotel_id=self.hotel_id, is_main=True).exclude(pk=self.pk).update(is_main=False)
+            super().save(*args, **kwargs)
+        if self.content_hash != previous_hash and getattr(settings, 'HOTEL_IMAGE_PREGENERATE', False):
+            # Resizing stays off the request; the worker pool renders every variant
+            from tasks.queue import enqueue
+            enqueue('hotels.generate_image_derivatives', args=[self.id])
\ No newline at end of file
@@ -0,0 +1,138 @@
+# backend/hotels/pagination.py
+"""Keyset (cursor) pagination helpers.
+
+A cursor is the ordering-key values of the last row on a page, JSON encoded
+and base64'd so clients treat it as opaque. The next page is fetched with a
+``WHERE (key) < (cursor)`` style filter instead of OFFSET, so deep pages cost
+the same as the first one. Cursors come back from clients, so every value
+is checked against the type of its ordering field before it reaches a query.
+"""
+import base64
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidPage(ValueError):
+    pass
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values):
+    raw = json.dumps([_plain(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _is_decimal(value):
+    try:
+        return isinstance(value, str) and Decimal(value).is_finite()
+    except InvalidOperation:
+        return False
+
+
+def _is_iso(parse):
+    def check(value):
+        try:
+            parse(value)
+        except (TypeError, ValueError):
+            return False
+        return isinstance(value, str)
+    return check
+
+
+_VALUE_CHECKS = {
+    # Bounded to 64 bits: larger ints overflow the database driver
+    'int': lambda value: isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63,
+    'number': _is_number,
+    'decimal': _is_decimal,
+    'datetime': _is_iso(datetime.fromisoformat),
+    'date': _is_iso(date.fromisoformat),
+}
+
+
+def _value_kind(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return 'number'  # Annotations such as search_rank are scores
+    internal_type = field.get_internal_type()
+    if internal_type in ('DateTimeField', 'DateField', 'DecimalField'):
+        return internal_type[:-len('Field')].lower()
+    if internal_type.endswith(('AutoField', 'IntegerField')) or field.is_relation:
+        return 'int'
+    return 'number'
+
+
+def decode_cursor(cursor, ordering, model):
+    """Decode ``cursor`` into a list of values matching ``ordering`` on ``model``"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor('Cursor does not match ordering')
+    for field, value in zip(ordering, values):
+        if not _VALUE_CHECKS[_value_kind(model, field.lstrip('-'))](value):
+            raise InvalidCursor('Cursor does not match ordering')
+    return values
+
+
+def keyset_filter(ordering, values):
+    """Build a Q selecting rows strictly after ``values`` in ``ordering``"""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def cursor_for(obj, ordering):
+    return encode_cursor([getattr(obj, field.lstrip('-')) for field in ordering])
+
+
+def parse_limit(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if raw in (None, ''):
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise InvalidPage('limit must be an integer')
+    return max(1, min(limit, maximum))
+
+
+def paginate(queryset, ordering, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return ``(rows, next_cursor)`` for one keyset page of ``queryset``"""
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(keyset_filter(ordering, decode_cursor(cursor, ordering, queryset.model)))
+    rows = list(queryset[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, cursor_for(rows[-1], ordering)
@@ -0,0 +1,57 @@
+# backend/hotels/pricing.py
+"""Hotel price calculations in integer cents.
+
+Prices are stored as ``Decimal``; all arithmetic here runs on integer cents
+with explicit half-up rounding, so results are exact and the same wherever a
+hotel is priced: result cards, the detail page and bookings.
+"""
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+CENT = Decimal('0.01')
+# Members pay this share of the base price unless the hotel sets member_price
+MEMBER_RATE_PERCENT = 90
+# Hotel columns a quote reads
+PRICE_FIELDS = ('base_price', 'member_price', 'special_discount')
+
+# Per-night prices, in cents
+Quote = namedtuple('Quote', ['base', 'member', 'discounted'])
+Stay = namedtuple('Stay', ['nights', 'total'])
+
+
+def to_cents(amount):
+    if not isinstance(amount, Decimal):
+        amount = Decimal(amount)
+    return int(amount.scaleb(2).to_integral_value(ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return Decimal(cents).scaleb(-2).quantize(CENT)
+
+
+def display(cents):
+    """Price as the float our JSON payloads carry"""
+    return cents / 100
+
+
+def percent_of(cents, percent):
+    """``percent``% of a non-negative amount, rounded half-up to the cent"""
+    return (cents * percent + 50) // 100
+
+
+def quote(base_price, member_price, special_discount):
+    base = to_cents(base_price)
+    member = to_cents(member_price) if member_price else percent_of(base, MEMBER_RATE_PERCENT)
+    discounted = percent_of(base, 100 - min(special_discount or 0, 100))
+    return Quote(base, member, discounted)
+
+
+def quote_hotel(hotel):
+    return quote(hotel.base_price, hotel.member_price, hotel.special_discount)
+
+
+def price_stay(hotel_quote, check_in, check_out):
+    """Number of nights from ``check_in`` to ``check_out`` and the stay's total, in cents"""
+    # Every night costs the same today; seasonal rates would price night by night here
+    nights = (check_out - check_in).days
+    return Stay(nights, Quote(hotel_quote.base * nights, hotel_quote.member * nights, hotel_quote.discounted * nights))
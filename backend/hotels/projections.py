@@ -0,0 +1,197 @@
+# backend/hotels/projections.py
+"""Shared hotel payload builders for the public hotel endpoints.
+
+Every list endpoint goes through ``card_queryset`` so amenities and main
+photos arrive in one prefetch query each, no matter how many hotels are
+returned. Clients may ask for a sparse fieldset (``?fields=`` /
+``?exclude=``); the queryset then loads only the columns and relations those
+fields read, so a list without ``description`` never selects it.
+"""
+import hashlib
+
+from django.db.models import Prefetch
+from reviews.stats import summary as review_summary
+from . import images, pricing
+from .models import Hotel, HotelAmenity, HotelImage
+
+# Part of the detail ETag: bump when the payload format changes so clients refetch
+PAYLOAD_VERSION = 1
+
+# Card fields in payload order, each with the Hotel columns it reads.
+# Amenities and the main image come from prefetches, not columns.
+CARD_COLUMNS = {
+    'id': ('id',),
+    'name': ('name',),
+    'city': ('city',),
+    'country': ('country',),
+    'base_price': pricing.PRICE_FIELDS,
+    'member_price_display': pricing.PRICE_FIELDS,
+    'discounted_price': pricing.PRICE_FIELDS,
+    'is_flagged': ('is_flagged',),
+    'special_discount': ('special_discount',),
+    'rating': ('rating',),
+    'total_reviews': ('total_reviews',),
+    'description': ('description',),
+    'latitude': ('latitude',),
+    'longitude': ('longitude',),
+    'amenities': (),
+    'main_image': (),
+}
+CARD_FIELDS = tuple(CARD_COLUMNS)
+DETAIL_FIELDS = CARD_FIELDS + ('address', 'images', 'review_summary')
+_PRICED_FIELDS = frozenset(('base_price', 'member_price_display', 'discounted_price'))
+
+
+def _amenity_prefetch():
+    return Prefetch(
+        'amenities',
+        queryset=HotelAmenity.objects.select_related('amenity').order_by('id'),
+    )
+
+
+def _main_image_prefetch():
+    # At most one row per hotel (the hotelimage_one_main constraint), so nothing to sort
+    return Prefetch('images', queryset=HotelImage.objects.filter(is_main=True).order_by(), to_attr='main_images')
+
+
+def _names(raw):
+    return {name.strip() for name in (raw or '').split(',') if name.strip()}
+
+
+def parse_fieldset(params, available):
+    """The payload fields selected by ``?fields=`` and ``?exclude=``, in payload order
+
+    Returns None when every field in ``available`` is wanted. ``id`` is always
+    kept so clients can match records up. Unknown names raise ValueError.
+    """
+    requested, excluded = _names(params.get('fields')), _names(params.get('exclude'))
+    unknown = (requested | excluded).difference(available)
+    if unknown:
+        raise ValueError(f'Unknown field(s): {", ".join(sorted(unknown))}')
+    wanted = ((requested or set(available)) - excluded) | {'id'}
+    if wanted.issuperset(available):
+        return None
+    return tuple(name for name in available if name in wanted)
+
+
+def fieldset_key(fields):
+    """A short, stable tag for a fieldset, for cache keys and ETags; '' for the full payload"""
+    if fields is None:
+        return ''
+    return hashlib.md5(','.join(fields).encode()).hexdigest()[:8]
+
+
+def pick(payload, fields):
+    """``payload`` cut down to ``fields``; the full payload when ``fields`` is None"""
+    if fields is None:
+        return payload
+    return {name: payload[name] for name in fields if name in payload}
+
+
+def card_queryset(queryset=None, fields=None, keep=()):
+    """Hotels with everything a result card needs prefetched (3 queries total)
+
+    With a sparse ``fields`` tuple only the columns (plus ``keep``, e.g. the
+    keyset ordering) and prefetches those fields read are loaded.
+    """
+    if queryset is None:
+        queryset = Hotel.objects.all()
+    if fields is None:
+        return queryset.prefetch_related(_amenity_prefetch(), _main_image_prefetch())
+    columns = {column for name in fields for column in CARD_COLUMNS[name]}
+    prefetches = []
+    if 'amenities' in fields:
+        prefetches.append(_amenity_prefetch())
+    if 'main_image' in fields:
+        prefetches.append(_main_image_prefetch())
+    return queryset.only(*sorted(columns.union(keep))).prefetch_related(*prefetches)
+
+
+def detail_queryset(queryset=None):
+    """Hotels with review stats joined and amenities and images prefetched (3 queries total)"""
+    if queryset is None:
+        queryset = Hotel.objects.all()
+    # The main photo is picked out of the full image prefetch, not fetched again
+    return queryset.select_related('review_stats').prefetch_related(
+        _amenity_prefetch(), Prefetch('images', queryset=HotelImage.objects.all())
+    )
+
+
+def main_image(hotel):
+    """The hotel's main photo from whichever prefetch ran; one query if none did"""
+    if hasattr(hotel, 'main_images'):
+        return hotel.main_images[0] if hotel.main_images else None
+    if 'images' in getattr(hotel, '_prefetched_objects_cache', {}):
+        return next((image for image in hotel.images.all() if image.is_main), None)
+    return hotel.images.filter(is_main=True).first()
+
+
+def main_image_sources(hotel, absolute=None):
+    image = main_image(hotel)
+    return images.image_sources(image, absolute) if image is not None else None
+
+
+def amenity_list(hotel):
+    return [
+        {'id': hotel_amenity.amenity.id, 'name': hotel_amenity.amenity.name}
+        for hotel_amenity in hotel.amenities.all()
+    ]
+
+
+def _coordinate(value):
+    return str(value) if value is not None else None
+
+
+# How each card field is read off a hotel and its price quote
+_CARD_VALUES = {
+    'id': lambda hotel, quote: hotel.id,
+    'name': lambda hotel, quote: hotel.name,
+    'city': lambda hotel, quote: hotel.city,
+    'country': lambda hotel, quote: hotel.country,
+    'base_price': lambda hotel, quote: pricing.display(quote.base),
+    'member_price_display': lambda hotel, quote: pricing.display(quote.member),
+    'discounted_price': lambda hotel, quote: pricing.display(quote.discounted),
+    'is_flagged': lambda hotel, quote: hotel.is_flagged,
+    'special_discount': lambda hotel, quote: hotel.special_discount,
+    'rating': lambda hotel, quote: float(hotel.rating),
+    'total_reviews': lambda hotel, quote: hotel.total_reviews,
+    'description': lambda hotel, quote: hotel.description,
+    'latitude': lambda hotel, quote: _coordinate(hotel.latitude),
+    'longitude': lambda hotel, quote: _coordinate(hotel.longitude),
+    'amenities': lambda hotel, quote: amenity_list(hotel),
+    'main_image': lambda hotel, quote: main_image_sources(hotel),
+}
+
+
+def hotel_card(hotel, fields=None):
+    """Compact hotel payload used by weekend and search results
+
+    A sparse ``fields`` tuple builds only those keys and touches only the
+    attributes they need, so deferred columns are never loaded one by one.
+    """
+    fields = fields or CARD_FIELDS
+    quote = pricing.quote_hotel(hotel) if _PRICED_FIELDS.intersection(fields) else None
+    return {name: _CARD_VALUES[name](hotel, quote) for name in fields}
+
+
+def hotel_detail_payload(hotel):
+    """Full hotel payload used by the detail page"""
+    payload = hotel_card(hotel)
+    payload['address'] = hotel.address
+    payload['images'] = [
+        {
+            'id': image.id,
+            'image': image.image.url if image.image else '',
+            **images.image_sources(image),
+            'caption': image.caption,
+            'is_main': image.is_main,
+        }
+        for image in hotel.images.all()
+    ]
+    payload['review_summary'] = review_summary(getattr(hotel, 'review_stats', None))
+    return payload
+
+
+def hotel_cards(queryset, fields=None):
+    """Build cards for every hotel in ``queryset`` in a constant number of queries"""
+    return [hotel_card(hotel, fields) for hotel in card_queryset(queryset, fields)]
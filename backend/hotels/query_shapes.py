@@ -0,0 +1,58 @@
+# backend/hotels/query_shapes.py
+"""The query shapes our public endpoints send to the database.
+
+Kept in one place so the EXPLAIN-based tests and the ``report_seq_scans``
+command check exactly what production runs.
+"""
+import re
+
+from django.db import connection
+
+from . import geo
+from .models import Hotel, HotelAmenity, HotelImage
+from .pagination import DEFAULT_PAGE_SIZE, keyset_filter
+from .views import LISTING_ORDERING
+from reviews.views import REVIEW_ORDERING, REVIEW_PAGE_SIZE
+from users.models import Review
+
+_SQLITE_FULL_SCAN = re.compile(r'\bSCAN (\w+)\s*$', re.MULTILINE)
+_POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def hot_queries():
+    available = Hotel.objects.filter(is_available=True)
+    return {
+        'weekend': available.order_by(*LISTING_ORDERING)[:10],
+        'search_first_page': available.order_by(*LISTING_ORDERING)[:DEFAULT_PAGE_SIZE + 1],
+        'search_next_page': available.filter(
+            keyset_filter(LISTING_ORDERING, [250.5, 1])
+        ).order_by(*LISTING_ORDERING)[:DEFAULT_PAGE_SIZE + 1],
+        'detail': available.filter(id=1),
+        'map_viewport': available.filter(geo.bbox_q(40.8, 28.6, 41.3, 29.4)).order_by().values_list(
+            'id', 'latitude', 'longitude', 'base_price', 'rating'
+        ),
+        'main_image_prefetch': HotelImage.objects.filter(hotel_id__in=[1, 2, 3], is_main=True).order_by(),
+        'amenity_prefetch': HotelAmenity.objects.filter(hotel_id__in=[1, 2, 3]),
+        'image_prefetch': HotelImage.objects.filter(hotel_id__in=[1, 2, 3]),
+        'review_next_page': Review.objects.filter(hotel_id=1).filter(
+            keyset_filter(REVIEW_ORDERING, ['2030-01-01T00:00:00+00:00', 1])
+        ).order_by(*REVIEW_ORDERING)[:REVIEW_PAGE_SIZE + 1],
+    }
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        # Tiny tables are always seq-scanned; ask whether an index *could* serve the query
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            try:
+                return queryset.explain()
+            finally:
+                cursor.execute('SET enable_seqscan = on')
+    return queryset.explain()
+
+
+def sequential_scans(plan):
+    """Tables read with a full sequential scan according to ``plan``"""
+    pattern = _POSTGRES_SEQ_SCAN if connection.vendor == 'postgresql' else _SQLITE_FULL_SCAN
+    return sorted(set(pattern.findall(plan)))
@@ -0,0 +1,72 @@
+# backend/hotels/ranking.py
+"""Materialized listing rank.
+
+Weekend and search results both order by ``Hotel.rank_score``, a weighted sum
+of points, rating, review volume, discount and recency. The score is written
+by ``Hotel.save()``, by review aggregate updates and, for every hotel at
+once, by the ``rank_hotels`` command. Recency decays daily and weights may be
+changed in settings, so ``rank_hotels`` should run nightly and after any
+change to ``HOTEL_RANKING_WEIGHTS``.
+"""
+import math
+
+from django.conf import settings
+from django.utils import timezone
+
+DEFAULT_WEIGHTS = {
+    'points': 1.0,       # per point
+    'rating': 20.0,      # per rating point (0-10)
+    'reviews': 25.0,     # per decade of review count
+    'discount': 1.0,     # per discount percent
+    'recency': 50.0,     # for a hotel listed today, decaying to 0
+}
+DEFAULT_RECENCY_DAYS = 90
+# Fields the score depends on; saving any of them must refresh it
+INPUT_FIELDS = ('points', 'rating', 'total_reviews', 'special_discount', 'created_at')
+
+
+def weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'HOTEL_RANKING_WEIGHTS', {})}
+
+
+def score(hotel, today=None, policy=None):
+    """Rank score of ``hotel`` (only ``INPUT_FIELDS`` are read)"""
+    if policy is None:
+        policy = weights()
+    if today is None:
+        today = timezone.localdate()
+    recency_days = getattr(settings, 'HOTEL_RANKING_RECENCY_DAYS', DEFAULT_RECENCY_DAYS)
+    listed = timezone.localdate(hotel.created_at) if hotel.created_at else today
+    freshness = max(0.0, 1.0 - (today - listed).days / recency_days)
+    return round(
+        policy['points'] * hotel.points
+        + policy['rating'] * float(hotel.rating)
+        + policy['reviews'] * math.log10(1 + hotel.total_reviews)
+        + policy['discount'] * hotel.special_discount
+        + policy['recency'] * freshness,
+        6,
+    )
+
+
+def rerank(queryset=None, batch_size=1000):
+    """Recompute ``rank_score`` for ``queryset`` (default: every hotel); return the number changed"""
+    from .models import Hotel
+
+    if queryset is None:
+        queryset = Hotel.objects.all()
+    today, policy = timezone.localdate(), weights()
+    changed = []
+    updated = 0
+    # Iterate in id order: walking the rank index while rewriting it could revisit rows
+    hotels = queryset.only('id', 'rank_score', *INPUT_FIELDS).order_by('id')
+    for hotel in hotels.iterator(chunk_size=batch_size):
+        new_score = score(hotel, today, policy)
+        if new_score != hotel.rank_score:
+            hotel.rank_score = new_score
+            changed.append(hotel)
+        if len(changed) >= batch_size:
+            Hotel.objects.bulk_update(changed, ['rank_score'])
+            updated += len(changed)
+            changed = []
+    Hotel.objects.bulk_update(changed, ['rank_score'])
+    return updated + len(changed)
@@ -0,0 +1,60 @@
+# backend/hotels/renderers.py
+"""Fast JSON encoding for API responses.
+
+``dumps`` and ``FastJSONRenderer`` encode with orjson when it is installed
+and fall back to DRF's ``JSONRenderer`` otherwise. The bytes are the same
+either way: Decimals become numbers, and datetimes are handed to DRF's
+encoder so they keep its millisecond, ``Z``-suffixed format.
+"""
+import decimal
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional; everything works without it, only slower
+    orjson = None
+
+_drf_encoder = JSONEncoder()
+# Valid JSON, but DRF escapes them because pre-ES2019 JavaScript could not embed them
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def _default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return _drf_encoder.default(obj)
+
+
+def dumps(data):
+    """``data`` as compact UTF-8 JSON bytes"""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    body = orjson.dumps(
+        data, default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in body:
+            body = body.replace(raw, escaped)
+    return body
+
+
+def loads(body):
+    """Decode JSON bytes, e.g. a cached body that has to be trimmed before it is sent"""
+    if orjson is None:
+        return json.loads(body)
+    return orjson.loads(body)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that encodes through ``dumps``; indented output keeps the stock path"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,178 @@
+# backend/hotels/search.py
+"""Destination search backed by a real text index.
+
+SQLite: an FTS5 table using the trigram tokenizer mirrors ``name``, ``city``
+and ``country`` through triggers. Trigram phrase queries give the same
+case-insensitive substring semantics as ``icontains`` but are answered from
+the index instead of scanning every row.
+
+PostgreSQL: GIN trigram indexes on ``UPPER(col)`` make Django's own
+``icontains``/``istartswith`` SQL index-eligible, so the ORM filter is kept
+and only ranking is added.
+
+Any other backend (or a SQLite build without FTS5 trigram) falls back to the
+plain ``icontains`` scan.
+"""
+from django.db import connection
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.expressions import Func, RawSQL
+
+FTS_TABLE = 'hotels_hotel_fts'
+SEARCH_COLUMNS = ('name', 'city', 'country')
+# bm25 column weights: a hit in the hotel name beats one in the city or country
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+# The trigram tokenizer can only use the index for terms of 3+ characters
+MIN_INDEXED_LENGTH = 3
+
+_SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON hotels_hotel BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, city, country)
+            VALUES (new.id, new.name, new.city, new.country);
+        END""",
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON hotels_hotel BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        END""",
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, city, country ON hotels_hotel BEGIN
+            UPDATE {FTS_TABLE} SET name = new.name, city = new.city, country = new.country
+            WHERE rowid = old.id;
+        END""",
+}
+
+_POSTGRES_INDEXES = [
+    f'CREATE INDEX IF NOT EXISTS hotels_hotel_{column}_trgm '
+    f'ON hotels_hotel USING gin (UPPER({column}::text) gin_trgm_ops)'
+    for column in SEARCH_COLUMNS
+]
+
+_fts_available = None
+
+
+def install_search_index(conn=connection):
+    """Create the vendor-specific destination index; safe to run repeatedly"""
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            _install_sqlite(conn, cursor)
+        elif conn.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for statement in _POSTGRES_INDEXES:
+                cursor.execute(statement)
+
+
+def _install_sqlite(conn, cursor):
+    global _fts_available
+    tables = conn.introspection.table_names(cursor)
+    if 'hotels_hotel' not in tables:
+        return
+    if FTS_TABLE not in tables:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(name, city, country, tokenize='trigram')"
+            )
+        except Exception:
+            # SQLite older than 3.34 has no trigram tokenizer; keep using icontains
+            _fts_available = False
+            return
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'hotels_hotel'")
+    existing = {row[0] for row in cursor.fetchall()}
+    if set(_SQLITE_TRIGGERS) - existing:
+        # Rebuilding hotels_hotel (e.g. an AddField migration) drops its
+        # triggers, so resync the whole index before reinstalling them.
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, name, city, country) '
+            f'SELECT id, name, city, country FROM hotels_hotel'
+        )
+        for statement in _SQLITE_TRIGGERS.values():
+            cursor.execute(statement)
+    _fts_available = True
+
+
+def uninstall_search_index(conn=connection):
+    global _fts_available
+    _fts_available = None
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            for trigger in _SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif conn.vendor == 'postgresql':
+            for column in SEARCH_COLUMNS:
+                cursor.execute(f'DROP INDEX IF EXISTS hotels_hotel_{column}_trgm')
+
+
+def fts_available():
+    global _fts_available
+    if connection.vendor != 'sqlite':
+        return False
+    if _fts_available is None:
+        _fts_available = FTS_TABLE in connection.introspection.table_names()
+    return _fts_available
+
+
+def _phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _contains_q(term):
+    return Q(city__icontains=term) | Q(country__icontains=term) | Q(name__icontains=term)
+
+
+def _prefix_q(term):
+    # Prefix of the whole value or of any later word in it
+    query = Q()
+    for column in SEARCH_COLUMNS:
+        query |= Q(**{f'{column}__istartswith': term}) | Q(**{f'{column}__icontains': ' ' + term})
+    return query
+
+
+def _use_fts(term):
+    return len(term) >= MIN_INDEXED_LENGTH and fts_available()
+
+
+def filter_destination(queryset, term, prefix=False):
+    """Restrict ``queryset`` to hotels whose name, city or country contains ``term``
+
+    With ``prefix=True`` only values (or words within them) starting with
+    ``term`` match, which is what autocomplete wants.
+    """
+    if not term:
+        return queryset
+    query = _prefix_q(term) if prefix else _contains_q(term)
+    if _use_fts(term):
+        # The FTS lookup narrows to candidates via the index; the ORM filter
+        # keeps exact icontains semantics on that small set.
+        queryset = queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_phrase(term)]
+        ))
+    return queryset.filter(query)
+
+
+class _Similarity(Func):
+    function = 'SIMILARITY'
+    output_field = FloatField()
+
+
+def rank_destination(queryset, term, prefix=False):
+    """Filter like ``filter_destination`` and annotate ``search_rank`` (lower is better)"""
+    queryset = filter_destination(queryset, term, prefix=prefix)
+    if term and _use_fts(term):
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        rank = RawSQL(
+            f'SELECT bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = hotels_hotel.id',
+            [_phrase(term)],
+            output_field=FloatField(),
+        )
+    elif term and connection.vendor == 'postgresql':
+        similarity = sum(
+            (_Similarity(F(column), Value(term)) * Value(weight)
+             for column, weight in zip(SEARCH_COLUMNS, FTS_WEIGHTS)),
+            Value(0.0),
+        )
+        rank = ExpressionWrapper(-similarity, output_field=FloatField())
+    else:
+        rank = Value(0.0, output_field=FloatField())
+    return queryset.annotate(search_rank=rank)
@@ -1,16 +1,36 @@
 # backend/hotels/serializers.py
 from rest_framework import serializers
+from . import images, projections
 from .models import Hotel, HotelImage, Amenity, HotelAmenity
 
+
+def _absolute(serializer):
+    request = serializer.context.get('request')
+    return request.build_absolute_uri if request else None
+
+
+def _main_image_sources(serializer, obj):
+    """Resized main photo: a card-sized ``src`` plus JPEG and WebP srcsets
+
+    Serialize querysets from ``projections.card_queryset`` so this reads the
+    prefetched main image instead of querying once per hotel.
+    """
+    return projections.main_image_sources(obj, _absolute(serializer))
+
 class AmenitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Amenity
         fields = ['id', 'name', 'icon']
 
 class HotelImageSerializer(serializers.ModelSerializer):
+    sources = serializers.SerializerMethodField()
+    
     class Meta:
         model = HotelImage
-        fields = ['id', 'image', 'caption', 'is_main']
+        fields = ['id', 'image', 'sources', 'caption', 'is_main']
+    
+    def get_sources(self, obj):
+        return images.image_sources(obj, _absolute(self))
 
 class HotelListSerializer(serializers.ModelSerializer):
     """Simplified serializer for hotel lists (homepage, search results)"""
@@ -39,13 +59,8 @@ class HotelListSerializer(serializers.ModelSerializer):
         ]
     
     def get_main_image(self, obj):
-        """Get main hotel image URL"""
-        main_image = obj.images.filter(is_main=True).first()
-        if main_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(main_image.image.url)
-        return None
+        """Get the resized main hotel image (never the original upload)"""
+        return _main_image_sources(self, obj)
     
     def get_member_price_display(self, obj):
         """Calculate member price"""
@@ -81,12 +96,8 @@ class HotelDetailSerializer(serializers.ModelSerializer):
         ]
     
     def get_main_image(self, obj):
-        main_image = obj.images.filter(is_main=True).first()
-        if main_image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(main_image.image.url)
-        return None
+        """Get the resized main hotel image (never the original upload)"""
+        return _main_image_sources(self, obj)
     
     def get_member_price_display(self, obj):
         return obj.get_member_price()
\ No newline at end of file
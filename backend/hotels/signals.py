@@ -0,0 +1,142 @@
+# backend/hotels/signals.py
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .amenities import sync_amenity_mask
+from .cache import invalidate_weekend
+from .clusters import index as cluster_index
+from .facets import index as facet_index
+from .models import Amenity, Hotel, HotelAmenity, HotelImage
+from .suggest import index as suggestion_index
+
+# In-process indexes patched per hotel; unbuilt ones are built lazily on first use.
+# Patches wait for the commit, so a rolled-back write never reaches them.
+IN_MEMORY_INDEXES = (suggestion_index, cluster_index, facet_index)
+
+
+def _update_indexes(hotel):
+    for index in IN_MEMORY_INDEXES:
+        if index.built_at is not None:
+            index.update_hotel(hotel)
+
+
+def _remove_from_indexes(hotel_id):
+    for index in IN_MEMORY_INDEXES:
+        if index.built_at is not None:
+            index.remove_hotel(hotel_id)
+
+
+def reindex_hotels(hotel_ids):
+    """Re-read ``hotel_ids`` into the built indexes once the transaction commits
+
+    For ``update()``/``bulk_update()`` writes, which send no signals.
+    """
+    hotel_ids = list(hotel_ids)
+
+    def patch():
+        if all(index.built_at is None for index in IN_MEMORY_INDEXES):
+            return
+        for start in range(0, len(hotel_ids), 500):
+            chunk = hotel_ids[start:start + 500]
+            hotels = Hotel.objects.in_bulk(chunk)
+            for hotel_id in chunk:
+                if hotel_id in hotels:
+                    _update_indexes(hotels[hotel_id])
+                else:
+                    _remove_from_indexes(hotel_id)
+    transaction.on_commit(patch)
+
+
+@receiver(post_save, sender=Hotel)
+def update_in_memory_indexes(sender, instance, **kwargs):
+    transaction.on_commit(lambda: _update_indexes(instance))
+
+
+@receiver(post_delete, sender=Hotel)
+def remove_from_in_memory_indexes(sender, instance, **kwargs):
+    hotel_id = instance.id  # Cleared on the instance once the delete finishes
+    transaction.on_commit(lambda: _remove_from_indexes(hotel_id))
+
+
+@receiver(post_save, sender=HotelAmenity)
+def add_amenity(sender, instance, **kwargs):
+    _sync_mask(instance)
+    _set_facet_amenity(instance.hotel_id, instance.amenity_id, True)
+
+
+@receiver(post_delete, sender=HotelAmenity)
+def remove_amenity(sender, instance, origin=None, **kwargs):
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if not issubclass(origin_model, Hotel):  # Otherwise the hotel row is going too
+        _sync_mask(instance)
+    _set_facet_amenity(instance.hotel_id, instance.amenity_id, False)
+
+
+def _set_facet_amenity(hotel_id, amenity_id, present):
+    def patch():
+        if facet_index.built_at is not None:
+            facet_index.set_amenity(hotel_id, amenity_id, present)
+    transaction.on_commit(patch)
+
+
+@receiver(post_save, sender=Hotel)
+def resync_amenity_mask(sender, instance, created, update_fields=None, **kwargs):
+    # The mask is derived from HotelAmenity rows; a stale instance may just have written an old one.
+    # New hotels start with none, unless the instance re-inserted a deleted row.
+    if (update_fields is None or 'amenity_mask' in update_fields) and (instance.amenity_mask or not created):
+        instance.amenity_mask = sync_amenity_mask(instance.id)
+
+
+def _sync_mask(hotel_amenity):
+    # Recomputed rather than flipped, so inline edits that swap an amenity stay exact
+    mask = sync_amenity_mask(hotel_amenity.hotel_id)
+    if HotelAmenity.hotel.is_cached(hotel_amenity):
+        hotel_amenity.hotel.amenity_mask = mask
+
+
+@receiver(post_save, sender=Amenity)
+def rename_facet_amenity(sender, instance, **kwargs):
+    amenity_id, name = instance.id, instance.name
+
+    def patch():
+        if facet_index.built_at is not None:
+            facet_index.rename_amenity(amenity_id, name)
+    transaction.on_commit(patch)
+
+
+def _touch(hotels):
+    # Queryset updates skip auto_now; the detail ETag is derived from updated_at
+    hotels.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=HotelImage)
+@receiver(post_save, sender=HotelAmenity)
+def touch_hotel(sender, instance, **kwargs):
+    _touch(Hotel.objects.filter(id=instance.hotel_id))
+
+
+@receiver(post_delete, sender=HotelImage)
+@receiver(post_delete, sender=HotelAmenity)
+def touch_hotel_on_delete(sender, instance, origin=None, **kwargs):
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if not issubclass(origin_model, Hotel):  # Otherwise the hotel row is going too
+        _touch(Hotel.objects.filter(id=instance.hotel_id))
+
+
+@receiver(post_save, sender=Amenity)
+def touch_hotels_with_amenity(sender, instance, created, **kwargs):
+    if not created:  # A renamed amenity changes every page that lists it
+        _touch(Hotel.objects.filter(amenities__amenity=instance))
+
+
+def invalidate_listing_caches(sender, **kwargs):
+    # After commit: a rebuild between the bump and the commit would store old rows under the new generation
+    transaction.on_commit(invalidate_weekend)
+
+
+for model in (Hotel, Amenity, HotelAmenity, HotelImage):
+    post_save.connect(invalidate_listing_caches, sender=model, dispatch_uid=f'listing_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_listing_caches, sender=model, dispatch_uid=f'listing_cache_delete_{model.__name__}')
@@ -0,0 +1,190 @@
+# backend/hotels/suggest.py
+"""In-process prefix index for destination autocomplete.
+
+Cities, countries and hotel names of available hotels are folded (case and
+accents removed, Turkish dotted/dotless i unified) and inserted into a trie at
+every word start, so "ist", "İst" and "new y" all resolve without touching the
+database. Each node lazily caches its best suggestions, merged from its
+children's caches; writes only clear the caches along the paths they touch.
+"""
+import threading
+import time
+import unicodedata
+
+from .indexes import RefreshingIndex
+from .models import Hotel
+
+DEFAULT_LIMIT = 8
+CACHED_PER_NODE = 20
+# Keys are only branched this deep; longer queries filter the deepest node
+MAX_DEPTH = 12
+# Cities and countries are more useful completions than single hotels
+KIND_PRIORITY = {'city': 0, 'country': 1, 'hotel': 2}
+
+_DOTLESS = str.maketrans({'ı': 'i'})
+
+
+def fold(text):
+    """Case- and accent-insensitive form used for both keys and queries"""
+    text = unicodedata.normalize('NFKD', text.casefold().translate(_DOTLESS))
+    return ''.join(char for char in text if not unicodedata.combining(char)).strip()
+
+
+def _word_starts(folded):
+    yield folded
+    for index, char in enumerate(folded):
+        if char == ' ' and index + 1 < len(folded) and folded[index + 1] != ' ':
+            yield folded[index + 1:]
+
+
+class _Node:
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = set()
+        self.top = None
+
+
+class SuggestionIndex(RefreshingIndex):
+    max_age_setting = 'HOTEL_SUGGEST_MAX_AGE'
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._root = _Node()
+        self._counts = {}
+        self._hotel_entries = {}
+
+    # Building and incremental maintenance
+
+    def build(self, rows=None):
+        if rows is None:
+            rows = Hotel.objects.filter(is_available=True).values_list('id', 'name', 'city', 'country')
+        # Build off to the side so lookups keep being served meanwhile
+        fresh = SuggestionIndex()
+        for hotel_id, name, city, country in rows:
+            fresh._add(hotel_id, name, city, country)
+        fresh._top(fresh._root)
+        with self._lock:
+            self._root = fresh._root
+            self._counts = fresh._counts
+            self._hotel_entries = fresh._hotel_entries
+            self.built_at = time.monotonic()
+
+    def update_hotel(self, hotel):
+        with self._lock:
+            self._remove(hotel.id)
+            if hotel.is_available:
+                self._add(hotel.id, hotel.name, hotel.city, hotel.country)
+
+    def remove_hotel(self, hotel_id):
+        with self._lock:
+            self._remove(hotel_id)
+
+    def _add(self, hotel_id, name, city, country):
+        entries = [('city', city, None), ('country', country, None), ('hotel', name, hotel_id)]
+        entries = [entry for entry in entries if entry[1]]
+        self._hotel_entries[hotel_id] = entries
+        for entry in entries:
+            self._counts[entry] = self._counts.get(entry, 0) + 1
+            if self._counts[entry] == 1:
+                self._insert(entry)
+            else:
+                self._invalidate(entry)
+
+    def _remove(self, hotel_id):
+        for entry in self._hotel_entries.pop(hotel_id, []):
+            self._counts[entry] -= 1
+            if self._counts[entry] == 0:
+                del self._counts[entry]
+                self._delete(entry)
+            else:
+                self._invalidate(entry)
+
+    def _paths(self, entry):
+        for key in _word_starts(fold(entry[1])):
+            yield key
+
+    def _insert(self, entry):
+        for key in self._paths(entry):
+            node = self._root
+            node.top = None
+            for char in key[:MAX_DEPTH]:
+                node = node.children.setdefault(char, _Node())
+                node.top = None
+            node.entries.add((key, entry))
+
+    def _delete(self, entry):
+        for key in self._paths(entry):
+            path = [self._root]
+            for char in key[:MAX_DEPTH]:
+                child = path[-1].children.get(char)
+                if child is None:
+                    break
+                path.append(child)
+            else:
+                path[-1].entries.discard((key, entry))
+            for node in path:
+                node.top = None
+            # Prune branches that no longer lead anywhere
+            for depth in range(len(path) - 1, 0, -1):
+                if path[depth].entries or path[depth].children:
+                    break
+                del path[depth - 1].children[key[depth - 1]]
+
+    def _invalidate(self, entry):
+        # Counts changed, so cached rankings along the entry's paths are stale
+        for key in self._paths(entry):
+            node = self._root
+            node.top = None
+            for char in key[:MAX_DEPTH]:
+                node = node.children.get(char)
+                if node is None:
+                    break
+                node.top = None
+
+    # Lookups
+
+    def _sort_key(self, entry):
+        return (KIND_PRIORITY[entry[0]], -self._counts[entry], entry[1])
+
+    def _best(self, entries):
+        return sorted(set(entries), key=self._sort_key)[:CACHED_PER_NODE]
+
+    def _top(self, node):
+        # The best N of a subtree is within the union of its children's best N
+        if node.top is None:
+            candidates = [entry for _, entry in node.entries]
+            for child in node.children.values():
+                candidates.extend(self._top(child))
+            node.top = self._best(candidates)
+        return node.top
+
+    def _format(self, entry):
+        kind, value, hotel_id = entry
+        return {'type': kind, 'value': value, 'hotel_id': hotel_id, 'hotels': self._counts[entry]}
+
+    def lookup(self, query, limit=DEFAULT_LIMIT):
+        key = fold(query)
+        if not key:
+            return []
+        with self._lock:
+            node = self._root
+            for char in key[:MAX_DEPTH]:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            if len(key) > MAX_DEPTH:
+                best = self._best(entry for full, entry in node.entries if full.startswith(key))
+            else:
+                best = self._top(node)
+            return [self._format(entry) for entry in best[:limit]]
+
+
+index = SuggestionIndex()
+
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    index.refresh()
+    return index.lookup(query, limit)
@@ -0,0 +1,26 @@
+# backend/hotels/tasks.py
+"""Background tasks for hotels, run by the ``run_tasks`` worker pool."""
+from django.db import transaction
+
+from tasks.queue import task
+
+from . import images
+from .cache import invalidate_weekend
+from .models import HotelImage
+from .ranking import rerank
+
+
+@task('hotels.generate_image_derivatives', priority=5)
+def generate_image_derivatives(image_id):
+    hotel_image = HotelImage.objects.filter(id=image_id).first()
+    # Deleted or replaced since it was queued: the new file queues its own task
+    if hotel_image is not None and hotel_image.content_hash:
+        images.generate_all(hotel_image)
+
+
+@task('hotels.rank_hotels')
+def rank_hotels():
+    with transaction.atomic():
+        changed = rerank()
+    if changed:
+        invalidate_weekend()
@@ -1,3 +1,1015 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.cache import cache as django_cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.contrib import admin
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image as PILImage
+from rest_framework.renderers import JSONRenderer
+from tasks.queue import run_pending
+from users.models import User
+
+from .admin import HotelImageAdmin
+from .models import Amenity, Hotel, HotelAmenity, HotelImage
+from .projections import card_queryset
+from . import (
+    amenities, cache as hotel_cache, clusters, detail_cache, facets, geo, images, pricing, projections, ranking, renderers,
+    suggest,
+)
+from .pagination import encode_cursor
+from .query_shapes import explain, hot_queries, sequential_scans
+from .search import filter_destination, fts_available, rank_destination
+from .serializers import HotelListSerializer
+from .views import LISTING_ORDERING
+
+
+def make_hotel(**overrides):
+    fields = {
+        'name': 'Grand Hotel',
+        'description': 'A long description',
+        'country': 'Turkey',
+        'city': 'Istanbul',
+        'address': 'Taksim',
+        'latitude': Decimal('41.036900'),
+        'longitude': Decimal('28.985000'),
+        'base_price': Decimal('100.00'),
+        'member_price': Decimal('90.00'),
+        'points': 10,
+        'rating': Decimal('8.50'),
+    }
+    fields.update(overrides)
+    return Hotel.objects.create(**fields)
+
+
+def add_amenities(hotel, *names):
+    for name in names:
+        amenity, _ = Amenity.objects.get_or_create(name=name)
+        HotelAmenity.objects.create(hotel=hotel, amenity=amenity)
+
+
+class HotelProjectionQueryCountTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+
+    def populate(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                hotel = make_hotel(name=f'Hotel {i}', points=i)
+                add_amenities(hotel, 'Wifi', 'Pool', 'Parking')
+
+    def assertConstantQueries(self, url, expected):
+        self.populate(2)
+        with self.assertNumQueries(expected):
+            small = self.client.get(url)
+        self.populate(8)
+        with self.assertNumQueries(expected):
+            large = self.client.get(url)
+        self.assertEqual(small.status_code, 200)
+        self.assertEqual(large.status_code, 200)
+        return small.json(), large.json()
+
+    def test_weekend_query_count_is_constant(self):
+        small, large = self.assertConstantQueries(reverse('weekend_hotels'), 3)
+        self.assertEqual(len(small), 2)
+        self.assertEqual(len(large), 10)
+        self.assertEqual(
+            [a['name'] for a in large[0]['amenities']], ['Wifi', 'Pool', 'Parking']
+        )
+
+    def test_search_query_count_is_constant(self):
+        small, large = self.assertConstantQueries(reverse('search_hotels') + '?destination=istan', 3)
+        self.assertEqual(len(small), 2)
+        self.assertEqual(len(large), 10)
+
+    def test_detail_uses_three_queries_after_the_etag_lookup(self):
+        hotel = make_hotel()
+        add_amenities(hotel, 'Wifi', 'Spa')
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('hotel_detail', args=[hotel.id]))
+        data = response.json()
+        self.assertEqual(data['address'], 'Taksim')
+        self.assertEqual(data['member_price_display'], 90.0)
+        self.assertEqual(len(data['amenities']), 2)
+        self.assertEqual(data['images'], [])
+
+    def test_unavailable_hotel_detail_is_404(self):
+        hotel = make_hotel(is_available=False)
+        response = self.client.get(reverse('hotel_detail', args=[hotel.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchPaginationTests(TestCase):
+    def setUp(self):
+        # Duplicate ratings and points force the id tie-breaker to matter
+        for i in range(7):
+            make_hotel(name=f'Hotel {i}', rating=Decimal('9.00') - Decimal(i // 3), points=i % 2)
+        self.expected = list(
+            Hotel.objects.order_by(*LISTING_ORDERING).values_list('id', flat=True)
+        )
+
+    def test_cursor_walks_every_hotel_once_in_order(self):
+        url = reverse('search_hotels')
+        seen = []
+        response = self.client.get(url, {'limit': 3})
+        while True:
+            seen.extend(hotel['id'] for hotel in response.json())
+            cursor = response.get('X-Next-Cursor')
+            if not cursor:
+                break
+            self.assertIn('rel="next"', response['Link'])
+            response = self.client.get(url, {'limit': 3, 'cursor': cursor})
+        self.assertEqual(seen, self.expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('search_hotels'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_cursors_are_rejected(self):
+        url = reverse('search_hotels')
+        for values in (['abc', 'x'], [None, None], [{'a': 1}, 1], [float('inf'), 1], [1.5, 2 ** 70], [True, 1]):
+            with self.subTest(values=values):
+                self.assertEqual(self.client.get(url, {'cursor': encode_cursor(values)}).status_code, 400)
+                stream = self.client.get(url, {'cursor': encode_cursor(values), 'stream': 'ndjson'})
+                self.assertEqual(stream.status_code, 400)
+        self.assertEqual(self.client.get(url, {'cursor': encode_cursor([2.5, 7])}).status_code, 200)
+
+    def test_ndjson_stream_returns_one_hotel_per_line(self):
+        response = self.client.get(reverse('search_hotels'), {'stream': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], self.expected)
+
+
+class DestinationSearchIndexTests(TestCase):
+    def setUp(self):
+        self.istanbul = make_hotel(name='Bosphorus Palace', city='Istanbul')
+        self.ankara = make_hotel(name='Ankara Inn', city='Ankara')
+        self.rome = make_hotel(name='Palazzo Roma', city='Rome', country='Italy')
+
+    def search(self, term, prefix=False):
+        return set(filter_destination(Hotel.objects.all(), term, prefix=prefix).values_list('id', flat=True))
+
+    def legacy(self, term):
+        return set(Hotel.objects.filter(
+            Q(city__icontains=term) | Q(country__icontains=term) | Q(name__icontains=term)
+        ).values_list('id', flat=True))
+
+    def test_matches_icontains_semantics(self):
+        self.assertTrue(fts_available())
+        for term in ['istanbul', 'ISTAN', 'pala', 'ital', 'an', 'nowhere', 'a"b']:
+            self.assertEqual(self.search(term), self.legacy(term), term)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.rome.city = 'Milan'
+        self.rome.save()
+        self.assertEqual(self.search('milan'), {self.rome.id})
+        self.assertEqual(self.search('rome'), set())
+        self.ankara.delete()
+        self.assertEqual(self.search('ankara'), set())
+
+    def test_prefix_mode_only_matches_word_starts(self):
+        self.assertEqual(self.search('pala', prefix=True), {self.istanbul.id, self.rome.id})
+        self.assertEqual(self.search('alace', prefix=True), set())
+
+    def test_relevance_ranks_name_hits_first(self):
+        make_hotel(name='Seaside Rooms', city='Palanga', country='Lithuania')
+        ranked = rank_destination(Hotel.objects.all(), 'pala').order_by('search_rank', 'id')
+        self.assertEqual(list(ranked)[-1].name, 'Seaside Rooms')
+        response = self.client.get(reverse('search_hotels'), {'destination': 'pala', 'sort': 'relevance'})
+        self.assertEqual(len(response.json()), 3)
+
+
+class DestinationSuggestTests(TestCase):
+    def setUp(self):
+        suggest.index.built_at = None
+        self.hotel = make_hotel(name='Pera Palace', city='İstanbul')
+        make_hotel(name='Beach Club', city='İzmir')
+        make_hotel(name='Old Town Inn', city='Istanbul', is_available=False)
+
+    def values(self, query):
+        return [(s['type'], s['value']) for s in suggest.suggest(query)]
+
+    def test_turkish_case_and_accent_folding(self):
+        self.assertEqual(suggest.fold('İstanbul'), 'istanbul')
+        self.assertEqual(suggest.fold('IŞIK'), 'isik')
+        self.assertEqual(self.values('ist'), [('city', 'İstanbul')])
+        self.assertEqual(self.values('İST'), [('city', 'İstanbul')])
+        self.assertEqual(self.values('tur')[0], ('country', 'Turkey'))
+
+    def test_matches_word_starts_without_queries(self):
+        suggest.suggest('x')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.values('palace'), [('hotel', 'Pera Palace')])
+
+    def test_index_follows_hotel_signals(self):
+        suggest.suggest('x')
+        self.hotel.city = 'Bursa'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotel.save()
+        self.assertEqual(self.values('ist'), [])
+        self.assertEqual(self.values('bur'), [('city', 'Bursa')])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotel.delete()
+        self.assertEqual(self.values('bur'), [])
+        self.assertEqual(self.values('pera'), [])
+
+    def test_rolled_back_writes_never_reach_the_index(self):
+        suggest.suggest('x')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.hotel.city = 'Bursa'
+            self.hotel.save()
+        self.assertEqual(self.values('bur'), [])  # Not committed yet
+        callbacks.clear()  # As a rollback would
+        self.assertEqual(self.values('ist'), [('city', 'İstanbul')])
+
+    def test_stale_index_is_rebuilt_once_while_readers_use_the_old_one(self):
+        suggest.suggest('x')
+        suggest.index.built_at -= 3600
+        building, release = threading.Event(), threading.Event()
+        build = suggest.index.build
+
+        def slow_build():
+            building.set()
+            release.wait(5)
+            build(rows=[(self.hotel.id, 'Pera Palace', 'Bursa', '')])  # No queries off the test connection
+
+        with patch.object(suggest.index, 'build', side_effect=slow_build) as rebuild:
+            rebuilder = threading.Thread(target=suggest.index.refresh)
+            rebuilder.start()
+            building.wait(5)
+            # A second reader neither waits nor starts another rebuild
+            self.assertEqual(self.values('ist'), [('city', 'İstanbul')])
+            release.set()
+            rebuilder.join()
+        self.assertEqual(rebuild.call_count, 1)
+        self.assertFalse(suggest.index.is_stale())
+        self.assertEqual(self.values('bur'), [('city', 'Bursa')])
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('suggest_destinations'), {'q': 'izm'})
+        self.assertEqual(response.json()[0]['value'], 'İzmir')
+
+
+@override_settings(SHARED_CACHE=True)
+class WeekendCacheTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.hotel = make_hotel()
+
+    def test_second_request_is_served_from_cache(self):
+        url = reverse('weekend_hotels')
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+
+    def test_writes_invalidate_the_cached_body(self):
+        url = reverse('weekend_hotels')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            add_amenities(self.hotel, 'Sauna')
+        self.assertEqual(self.client.get(url).json()[0]['amenities'][0]['name'], 'Sauna')
+        with self.captureOnCommitCallbacks(execute=True):
+            Amenity.objects.get(name='Sauna').delete()
+        self.assertEqual(self.client.get(url).json()[0]['amenities'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotel.delete()
+        self.assertEqual(self.client.get(url).json(), [])
+
+    def test_invalidation_waits_for_commit(self):
+        url = reverse('weekend_hotels')
+        cached = self.client.get(url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.hotel.name = 'Renamed'
+            self.hotel.save()
+            # A request racing the uncommitted write must not rebuild under a new generation
+            self.assertEqual(self.client.get(url)['ETag'], cached['ETag'])
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(url).json()[0]['name'], 'Renamed')
+
+    def test_concurrent_misses_rebuild_once(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.2)
+            return b'[]'
+
+        start = threading.Barrier(8)
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(hotel_cache.cached_bytes('test:stampede', build, 60))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(results, [b'[]'] * 8)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_process_local_cache_serves_uncached_without_validators(self):
+        # Another worker's write could not bump this process's generation
+        url = reverse('weekend_hotels')
+        with patch('hotels.views._render_weekend', return_value=b'[]') as render:
+            self.client.get(url)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(render.call_count, 2)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+class FastJSONRendererTests(TestCase):
+    payload = {
+        'price': Decimal('120.50'),
+        'created_at': datetime(2026, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        'day': date(2026, 5, 1),
+        'histogram': {10: 3},
+        'caption': 'Line\u2028separator, ünicode',
+        'missing': None,
+    }
+
+    def test_matches_the_stock_renderer_byte_for_byte(self):
+        expected = JSONRenderer().render(self.payload)
+        self.assertEqual(renderers.FastJSONRenderer().render(self.payload), expected)
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.dumps(self.payload), expected)
+
+    def test_indented_output_uses_the_stock_path(self):
+        rendered = renderers.FastJSONRenderer().render(self.payload, 'application/json; indent=2')
+        self.assertEqual(rendered, JSONRenderer().render(self.payload, 'application/json; indent=2'))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.hotel = make_hotel()
+        add_amenities(self.hotel, 'Wifi')
+
+    def revalidate(self, url, response, queries):
+        with patch('hotels.detail_cache._render_many') as render_detail, \
+                patch('hotels.views._render_weekend') as render_weekend:
+            with self.assertNumQueries(queries):
+                etag_hit = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            with self.assertNumQueries(queries):
+                date_hit = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        render_detail.assert_not_called()
+        render_weekend.assert_not_called()
+        self.assertEqual((etag_hit.status_code, date_hit.status_code), (304, 304))
+        self.assertEqual(etag_hit['ETag'], response['ETag'])
+        self.assertEqual(etag_hit.content, b'')
+
+    def test_detail_304_costs_one_query_and_no_serialization(self):
+        url = reverse('hotel_detail', args=[self.hotel.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.revalidate(url, response, queries=1)
+
+    def test_detail_etag_follows_child_writes(self):
+        url = reverse('hotel_detail', args=[self.hotel.id])
+        etags = [self.client.get(url)['ETag']]
+        time.sleep(0.001)
+        add_amenities(self.hotel, 'Spa')
+        etags.append(self.client.get(url)['ETag'])
+        time.sleep(0.001)
+        Amenity.objects.filter(name='Spa').update(name='Spa & Wellness')
+        Amenity.objects.get(name='Spa & Wellness').save()
+        etags.append(self.client.get(url)['ETag'])
+        time.sleep(0.001)
+        HotelAmenity.objects.filter(hotel=self.hotel, amenity__name='Wifi').delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(set(etags + [response['ETag']])), 4)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_weekend_304_needs_no_queries(self):
+        url = reverse('weekend_hotels')
+        response = self.client.get(url)
+        self.revalidate(url, response, queries=0)
+        self.hotel.points = 50
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotel.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_missing_hotel_is_still_404(self):
+        response = self.client.get(reverse('hotel_detail', args=[self.hotel.id + 1]), HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_out_of_range_hotel_id_is_404(self):
+        response = self.client.get('/api/hotels/99999999999999999999/', HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Hotel not found'})
+
+
+class DetailCacheTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        detail_cache.reset()
+        self.hotel = make_hotel()
+        add_amenities(self.hotel, 'Wifi')
+        self.url = reverse('hotel_detail', args=[self.hotel.id])
+
+    def test_tiers_serve_repeat_views_with_only_the_version_lookup(self):
+        first = self.client.get(self.url).content
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).content, first)
+        detail_cache.local.clear()  # As in another worker process
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).content, first)
+        stats = detail_cache.stats()
+        self.assertEqual((stats['misses'], stats['local_hits'], stats['shared_hits']), (1, 1, 1))
+
+    def test_writes_are_visible_immediately(self):
+        self.client.get(self.url)
+        self.hotel.name = 'Renamed'
+        self.hotel.save()
+        self.assertEqual(self.client.get(self.url).json()['name'], 'Renamed')
+        self.assertEqual(detail_cache.stats()['misses'], 2)
+
+    def test_admin_saves_write_through(self):
+        admin_user = User.objects.create_superuser('admin@example.com', None)
+        self.client.force_login(admin_user)
+        self.client.get(self.url)
+        form = {
+            'name': 'Grand Hotel Taksim', 'description': 'A long description', 'country': 'Turkey',
+            'city': 'Istanbul', 'address': 'Taksim', 'latitude': '41.036900', 'longitude': '28.985000',
+            'base_price': '100.00', 'member_price': '90.00', 'special_discount': '0', 'points': '10',
+            'rating': '8.50', 'total_reviews': '0', 'is_available': 'on',
+        }
+        for prefix in ('amenities', 'images'):
+            form.update({f'{prefix}-TOTAL_FORMS': '0', f'{prefix}-INITIAL_FORMS': '0'})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('admin:hotels_hotel_change', args=[self.hotel.id]), form)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(detail_cache.stats()['refreshes'], 1)
+        with patch('hotels.detail_cache._render_many') as render_detail:
+            body = self.client.get(self.url).json()
+        render_detail.assert_not_called()
+        self.assertEqual(body['name'], 'Grand Hotel Taksim')
+
+    def test_stats_endpoint_is_admin_only(self):
+        url = reverse('detail_cache_stats')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_superuser('admin@example.com', None))
+        self.assertIn('hit_rate', self.client.get(url).json())
+
+    def test_local_tier_is_bounded_and_expires(self):
+        lru = detail_cache.LRUCache(maxsize=2, ttl=60)
+        lru.set(1, 'a')
+        lru.set(2, 'b')
+        lru.get(1)
+        lru.set(3, 'c')
+        self.assertEqual((lru.get(1), lru.get(2), lru.get(3), lru.evictions), ('a', None, 'c', 1))
+        with patch('hotels.detail_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(lru.get(1))
+        self.assertEqual((len(lru), lru.expirations), (1, 1))
+
+
+class HotelBatchTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        detail_cache.reset()
+        self.hotels = [make_hotel(name=f'Hotel {i}') for i in range(4)]
+        for hotel in self.hotels:
+            add_amenities(hotel, 'Wifi', 'Pool')
+        self.hidden = make_hotel(name='Hidden', is_available=False)
+
+    def fetch(self, ids):
+        return self.client.get(reverse('hotel_batch'), {'ids': ','.join(str(hotel_id) for hotel_id in ids)})
+
+    def test_returns_available_hotels_keyed_by_id_in_request_order(self):
+        ids = [self.hotels[2].id, self.hidden.id, self.hotels[0].id, 999999, self.hotels[2].id]
+        data = self.fetch(ids).json()
+        self.assertEqual(list(data), [str(self.hotels[2].id), str(self.hotels[0].id)])
+        single = self.client.get(reverse('hotel_detail', args=[self.hotels[0].id])).json()
+        self.assertEqual(data[str(self.hotels[0].id)], single)
+
+    def test_query_count_is_constant_and_warm_batches_cost_one_query(self):
+        with self.assertNumQueries(4):
+            self.fetch([hotel.id for hotel in self.hotels[:2]])
+        detail_cache.reset()
+        django_cache.clear()
+        with self.assertNumQueries(4):
+            self.fetch([hotel.id for hotel in self.hotels])
+        with self.assertNumQueries(1):
+            self.fetch([hotel.id for hotel in self.hotels])
+
+    def test_mixes_cache_tiers(self):
+        self.fetch([self.hotels[0].id])
+        detail_cache.local.clear()
+        self.fetch([self.hotels[1].id])
+        self.fetch([hotel.id for hotel in self.hotels])
+        stats = detail_cache.stats()
+        self.assertEqual((stats['local_hits'], stats['shared_hits'], stats['misses']), (1, 1, 4))
+
+    def test_rejects_bad_ids(self):
+        self.assertEqual(self.client.get(reverse('hotel_batch')).status_code, 400)
+        self.assertEqual(self.client.get(reverse('hotel_batch'), {'ids': '1,x'}).status_code, 400)
+        self.assertEqual(self.fetch(range(1, 52)).status_code, 400)
+        for raw in ('1_0', str(2 ** 64), '-1', '0', '١'):
+            self.assertEqual(self.client.get(reverse('hotel_batch'), {'ids': raw}).status_code, 400, raw)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        detail_cache.reset()
+        self.hotels = [make_hotel(name=f'Hotel {i}', description='Long text ' * 200) for i in range(3)]
+        for hotel in self.hotels:
+            add_amenities(hotel, 'Wifi')
+
+    def test_parse_fieldset(self):
+        available = projections.CARD_FIELDS
+        self.assertIsNone(projections.parse_fieldset({}, available))
+        self.assertEqual(projections.parse_fieldset({'fields': 'rating, name'}, available), ('id', 'name', 'rating'))
+        self.assertNotIn('description', projections.parse_fieldset({'exclude': 'description'}, available))
+        with self.assertRaises(ValueError):
+            projections.parse_fieldset({'fields': 'name,password'}, available)
+
+    def test_search_selects_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('search_hotels'), {'fields': 'name,base_price', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()[0]), {'id', 'name', 'base_price'})
+        # No amenity or image prefetch, and the hotel query leaves the text columns out
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('description', queries[0]['sql'])
+        self.assertIn('X-Next-Cursor', response)
+
+    def test_exclude_keeps_the_rest_and_streams(self):
+        data = self.client.get(reverse('search_hotels'), {'exclude': 'description'}).json()
+        self.assertEqual(len(data), 3)
+        self.assertNotIn('description', data[0])
+        self.assertEqual(data[0]['amenities'], [{'id': data[0]['amenities'][0]['id'], 'name': 'Wifi'}])
+        response = self.client.get(reverse('search_hotels'), {'stream': 'ndjson', 'fields': 'name'})
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(set(json.loads(lines[0])), {'id', 'name'})
+
+    @override_settings(SHARED_CACHE=True)
+    def test_weekend_caches_each_fieldset_separately(self):
+        full = self.client.get(reverse('weekend_hotels'))
+        sparse = self.client.get(reverse('weekend_hotels'), {'fields': 'name'})
+        self.assertIn('description', full.json()[0])
+        self.assertEqual(set(sparse.json()[0]), {'id', 'name'})
+        self.assertNotEqual(full['ETag'], sparse['ETag'])
+        with self.assertNumQueries(0):
+            again = self.client.get(reverse('weekend_hotels'), {'fields': 'name'})
+        self.assertEqual(again.content, sparse.content)
+
+    def test_detail_and_batch_trim_cached_payloads(self):
+        hotel = self.hotels[0]
+        url = reverse('hotel_detail', args=[hotel.id])
+        full = self.client.get(url)
+        sparse = self.client.get(url, {'exclude': 'description,images'})
+        self.assertNotEqual(full['ETag'], sparse['ETag'])
+        expected = {key: value for key, value in full.json().items() if key not in ('description', 'images')}
+        self.assertEqual(sparse.json(), expected)
+        revalidated = self.client.get(url, {'exclude': 'description,images'}, HTTP_IF_NONE_MATCH=sparse['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        batch = self.client.get(reverse('hotel_batch'), {'ids': str(hotel.id), 'fields': 'review_summary'}).json()
+        self.assertEqual(set(batch[str(hotel.id)]), {'id', 'review_summary'})
+
+    def test_unknown_fields_are_rejected(self):
+        for name in ('search_hotels', 'weekend_hotels'):
+            self.assertEqual(self.client.get(reverse(name), {'fields': 'secret'}).status_code, 400)
+        url = reverse('hotel_detail', args=[self.hotels[0].id])
+        self.assertEqual(self.client.get(url, {'exclude': 'nope'}).status_code, 400)
+        # Even when the validators would otherwise match
+        since = 'Fri, 01 Jan 2100 00:00:00 GMT'
+        for url in (url, reverse('weekend_hotels')):
+            self.assertEqual(self.client.get(url, {'fields': 'secret'}, HTTP_IF_MODIFIED_SINCE=since).status_code, 400)
+
+
+class HotQueryIndexTests(TestCase):
+    def test_no_hot_query_shape_falls_back_to_a_sequential_scan(self):
+        for name, queryset in hot_queries().items():
+            with self.subTest(name):
+                self.assertEqual(sequential_scans(explain(queryset)), [])
+
+    def test_listing_queries_use_the_partial_indexes(self):
+        queries = hot_queries()
+        for name in ('weekend', 'search_first_page', 'search_next_page'):
+            self.assertIn('hotel_rank_idx', explain(queries[name]))
+        self.assertIn('hotelimage_one_main', explain(queries['main_image_prefetch']))
+
+    def test_report_command(self):
+        out = StringIO()
+        call_command('report_seq_scans', stdout=out)
+        self.assertIn('0 query shape(s) still fall back', out.getvalue())
+
+
+class HotelMapTests(TestCase):
+    def setUp(self):
+        self.taksim = make_hotel(name='Taksim', latitude=Decimal('41.036900'), longitude=Decimal('28.985000'))
+        self.kadikoy = make_hotel(name='Kadikoy', latitude=Decimal('40.990000'), longitude=Decimal('29.030000'))
+        self.ankara = make_hotel(name='Ankara', latitude=Decimal('39.925000'), longitude=Decimal('32.836900'))
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return {marker['id'] for marker in response.json()}
+
+    def test_geohash_is_maintained_on_save(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744), 'u4pruydqq')
+        self.assertEqual(self.taksim.geohash, geo.encode(41.0369, 28.985))
+        self.taksim.latitude, self.taksim.longitude = Decimal('39.92'), Decimal('32.85')
+        self.taksim.save(update_fields=['latitude', 'longitude'])
+        self.taksim.refresh_from_db()
+        self.assertTrue(self.taksim.geohash.startswith(self.ankara.geohash[:4]))
+
+    def test_bbox_returns_compact_markers(self):
+        response = self.client.get(reverse('hotel_map'), {'bbox': '40.8,28.6,41.3,29.4'})
+        self.assertEqual(self.ids(response), {self.taksim.id, self.kadikoy.id})
+        self.assertEqual(set(response.json()[0]), {'id', 'lat', 'lng', 'price', 'rating'})
+
+    def test_radius_trims_box_corners(self):
+        response = self.client.get(reverse('hotel_map'), {'lat': '41.0369', 'lng': '28.985', 'radius': '3'})
+        self.assertEqual(self.ids(response), {self.taksim.id})
+        response = self.client.get(reverse('hotel_map'), {'lat': '41.0369', 'lng': '28.985', 'radius': '400'})
+        self.assertEqual(self.ids(response), {self.taksim.id, self.kadikoy.id, self.ankara.id})
+
+    def test_viewport_is_required(self):
+        self.assertEqual(self.client.get(reverse('hotel_map')).status_code, 400)
+        self.assertEqual(self.client.get(reverse('hotel_map'), {'bbox': '1,2'}).status_code, 400)
+
+    def test_viewport_query_uses_the_geohash_index(self):
+        self.assertIn('hotel_geohash_idx', explain(hot_queries()['map_viewport']))
+
+
+class MapClusterTests(TestCase):
+    def setUp(self):
+        clusters.index.built_at = None
+        self.hotels = [
+            make_hotel(name='Taksim', latitude=Decimal('41.0369'), longitude=Decimal('28.985'), base_price=Decimal('120')),
+            make_hotel(name='Sisli', latitude=Decimal('41.0600'), longitude=Decimal('28.9870'), base_price=Decimal('80')),
+            make_hotel(name='Ankara', latitude=Decimal('39.9250'), longitude=Decimal('32.8369'), base_price=Decimal('60')),
+        ]
+
+    def get(self, zoom):
+        response = self.client.get(reverse('hotel_map'), {'bbox': '35,25,43,45', 'zoom': zoom})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_zoomed_out_requests_get_clusters(self):
+        (istanbul,) = [c for c in self.get(6) if c['count'] == 2]
+        self.assertEqual(istanbul['min_price'], 80.0)
+        self.assertAlmostEqual(istanbul['lat'], (41.0369 + 41.06) / 2, places=5)
+        self.assertEqual(sum(c['count'] for c in self.get(2)), 3)
+
+    def test_only_cells_inside_the_viewport_are_visited(self):
+        clusters.index.build()
+        with patch('hotels.clusters.geo.cell_bounds', wraps=geo.cell_bounds) as bounds:
+            found = clusters.clusters((39.5, 32.5, 40.5, 33.5), 10, 100)
+        self.assertEqual([c['count'] for c in found], [1])
+        self.assertEqual(found[0]['min_price'], 60.0)
+        # The Istanbul cells are never expanded
+        self.assertFalse([call for call in bounds.call_args_list if call.args[0].startswith('sxk')])
+
+    def test_stale_grid_is_served_while_another_request_rebuilds(self):
+        self.get(6)
+        clusters.index.built_at -= 3600
+        with clusters.index._build_lock, patch.object(clusters.index, 'build') as build:
+            self.assertEqual(sum(c['count'] for c in self.get(6)), 3)
+        build.assert_not_called()
+        self.get(6)
+        self.assertFalse(clusters.index.is_stale())
+
+    def test_radius_cannot_be_clustered(self):
+        response = self.client.get(reverse('hotel_map'), {'lat': 41, 'lng': 29, 'radius': 50, 'zoom': 6})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cell_bounds_contain_encoded_point(self):
+        south, west, north, east = geo.cell_bounds(geo.encode(41.0369, 28.985, 6))
+        self.assertTrue(south <= 41.0369 <= north and west <= 28.985 <= east)
+
+    def test_close_zoom_falls_back_to_markers(self):
+        self.assertEqual(len(self.get(14)), 3)
+        self.assertNotIn('count', self.get(14)[0])
+
+    def test_grid_is_patched_incrementally(self):
+        self.get(6)
+        cheapest = self.hotels[1]
+        with self.assertNumQueries(0):
+            clusters.index.update_hotel(cheapest)
+        cheapest.latitude, cheapest.longitude = Decimal('39.93'), Decimal('32.84')
+        with self.captureOnCommitCallbacks(execute=True):
+            cheapest.save()
+        by_count = {c['count']: c for c in self.get(6)}
+        self.assertEqual(by_count[2]['min_price'], 60.0)
+        self.assertEqual(by_count[1]['min_price'], 120.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotels[0].delete()
+        self.assertEqual(sum(c['count'] for c in self.get(6)), 2)
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+
+    def weekend_names(self):
+        return [hotel['name'] for hotel in self.client.get(reverse('weekend_hotels')).json()]
+
+    def test_score_is_kept_in_sync_on_save(self):
+        hotel = make_hotel(points=0, rating=Decimal('5.00'))
+        before = hotel.rank_score
+        hotel.points = 40
+        hotel.save(update_fields=['points'])
+        hotel.refresh_from_db()
+        self.assertAlmostEqual(hotel.rank_score - before, 40 * ranking.DEFAULT_WEIGHTS['points'])
+
+    def test_weights_change_order_after_rerank(self):
+        make_hotel(name='Popular', points=100, rating=Decimal('6.00'))
+        make_hotel(name='Acclaimed', points=0, rating=Decimal('9.90'))
+        self.assertEqual(self.weekend_names(), ['Popular', 'Acclaimed'])
+        with override_settings(HOTEL_RANKING_WEIGHTS={'points': 0.1}):
+            out = StringIO()
+            call_command('rank_hotels', stdout=out)
+            self.assertIn('Re-ranked 1 hotel(s)', out.getvalue())  # Acclaimed has no points to reweigh
+            self.assertEqual(self.weekend_names(), ['Acclaimed', 'Popular'])
+
+    def test_recency_decays(self):
+        hotel = make_hotel(points=0, rating=Decimal('0.00'))
+        today = hotel.created_at.date()
+        fresh = ranking.score(hotel, today)
+        halfway = ranking.score(hotel, today + timedelta(days=ranking.DEFAULT_RECENCY_DAYS // 2))
+        self.assertEqual(fresh, ranking.DEFAULT_WEIGHTS['recency'])
+        self.assertEqual(halfway, ranking.DEFAULT_WEIGHTS['recency'] / 2)
+        self.assertEqual(ranking.score(hotel, today + timedelta(days=365)), 0)
+
+
+class PricingTests(TestCase):
+    def test_member_price_without_explicit_member_price(self):
+        hotel = make_hotel(base_price=Decimal('123.45'), member_price=None)
+        # Used to raise TypeError (Decimal * float); half-up to the cent now
+        self.assertEqual(hotel.get_member_price(), Decimal('111.11'))
+
+    def test_quotes_round_half_up_in_cents(self):
+        self.assertEqual(pricing.quote(Decimal('199.99'), None, 15), pricing.Quote(19999, 17999, 16999))
+        self.assertEqual(pricing.quote(Decimal('80.00'), Decimal('70.00'), 0), pricing.Quote(8000, 7000, 8000))
+
+    def test_stay_is_priced_per_night(self):
+        stay = pricing.price_stay(pricing.quote('100.00', None, 10), date(2030, 6, 1), date(2030, 6, 4))
+        self.assertEqual(stay.nights, 3)
+        self.assertEqual(stay.total, pricing.Quote(30000, 27000, 27000))
+
+    def test_cards_carry_discounted_price(self):
+        hotel = make_hotel(base_price=Decimal('250.00'), special_discount=20)
+        data = self.client.get(reverse('hotel_detail', args=[hotel.id])).json()
+        self.assertEqual((data['base_price'], data['discounted_price']), (250.0, 200.0))
+
+
+class FacetedSearchTests(TestCase):
+    def setUp(self):
+        facets.index.built_at = None
+        self.cheap = make_hotel(name='Cheap', base_price=Decimal('45.00'), rating=Decimal('6.50'))
+        self.mid = make_hotel(name='Mid', base_price=Decimal('150.00'), rating=Decimal('8.20'), special_discount=10)
+        self.lux = make_hotel(name='Lux', base_price=Decimal('650.00'), rating=Decimal('9.40'))
+        self.paris = make_hotel(name='Rive', city='Paris', country='France', base_price=Decimal('150.00'))
+        add_amenities(self.mid, 'Wifi', 'Pool')
+        add_amenities(self.lux, 'Wifi')
+
+    def search(self, **params):
+        response = self.client.get(reverse('search_hotels'), {'facets': '1', **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def names(self, data):
+        return sorted(hotel['name'] for hotel in data['results'])
+
+    def test_filters(self):
+        wifi = Amenity.objects.get(name='Wifi').id
+        self.assertEqual(self.names(self.search(min_price='100', max_price='650')), ['Lux', 'Mid', 'Rive'])
+        self.assertEqual(self.names(self.search(min_rating='8')), ['Lux', 'Mid', 'Rive'])
+        self.assertEqual(self.names(self.search(amenities=f'{wifi}')), ['Lux', 'Mid'])
+        self.assertEqual(self.names(self.search(discount_only='true')), ['Mid'])
+        for bad in ({'min_price': 'x'}, {'min_price': '9', 'max_price': '1'}, {'amenities': 'a,b'}):
+            self.assertEqual(self.client.get(reverse('search_hotels'), bad).status_code, 400)
+
+    def test_facets_are_counted_under_the_other_filters(self):
+        data = self.search(destination='istanbul', min_price='100')
+        counts = data['facets']
+        self.assertEqual(counts['total'], len(data['results']))
+        # The price facet ignores the price filter itself
+        self.assertEqual([bucket['count'] for bucket in counts['price']], [1, 0, 1, 0, 0, 1])
+        self.assertEqual([bucket['count'] for bucket in counts['rating']], [1, 2, 2, 2])
+        self.assertEqual([(a['name'], a['count']) for a in counts['amenities']], [('Wifi', 2), ('Pool', 1)])
+        self.assertEqual(counts['discount'], 1)
+
+    def test_unscoped_facets_need_no_extra_queries_and_follow_writes(self):
+        self.search()
+        with self.assertNumQueries(3):
+            counts = self.search()['facets']
+        self.assertEqual(counts['total'], 4)
+        self.cheap.base_price = Decimal('120.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cheap.save()
+            add_amenities(self.cheap, 'Pool')
+        counts = self.search()['facets']
+        self.assertEqual(counts['price'][0]['count'], 0)
+        self.assertEqual(counts['amenities'][0], {'id': Amenity.objects.get(name='Pool').id, 'name': 'Pool', 'count': 2})
+
+    def test_whole_city_facets_are_cached(self):
+        first = self.search(destination='Paris')['facets']
+        self.assertEqual(first['total'], 1)
+        self.assertIn('paris', facets.index._place_facets)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paris.save()
+        self.assertNotIn('paris', facets.index._place_facets)
+
+
+class AmenityMaskTests(TestCase):
+    def setUp(self):
+        self.wifi, self.pool, self.spa = (Amenity.objects.create(name=name) for name in ('Wifi', 'Pool', 'Spa'))
+        self.rare = Amenity.objects.create(id=80, name='Helipad')  # Beyond the 63 masked ids
+        self.hotel = make_hotel(name='Both')
+        self.other = make_hotel(name='Pool only')
+        HotelAmenity.objects.create(hotel=self.hotel, amenity=self.wifi)
+        HotelAmenity.objects.create(hotel=self.hotel, amenity=self.pool)
+        HotelAmenity.objects.create(hotel=self.other, amenity=self.pool)
+        HotelAmenity.objects.create(hotel=self.other, amenity=self.rare)
+
+    def mask(self, hotel):
+        return Hotel.objects.values_list('amenity_mask', flat=True).get(id=hotel.id)
+
+    def names(self, queryset):
+        return sorted(queryset.values_list('name', flat=True))
+
+    def test_mask_follows_inline_style_edits(self):
+        self.assertEqual(self.mask(self.hotel), amenities.split_mask([self.wifi.id, self.pool.id])[0])
+        link = HotelAmenity.objects.get(hotel=self.hotel, amenity=self.wifi)
+        link.amenity = self.spa  # An inline row switched to another amenity
+        link.save()
+        self.assertEqual(self.mask(self.hotel), amenities.split_mask([self.spa.id, self.pool.id])[0])
+        HotelAmenity.objects.filter(hotel=self.hotel).delete()
+        self.assertEqual(self.mask(self.hotel), 0)
+
+    def test_stale_instance_does_not_overwrite_mask(self):
+        stale = Hotel.objects.get(id=self.other.id)
+        HotelAmenity.objects.create(hotel_id=self.other.id, amenity=self.wifi)
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(self.mask(self.other), amenities.split_mask([self.pool.id, self.wifi.id])[0])
+        self.assertEqual(stale.amenity_mask, self.mask(self.other))
+
+    def test_saving_a_deleted_hotel_keeps_default_semantics(self):
+        gone = Hotel.objects.get(id=self.other.id)
+        Hotel.objects.filter(id=gone.id).delete()
+        gone.save()  # Re-inserted, as with any model, rather than a failed update
+        self.assertEqual(self.mask(gone), 0)
+
+    def test_all_and_any_filters(self):
+        hotels = Hotel.objects.all()
+        both = amenities.filter_all(hotels, [self.wifi.id, self.pool.id])
+        self.assertEqual(self.names(both), ['Both'])
+        self.assertNotIn('hotelamenity', str(both.query).lower())
+        self.assertEqual(self.names(amenities.filter_any(hotels, [self.wifi.id, self.spa.id])), ['Both'])
+        self.assertEqual(self.names(amenities.filter_all(hotels, [self.pool.id, self.rare.id])), ['Pool only'])
+        self.assertEqual(self.names(amenities.filter_any(hotels, [self.wifi.id, self.rare.id])), ['Both', 'Pool only'])
+
+    def test_search_any_amenities(self):
+        response = self.client.get(reverse('search_hotels'), {'any_amenities': f'{self.spa.id},{self.rare.id}'})
+        self.assertEqual([hotel['name'] for hotel in response.json()], ['Pool only'])
+
+
+def make_photo(size=(1600, 1200), color=(200, 120, 40)):
+    buffer = BytesIO()
+    PILImage.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+def use_temporary_media(test):
+    media = tempfile.TemporaryDirectory()
+    test.addCleanup(media.cleanup)
+    override = override_settings(MEDIA_ROOT=media.name)
+    override.enable()
+    test.addCleanup(override.disable)
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        use_temporary_media(self)
+        self.hotel = make_hotel()
+        self.photo = HotelImage.objects.create(hotel=self.hotel, image=make_photo(), is_main=True)
+
+    def fetch(self, variant, extension):
+        return self.client.get(images.variant_url(self.photo.content_hash, variant, extension))
+
+    def test_upload_is_content_hashed(self):
+        self.assertEqual(len(self.photo.content_hash), 64)
+        again = HotelImage.objects.create(hotel=self.hotel, image=make_photo())
+        self.assertEqual(again.content_hash, self.photo.content_hash)
+
+    def test_variant_is_rendered_once_and_cached_forever(self):
+        response = self.fetch('card', 'jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        with PILImage.open(BytesIO(b''.join(response.streaming_content))) as rendered:
+            self.assertEqual(rendered.size, (480, 320))
+        with patch.object(images, 'render') as render:
+            self.assertEqual(self.fetch('card', 'jpg').status_code, 200)
+        render.assert_not_called()
+
+    def test_webp_and_unknown_variants(self):
+        response = self.fetch('large', 'webp')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(self.fetch('huge', 'jpg').status_code, 404)
+        self.assertEqual(self.client.get(images.variant_url('0' * 64, 'card', 'jpg')).status_code, 404)
+
+    def test_pregeneration_runs_in_the_task_worker(self):
+        with override_settings(HOTEL_IMAGE_PREGENERATE=True):
+            photo = HotelImage.objects.create(hotel=self.hotel, image=make_photo(color=(1, 2, 3)))
+        self.assertFalse(default_storage.exists(images.derivative_name(photo.content_hash, 'thumb', 'webp')))
+        self.assertEqual(run_pending(), 1)
+        for variant in images.VARIANTS:
+            for extension in images.FORMATS:
+                self.assertTrue(default_storage.exists(images.derivative_name(photo.content_hash, variant, extension)))
+
+    def test_decompression_bombs_fall_back_to_the_original(self):
+        with patch.object(PILImage, 'MAX_IMAGE_PIXELS', 1000):
+            response = self.fetch('card', 'jpg')
+            self.assertFalse(images.generate_all(self.photo))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], self.photo.image.url)
+        self.assertFalse(default_storage.exists(images.derivative_name(self.photo.content_hash, 'card', 'jpg')))
+
+    def test_detail_payload_carries_srcsets(self):
+        response = self.client.get(reverse('hotel_detail', args=[self.hotel.id]))
+        image = response.json()['images'][0]
+        self.assertIn(' 480w', image['srcset'])
+        self.assertIn('.webp 1280w', image['webp_srcset'])
+        self.assertTrue(image['src'].endswith(f'/{self.photo.content_hash}/card.jpg'))
+
+
+class MainImageTests(TestCase):
+    def setUp(self):
+        use_temporary_media(self)
+        django_cache.clear()
+        self.hotels = [make_hotel(name=f'Hotel {i}') for i in range(3)]
+        for hotel in self.hotels:
+            HotelImage.objects.create(hotel=hotel, image=make_photo(color=(hotel.id, 0, 0)), is_main=True)
+            HotelImage.objects.create(hotel=hotel, image=make_photo(color=(0, hotel.id, 0)))
+
+    def test_promoting_an_image_demotes_the_previous_main(self):
+        hotel = self.hotels[0]
+        old_main = hotel.images.get(is_main=True)
+        new_main = hotel.images.get(is_main=False)
+        new_main.is_main = True
+        new_main.save()
+        self.assertEqual(list(hotel.images.filter(is_main=True)), [new_main])
+        old_main.refresh_from_db()
+        self.assertFalse(old_main.is_main)
+
+    def test_admin_forms_can_promote_a_new_main_image(self):
+        hotel = self.hotels[0]
+        request = RequestFactory().get('/')
+        request.user = User(is_staff=True, is_superuser=True)
+        form_class = HotelImageAdmin(HotelImage, admin.site).get_form(request)
+        form = form_class(
+            {'hotel': hotel.id, 'caption': 'Lobby', 'is_main': 'on'}, {'image': make_photo(color=(9, 9, 9))}
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        promoted = form.save()
+        self.assertEqual(list(hotel.images.filter(is_main=True)), [promoted])
+
+        # The changelist's list_editable formset takes the same path
+        old_main = hotel.images.filter(is_main=False).first()
+        form = form_class({'hotel': hotel.id, 'caption': '', 'is_main': 'on'}, instance=old_main)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(list(hotel.images.filter(is_main=True)), [old_main])
+
+    def test_cards_carry_the_main_image_without_per_hotel_queries(self):
+        with self.assertNumQueries(3):
+            cards = self.client.get(reverse('weekend_hotels')).json()
+        mains = {image.hotel_id: image.content_hash for image in HotelImage.objects.filter(is_main=True)}
+        for card in cards:
+            self.assertIn(mains[card['id']], card['main_image']['src'])
+
+    def test_list_serializer_reads_the_prefetched_main_image(self):
+        hotels = list(card_queryset(Hotel.objects.order_by('id')))
+        with self.assertNumQueries(0):
+            data = HotelListSerializer(hotels, many=True).data
+        self.assertIn(self.hotels[0].images.get(is_main=True).content_hash, data[0]['main_image']['src'])
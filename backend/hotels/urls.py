@@ -1,10 +1,18 @@
 # backend/hotels/urls.py
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 urlpatterns = [
     # Hotels endpoints for frontend
     path('weekend/', views.weekend_hotels, name='weekend_hotels'),
     path('search/', views.search_hotels, name='search_hotels'),
+    path('suggest/', views.suggest_destinations, name='suggest_destinations'),
+    path('map/', views.hotel_map, name='hotel_map'),
     path('<int:hotel_id>/', views.hotel_detail, name='hotel_detail'),
+    path('batch/', views.hotel_batch, name='hotel_batch'),
+    path('cache-stats/', views.detail_cache_stats, name='detail_cache_stats'),
+    re_path(
+        r'^images/(?P<digest>[0-9a-f]{64})/(?P<variant>[a-z]+)\.(?P<extension>webp|jpg)$',
+        views.hotel_image_variant, name='hotel_image_variant',
+    ),
 ]
\ No newline at end of file
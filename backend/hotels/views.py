@@ -1,49 +1,132 @@
 # backend/hotels/views.py
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Hotel
-from django.db.models import Q
+from .models import Hotel, HotelImage
+from .projections import (
+    CARD_FIELDS, DETAIL_FIELDS, card_queryset, fieldset_key, hotel_card, hotel_cards, parse_fieldset, pick,
+)
+from .search import filter_destination, rank_destination
+from . import cache, clusters, detail_cache, facets, geo, images, suggest
+from .filters import apply_filters, parse_filters
+from .renderers import dumps, loads
+from .pagination import InvalidPage, decode_cursor, keyset_filter, paginate, parse_limit
+from bookings.availability import filter_available, parse_stay
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_GET
+from datetime import datetime, timezone as dt_timezone
+import os
+from itertools import islice
 
+# Listings are ordered by the materialized rank (see ranking.py); id keeps the keyset unique
+LISTING_ORDERING = ['-rank_score', 'id']
+RELEVANCE_ORDERING = ['search_rank', 'id']
+STREAM_CHUNK_SIZE = 500
+MAP_MAX_MARKERS = 1000
+MAP_MAX_RADIUS_KM = 500
+BATCH_MAX_IDS = 50
+MAX_HOTEL_ID = 2 ** 63 - 1
+HOTEL_COLUMNS = frozenset(field.attname for field in Hotel._meta.concrete_fields)
+
+
+def _ordering_columns(ordering):
+    # Keyset cursors read the ordering values off the last row, so sparse querysets must still load them
+    return [name.lstrip('-') for name in ordering if name.lstrip('-') in HOTEL_COLUMNS]
+
+
+def _ndjson_cards(queryset, fields=None):
+    for hotel in card_queryset(queryset, fields).iterator(chunk_size=STREAM_CHUNK_SIZE):
+        yield dumps(hotel_card(hotel, fields)) + b'\n'
+
+
+def _render_weekend(fields=None):
+    hotels = Hotel.objects.filter(is_available=True).order_by(*LISTING_ORDERING)[:10]
+    return cache.render_json(hotel_cards(hotels, fields))
+
+
+def _trim(body, fields):
+    # Cached detail bodies are always complete; sparse requests cut them down on the way out
+    return body if fields is None else dumps(pick(loads(body), fields))
+
+
+# Conditional GET validators. ``condition`` answers a matching If-None-Match or
+# If-Modified-Since with 304 before the view runs, so nothing is serialized.
+# Each sparse fieldset is its own representation and gets its own ETag.
+
+def _fieldset_tag(request, available):
+    try:
+        tag = fieldset_key(parse_fieldset(request.GET, available))
+    except ValueError:
+        return None  # No validator; the view answers 400
+    return f'-{tag}' if tag else ''
+
+
+def _weekend_etag(request):
+    # The cache generation changes on every write that can alter the list, rank changes included
+    if not cache.enabled():
+        return None
+    generation, _ = cache.version(cache.WEEKEND_NAMESPACE)
+    tag = _fieldset_tag(request, CARD_FIELDS)
+    return None if tag is None else f'weekend-{generation}{tag}'
+
+
+def _weekend_last_modified(request):
+    if not cache.enabled():
+        return None
+    if _fieldset_tag(request, CARD_FIELDS) is None:
+        return None  # Otherwise If-Modified-Since could answer 304 to a request the view rejects
+    _, modified = cache.version(cache.WEEKEND_NAMESPACE)
+    return datetime.fromtimestamp(modified, tz=dt_timezone.utc)
+
+
+def _hotel_updated_at(request, hotel_id):
+    # Writes to images, amenities and reviews bump Hotel.updated_at too (see signals.py)
+    if not 0 < hotel_id <= MAX_HOTEL_ID:
+        return None  # Runs outside the view's try/except, and the query would overflow
+    if not hasattr(request, '_hotel_updated_at'):
+        request._hotel_updated_at = Hotel.objects.filter(id=hotel_id, is_available=True).values_list(
+            'updated_at', flat=True
+        ).first()
+    return request._hotel_updated_at
+
+
+def _detail_last_modified(request, hotel_id):
+    if _fieldset_tag(request, DETAIL_FIELDS) is None:
+        return None  # Let the view answer 400
+    return _hotel_updated_at(request, hotel_id)
+
+
+def _detail_etag(request, hotel_id):
+    updated_at = _hotel_updated_at(request, hotel_id)
+    tag = _fieldset_tag(request, DETAIL_FIELDS)
+    if updated_at is None or tag is None:
+        return None  # Let the view answer 404 or 400
+    return f'hotel-{hotel_id}-{detail_cache.version(updated_at)}{tag}'
+
+
+def _revalidate(response):
+    # Without this, browsers may reuse the body heuristically instead of sending the validators
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@condition(etag_func=_weekend_etag, last_modified_func=_weekend_last_modified)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def weekend_hotels(request):
     """Return weekend hotel recommendations"""
     try:
-        # Get all available hotels, ordered by points and rating
-        hotels = Hotel.objects.filter(is_available=True).order_by('-points', '-rating')[:10]
-        
-        print(f"Found {hotels.count()} hotels")  # Debug
-        
-        # Serialize hotel data
-        hotels_data = []
-        for hotel in hotels:
-            print(f"Hotel: {hotel.name}, Lat: {hotel.latitude}, Lng: {hotel.longitude}")  # Debug
-            
-            hotel_data = {
-                'id': hotel.id,
-                'name': hotel.name,
-                'city': hotel.city,
-                'country': hotel.country,
-                'base_price': float(hotel.base_price),
-                'member_price_display': float(hotel.get_member_price()),
-                'is_flagged': hotel.is_flagged,
-                'special_discount': hotel.special_discount,
-                'rating': float(hotel.rating),
-                'total_reviews': hotel.total_reviews,
-                'description': hotel.description,
-                'latitude': str(hotel.latitude) if hotel.latitude else None,
-                'longitude': str(hotel.longitude) if hotel.longitude else None,
-                'amenities': [
-                    {'id': amenity.amenity.id, 'name': amenity.amenity.name}
-                    for amenity in hotel.amenities.all()
-                ]
-            }
-            hotels_data.append(hotel_data)
-        
-        print(f"Returning {len(hotels_data)} hotels")  # Debug
-        return Response(hotels_data)
+        fields = parse_fieldset(request.GET, CARD_FIELDS)
+        body = cache.cached_bytes(
+            cache.WEEKEND_NAMESPACE, lambda: _render_weekend(fields), cache.WEEKEND_TIMEOUT,
+            variant=fieldset_key(fields),
+        )
+        return _revalidate(HttpResponse(body, content_type='application/json'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     except Exception as e:
         print(f"Error in weekend_hotels: {e}")  # Debug
         return Response({'error': str(e)}, status=500)
@@ -51,93 +134,221 @@ def weekend_hotels(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search_hotels(request):
-    """Search hotels based on criteria"""
+    """Search hotels based on criteria
+
+    ``facets=1`` wraps the page as ``{"results": [...], "facets": {...}}`` with
+    counts for the current filter; otherwise the body is the plain result list.
+    ``fields=`` / ``exclude=`` trim each card and the columns selected for it.
+    """
     try:
+        fields = parse_fieldset(request.GET, CARD_FIELDS)
         destination = request.GET.get('destination', '')
         check_in = request.GET.get('check_in', '')
         check_out = request.GET.get('check_out', '')
         guests = request.GET.get('guests', '2')
         
+        match_prefix = request.GET.get('match') == 'prefix'
+        by_relevance = request.GET.get('sort') == 'relevance'
+        
         # Build query
-        query = Q(is_available=True)
+        hotels = Hotel.objects.filter(is_available=True)
+        ordering = LISTING_ORDERING
         
         if destination:
-            query &= (
-                Q(city__icontains=destination) | 
-                Q(country__icontains=destination) |
-                Q(name__icontains=destination)
-            )
+            if by_relevance:
+                hotels = rank_destination(hotels, destination, prefix=match_prefix)
+                ordering = RELEVANCE_ORDERING
+            else:
+                hotels = filter_destination(hotels, destination, prefix=match_prefix)
         
-        # Search hotels
-        hotels = Hotel.objects.filter(query).order_by('-rating', '-points')
+        # Only hotels with a room free for every night of the stay
+        stay = parse_stay(check_in, check_out, guests)
+        if stay:
+            hotels = filter_available(hotels, *stay)
         
-        # Serialize results
-        search_results = []
-        for hotel in hotels:
-            hotel_data = {
-                'id': hotel.id,
-                'name': hotel.name,
-                'city': hotel.city,
-                'country': hotel.country,
-                'base_price': float(hotel.base_price),
-                'member_price_display': float(hotel.get_member_price()),
-                'is_flagged': hotel.is_flagged,
-                'special_discount': hotel.special_discount,
-                'rating': float(hotel.rating),
-                'total_reviews': hotel.total_reviews,
-                'description': hotel.description,
-                'latitude': str(hotel.latitude),  # Koordinatları ekle
-                'longitude': str(hotel.longitude),  # Koordinatları ekle
-                'amenities': [
-                    {'id': amenity.amenity.id, 'name': amenity.amenity.name}
-                    for amenity in hotel.amenities.all()
-                ]
-            }
-            search_results.append(hotel_data)
+        scoped = hotels
+        filters = parse_filters(request.GET)
+        hotels = apply_filters(hotels, filters)
         
-        return Response(search_results)
+        cursor = request.GET.get('cursor') or None
+        
+        # Stream every match as NDJSON without materializing the result set
+        if request.GET.get('stream') == 'ndjson':
+            if cursor:
+                hotels = hotels.filter(keyset_filter(ordering, decode_cursor(cursor, ordering, Hotel)))
+            return StreamingHttpResponse(
+                _ndjson_cards(hotels.order_by(*ordering), fields),
+                content_type='application/x-ndjson'
+            )
+        
+        # Serialize one keyset page of results
+        limit = parse_limit(request.GET.get('limit'))
+        page, next_cursor = paginate(
+            card_queryset(hotels, fields, keep=_ordering_columns(ordering)), ordering, cursor, limit
+        )
+        results = [hotel_card(hotel, fields) for hotel in page]
+        if request.GET.get('facets') in ('1', 'true'):
+            counts = facets.facet_counts(scoped, filters, destination, narrowed=bool(destination or stay))
+            response = Response({'results': results, 'facets': counts})
+        else:
+            response = Response(results)
+        if next_cursor:
+            params = request.GET.copy()
+            params['cursor'] = next_cursor
+            response['X-Next-Cursor'] = next_cursor
+            response['Link'] = f'<{request.build_absolute_uri("?" + params.urlencode())}>; rel="next"'
+        return response
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
-def hotel_detail(request, hotel_id):
-    """Get hotel detail by ID"""
+def suggest_destinations(request):
+    """Autocomplete cities, countries and hotel names from the in-memory prefix index"""
     try:
-        hotel = Hotel.objects.get(id=hotel_id, is_available=True)
+        query = request.GET.get('q', '')
+        limit = parse_limit(request.GET.get('limit'), default=suggest.DEFAULT_LIMIT, maximum=suggest.CACHED_PER_NODE)
+        return Response(suggest.suggest(query, limit))
+    except InvalidPage as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+def _map_viewport(params):
+    """Parse ``bbox=south,west,north,east`` or ``lat``/``lng``/``radius`` (km)"""
+    if params.get('bbox'):
+        south, west, north, east = (float(value) for value in params['bbox'].split(','))
+        center = None
+    elif params.get('lat') and params.get('lng') and params.get('radius'):
+        center = (float(params['lat']), float(params['lng']), float(params['radius']))
+        if not 0 < center[2] <= MAP_MAX_RADIUS_KM:
+            raise ValueError(f'radius must be between 0 and {MAP_MAX_RADIUS_KM} km')
+        south, west, north, east = geo.radius_bbox(*center)
+    else:
+        raise ValueError('bbox or lat, lng and radius are required')
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError('Coordinates out of range')
+    return (south, west, north, east), center
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def hotel_map(request):
+    """Return compact map markers (or clusters when zoomed out) inside a viewport or around a point"""
+    try:
+        bbox, center = _map_viewport(request.GET)
+        limit = parse_limit(request.GET.get('limit'), default=MAP_MAX_MARKERS, maximum=MAP_MAX_MARKERS)
+        zoom = request.GET.get('zoom')
+        
+        # Zoomed out: pre-aggregated clusters keep the payload bounded
+        if zoom not in (None, '') and int(zoom) < clusters.MAX_CLUSTER_ZOOM:
+            if center:
+                # Cells straddle the circle, so their counts would include hotels outside it
+                raise ValueError('Clusters need a bbox; radius searches return markers only')
+            return Response(clusters.clusters(bbox, int(zoom), limit))
         
-        hotel_detail = {
-            'id': hotel.id,
-            'name': hotel.name,
-            'city': hotel.city,
-            'country': hotel.country,
-            'address': hotel.address,
-            'description': hotel.description,
-            'base_price': float(hotel.base_price),
-            'member_price_display': float(hotel.get_member_price()),
-            'is_flagged': hotel.is_flagged,
-            'special_discount': hotel.special_discount,
-            'rating': float(hotel.rating),
-            'total_reviews': hotel.total_reviews,
-            'latitude': str(hotel.latitude),  # String olarak gönder
-            'longitude': str(hotel.longitude),  # String olarak gönder
-            'amenities': [
-                {'id': amenity.amenity.id, 'name': amenity.amenity.name}
-                for amenity in hotel.amenities.all()
-            ],
-            'images': [
-                {
-                    'id': image.id,
-                    'image': image.image.url if image.image else '',
-                    'caption': image.caption,
-                    'is_main': image.is_main
-                }
-                for image in hotel.images.all()
-            ]
-        }
+        rows = Hotel.objects.filter(is_available=True).filter(geo.bbox_q(*bbox)).order_by().values_list(
+            'id', 'latitude', 'longitude', 'base_price', 'rating'
+        )
+        if center:
+            # The box is only a prefilter; trim its corners by true distance
+            lat, lng, radius = center
+            rows = (row for row in rows.iterator() if geo.haversine_km(lat, lng, row[1], row[2]) <= radius)
         
-        return Response(hotel_detail)
+        markers = [
+            {'id': hotel_id, 'lat': float(latitude), 'lng': float(longitude), 'price': float(price), 'rating': float(rating)}
+            for hotel_id, latitude, longitude, price, rating in islice(rows, limit)
+        ]
+        return Response(markers)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@condition(etag_func=_detail_etag, last_modified_func=_detail_last_modified)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def hotel_detail(request, hotel_id):
+    """Get hotel detail by ID, from the two-tier detail cache when possible"""
+    try:
+        fields = parse_fieldset(request.GET, DETAIL_FIELDS)
+        updated_at = _hotel_updated_at(request, hotel_id)
+        if updated_at is None:
+            raise Hotel.DoesNotExist
+        body = _trim(detail_cache.detail_body(hotel_id, updated_at), fields)
+        return _revalidate(HttpResponse(body, content_type='application/json'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     except Hotel.DoesNotExist:
         return Response({'error': 'Hotel not found'}, status=404)
     except Exception as e:
-        return Response({'error': str(e)}, status=500)
\ No newline at end of file
+        return Response({'error': str(e)}, status=500)
+
+def _batch_ids(raw):
+    parts = [part.strip() for part in (raw or '').split(',') if part.strip()]
+    # isdigit() also turns away int()'s extras such as '1_0'; ids past 64 bits overflow the query
+    if not all(part.isascii() and part.isdigit() and 0 < int(part) <= MAX_HOTEL_ID for part in parts):
+        raise ValueError('ids must be a comma-separated list of hotel ids')
+    hotel_ids = list(dict.fromkeys(int(part) for part in parts))
+    if not hotel_ids:
+        raise ValueError('ids is required')
+    if len(hotel_ids) > BATCH_MAX_IDS:
+        raise ValueError(f'At most {BATCH_MAX_IDS} ids per request')
+    return hotel_ids
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def hotel_batch(request):
+    """Detail payloads for several hotels in one round trip
+
+    ``?ids=3,1,2`` returns ``{"3": {...}, "1": {...}, "2": {...}}`` in request
+    order; missing or unavailable hotels are left out. Payloads come from
+    the detail cache, so a warm batch costs a single query. ``fields=`` /
+    ``exclude=`` trim every payload.
+    """
+    try:
+        fields = parse_fieldset(request.GET, DETAIL_FIELDS)
+        hotel_ids = _batch_ids(request.GET.get('ids'))
+        updated_ats = dict(
+            Hotel.objects.filter(id__in=hotel_ids, is_available=True).values_list('id', 'updated_at')
+        )
+        bodies = detail_cache.detail_bodies(updated_ats)
+        # Splice the rendered bodies together instead of decoding and re-encoding them
+        body = b'{' + b','.join(
+            b'"%d":%s' % (hotel_id, _trim(bodies[hotel_id], fields)) for hotel_id in hotel_ids if hotel_id in bodies
+        ) + b'}'
+        return HttpResponse(body, content_type='application/json')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def detail_cache_stats(request):
+    """Hit/miss counters of this worker's detail cache"""
+    return Response({'pid': os.getpid(), **detail_cache.stats()})
+
+
+@require_GET
+def hotel_image_variant(request, digest, variant, extension):
+    """Serve a resized photo, rendering it on first request
+
+    A plain Django view: image requests must not go through DRF content
+    negotiation. URLs are content addressed, so responses are immutable.
+    """
+    hotel_image = HotelImage.objects.filter(content_hash=digest).first()
+    if hotel_image is None or variant not in images.VARIANTS:
+        raise Http404('Image not found')
+    try:
+        name = images.ensure_derivative(hotel_image, variant, extension)
+    except images.UNDECODABLE:
+        # Too large (or too broken) to resize: send the original rather than failing every request
+        return HttpResponseRedirect(hotel_image.image.url)
+    except OSError:
+        raise Http404('Image not found')
+    response = FileResponse(default_storage.open(name, 'rb'), content_type=images.CONTENT_TYPES[extension])
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
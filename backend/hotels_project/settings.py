@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     'hotels',
     'bookings',
     'reviews',
+    'tasks',
 ]
 
 MIDDLEWARE = [
@@ -84,6 +85,22 @@ if DATABASE_URL:
     import dj_database_url
     DATABASES['default'] = dj_database_url.parse(DATABASE_URL)
 
+# Cache - per-process memory by default; point CACHE_BACKEND/CACHE_LOCATION at
+# a file or shared backend so every worker sees the same entries
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='hotels-clone'),
+    }
+}
+# Per-process caches cannot see a logout, password change or cache invalidation handled by
+# another worker; user, session and rendered-response caching only switch on for a shared backend
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SHARED_CACHE = CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,8 +137,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
+# With a shared cache, request.user comes from it for USER_CACHE_TIMEOUT seconds (see users/backends.py).
+# ModelBackend stays listed so sessions logged in under it keep resolving.
+AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+if SHARED_CACHE:
+    AUTHENTICATION_BACKENDS.insert(0, 'users.backends.CachedModelBackend')
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=60, cast=int)
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
+    # orjson-backed when installed; identical output to the stock JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': [
+        'hotels.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
     ],
@@ -146,6 +175,9 @@ else:
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Let the SPA read pagination cursors from search responses
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'Link']
+
 # CSRF Configuration 
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:8080",
@@ -158,6 +190,11 @@ if not DEBUG:
     CSRF_TRUSTED_ORIGINS.extend(production_origins)
 
 # Session Configuration
+# With a shared cache, session reads come from it; writes still go through to the database
+SESSION_ENGINE = config(
+    'SESSION_ENGINE',
+    default='django.contrib.sessions.backends.cached_db' if SHARED_CACHE else 'django.contrib.sessions.backends.db',
+)
 SESSION_COOKIE_AGE = 86400  # 1 day
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
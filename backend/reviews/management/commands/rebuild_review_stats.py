@@ -0,0 +1,17 @@
+# backend/reviews/management/commands/rebuild_review_stats.py
+from django.core.management.base import BaseCommand
+
+from reviews.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute every hotel review aggregate and hotel rating from the review table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, action='append', dest='hotels', help='Only rebuild this hotel (repeatable)')
+
+    def handle(self, *args, **options):
+        stats_rows, hotels = rebuild(options['hotels'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {stats_rows} review stats row(s); updated rating of {hotels} hotel(s)'
+        ))
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_stats(apps, schema_editor):
+    # Existing reviews must be counted, or later deletes would drive sums negative
+    from django.db.models import Count, Q, Sum
+    Review = apps.get_model('users', 'Review')
+    HotelReviewStats = apps.get_model('reviews', 'HotelReviewStats')
+    categories = ('overall', 'cleanliness', 'staff', 'facilities', 'location', 'environment')
+    aggregates = {f'{category}_sum': Sum(f'{category}_rating') for category in categories}
+    aggregates.update({f'overall_{score}': Count('id', filter=Q(overall_rating=score)) for score in range(1, 11)})
+    rows = Review.objects.order_by().values('hotel_id').annotate(review_count=Count('id'), **aggregates)
+    HotelReviewStats.objects.bulk_create([HotelReviewStats(**row) for row in rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('hotels', '0005_alter_hotel_rating'),
+        ('users', '0004_booking_room_type_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelReviewStats',
+            fields=[
+                ('hotel', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_stats', serialize=False, to='hotels.hotel')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('overall_sum', models.PositiveIntegerField(default=0)),
+                ('cleanliness_sum', models.PositiveIntegerField(default=0)),
+                ('staff_sum', models.PositiveIntegerField(default=0)),
+                ('facilities_sum', models.PositiveIntegerField(default=0)),
+                ('location_sum', models.PositiveIntegerField(default=0)),
+                ('environment_sum', models.PositiveIntegerField(default=0)),
+                ('overall_1', models.PositiveIntegerField(default=0)),
+                ('overall_2', models.PositiveIntegerField(default=0)),
+                ('overall_3', models.PositiveIntegerField(default=0)),
+                ('overall_4', models.PositiveIntegerField(default=0)),
+                ('overall_5', models.PositiveIntegerField(default=0)),
+                ('overall_6', models.PositiveIntegerField(default=0)),
+                ('overall_7', models.PositiveIntegerField(default=0)),
+                ('overall_8', models.PositiveIntegerField(default=0)),
+                ('overall_9', models.PositiveIntegerField(default=0)),
+                ('overall_10', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,49 @@
+# backend/reviews/models.py
 from django.db import models
+from hotels.models import Hotel
 
-# Create your models here.
+CATEGORIES = ('overall', 'cleanliness', 'staff', 'facilities', 'location', 'environment')
+SCORES = range(1, 11)
+
+
+class HotelReviewStats(models.Model):
+    """Running review totals for one hotel, maintained by ``reviews.stats``.
+
+    Every category rating is required, so a single count serves them all.
+    The histogram counts reviews per overall score.
+    """
+    hotel = models.OneToOneField(Hotel, primary_key=True, related_name='review_stats', on_delete=models.CASCADE)
+    review_count = models.PositiveIntegerField(default=0)
+    
+    overall_sum = models.PositiveIntegerField(default=0)
+    cleanliness_sum = models.PositiveIntegerField(default=0)
+    staff_sum = models.PositiveIntegerField(default=0)
+    facilities_sum = models.PositiveIntegerField(default=0)
+    location_sum = models.PositiveIntegerField(default=0)
+    environment_sum = models.PositiveIntegerField(default=0)
+    
+    # Histogram of overall ratings
+    overall_1 = models.PositiveIntegerField(default=0)
+    overall_2 = models.PositiveIntegerField(default=0)
+    overall_3 = models.PositiveIntegerField(default=0)
+    overall_4 = models.PositiveIntegerField(default=0)
+    overall_5 = models.PositiveIntegerField(default=0)
+    overall_6 = models.PositiveIntegerField(default=0)
+    overall_7 = models.PositiveIntegerField(default=0)
+    overall_8 = models.PositiveIntegerField(default=0)
+    overall_9 = models.PositiveIntegerField(default=0)
+    overall_10 = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.hotel_id} ({self.review_count} reviews)"
+    
+    def average(self, category):
+        if not self.review_count:
+            return 0.0
+        return round(getattr(self, f'{category}_sum') / self.review_count, 2)
+    
+    @property
+    def histogram(self):
+        return {score: getattr(self, f'overall_{score}') for score in SCORES}
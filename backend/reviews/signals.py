@@ -0,0 +1,24 @@
+# backend/reviews/signals.py
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from hotels.models import Hotel
+from users.models import Review
+from .stats import apply_delta, invalidate_first_page, ratings_of
+
+
+@receiver(post_delete, sender=Review)
+def retract_review(sender, instance, origin=None, **kwargs):
+    # Runs inside the deletion's transaction, for single and bulk deletes alike
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if issubclass(origin_model, Hotel):
+        return  # The stats row is being deleted along with the hotel
+    apply_delta(instance.hotel_id, ratings_of(instance), -1)
+
+
+@receiver(post_save, sender=Hotel)
+def invalidate_cached_reviews(sender, instance, **kwargs):
+    # The cached first page embeds the hotel's availability check; bumped only once it is visible
+    transaction.on_commit(lambda: invalidate_first_page(instance.id))
@@ -0,0 +1,127 @@
+# backend/reviews/stats.py
+"""Incremental per-hotel review aggregates.
+
+Review writes apply a +1/-1 delta to the hotel's ``HotelReviewStats`` row
+with ``F()`` expressions, inside the same transaction as the review itself,
+and copy the new average onto ``Hotel.rating``/``total_reviews`` (refreshing
+its rank score) so listing sort orders never aggregate reviews at request time. ``rebuild_review_stats``
+recomputes everything from scratch.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from hotels.cache import invalidate, invalidate_weekend
+from hotels import ranking
+from hotels.models import Hotel
+from hotels.signals import reindex_hotels
+from .models import CATEGORIES, SCORES, HotelReviewStats
+
+RATING_PLACES = Decimal('0.01')
+FIRST_PAGE_TIMEOUT = 10 * 60
+STAT_FIELDS = ('review_count', *(f'{category}_sum' for category in CATEGORIES), *(f'overall_{score}' for score in SCORES))
+
+
+def first_page_namespace(hotel_id):
+    return f'reviews:hotel:{hotel_id}:first-page'
+
+
+def invalidate_first_page(hotel_id):
+    invalidate(first_page_namespace(hotel_id))
+
+
+def ratings_of(review):
+    return {category: getattr(review, f'{category}_rating') for category in CATEGORIES}
+
+
+def _hotel_rating(stats):
+    if not stats.review_count:
+        return Decimal('0.00')
+    return (Decimal(stats.overall_sum) / stats.review_count).quantize(RATING_PLACES)
+
+
+def apply_delta(hotel_id, ratings, sign):
+    """Add (``sign=1``) or remove (``sign=-1``) one review's ratings; call inside a transaction"""
+    changes = {f'{category}_sum': F(f'{category}_sum') + sign * value for category, value in ratings.items()}
+    changes['review_count'] = F('review_count') + sign
+    changes[f"overall_{ratings['overall']}"] = F(f"overall_{ratings['overall']}") + sign
+    if not HotelReviewStats.objects.filter(hotel_id=hotel_id).update(**changes):
+        HotelReviewStats.objects.get_or_create(hotel_id=hotel_id)
+        HotelReviewStats.objects.filter(hotel_id=hotel_id).update(**changes)
+    # The UPDATE above holds the row lock, so this read sees every earlier delta
+    stats = HotelReviewStats.objects.get(hotel_id=hotel_id)
+    hotel = Hotel.objects.only(*ranking.INPUT_FIELDS).get(id=hotel_id)
+    hotel.rating, hotel.total_reviews = _hotel_rating(stats), stats.review_count
+    # updated_at too: the review summary is part of the hotel's detail payload and ETag
+    Hotel.objects.filter(id=hotel_id).update(
+        rating=hotel.rating, total_reviews=hotel.total_reviews, rank_score=ranking.score(hotel),
+        updated_at=timezone.now(),
+    )
+    reindex_hotels([hotel_id])  # The facet index filters on rating
+    transaction.on_commit(invalidate_weekend)
+    transaction.on_commit(lambda: invalidate_first_page(hotel_id))
+    return stats
+
+
+def summary(stats):
+    """Category averages and overall histogram for API payloads"""
+    if stats is None:
+        stats = HotelReviewStats()
+    return {
+        'total_reviews': stats.review_count,
+        'averages': {category: stats.average(category) for category in CATEGORIES},
+        'histogram': {str(score): count for score, count in stats.histogram.items()},
+    }
+
+
+def rebuild(hotel_ids=None):
+    """Recompute stats rows and hotel ratings from the review table in bulk"""
+    from users.models import Review
+
+    reviews = Review.objects.all()
+    hotels = Hotel.objects.all()
+    if hotel_ids is not None:
+        reviews = reviews.filter(hotel_id__in=hotel_ids)
+        hotels = hotels.filter(id__in=hotel_ids)
+    aggregates = {f'{category}_sum': Sum(f'{category}_rating') for category in CATEGORIES}
+    aggregates.update({f'overall_{score}': Count('id', filter=Q(overall_rating=score)) for score in SCORES})
+    rows = reviews.order_by().values('hotel_id').annotate(review_count=Count('id'), **aggregates)
+    
+    fresh = [HotelReviewStats(**row) for row in rows]
+    by_hotel = {stats.hotel_id: stats for stats in fresh}
+    with transaction.atomic():
+        existing = HotelReviewStats.objects.all()
+        if hotel_ids is not None:
+            existing = existing.filter(hotel_id__in=hotel_ids)
+        before = {row[0]: row[1:] for row in existing.values_list('hotel_id', *STAT_FIELDS)}
+        touched = before.keys() | by_hotel.keys()
+        existing.delete()
+        HotelReviewStats.objects.bulk_create(fresh, batch_size=500)
+        
+        changed = []
+        today, policy = timezone.localdate(), ranking.weights()
+        for hotel in hotels.only('id', *ranking.INPUT_FIELDS).order_by('id').iterator():
+            stats = by_hotel.get(hotel.id, HotelReviewStats())
+            rating = _hotel_rating(stats)
+            if (hotel.rating, hotel.total_reviews) != (rating, stats.review_count):
+                hotel.rating, hotel.total_reviews = rating, stats.review_count
+                hotel.rank_score = ranking.score(hotel, today, policy)
+                changed.append(hotel)
+        Hotel.objects.bulk_update(changed, ['rating', 'total_reviews', 'rank_score'], batch_size=500)
+        # Only hotels whose detail payload actually changed get a new updated_at (and ETag)
+        modified = sorted({hotel.id for hotel in changed} | {
+            hotel_id for hotel_id in touched
+            if before.get(hotel_id) != (
+                tuple(getattr(by_hotel[hotel_id], field) for field in STAT_FIELDS) if hotel_id in by_hotel else None
+            )
+        })
+        now = timezone.now()
+        for start in range(0, len(modified), 500):
+            Hotel.objects.filter(id__in=modified[start:start + 500]).update(updated_at=now)
+        reindex_hotels(hotel.id for hotel in changed)
+        transaction.on_commit(invalidate_weekend)
+        for hotel_id in touched | {hotel.id for hotel in changed}:
+            transaction.on_commit(lambda hotel_id=hotel_id: invalidate_first_page(hotel_id))
+    return len(fresh), len(changed)
@@ -0,0 +1,10 @@
+# backend/reviews/tasks.py
+"""Background tasks for reviews, run by the ``run_tasks`` worker pool."""
+from tasks.queue import task
+
+from .stats import rebuild
+
+
+@task('reviews.rebuild_review_stats')
+def rebuild_review_stats(hotel_ids=None):
+    rebuild(hotel_ids)
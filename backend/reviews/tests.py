@@ -1,3 +1,191 @@
-from django.test import TestCase
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache as django_cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from hotels import facets
+from hotels.models import Hotel
+from hotels.pagination import encode_cursor
+from hotels.tests import make_hotel
+from users.models import Review, User
+from .models import HotelReviewStats
+
+
+def make_user(email):
+    return User.objects.create_user(email, None, country='Turkey', city='Istanbul')
+
+
+def make_review(hotel, user, overall, **ratings):
+    fields = {f'{category}_rating': overall for category in ('cleanliness', 'staff', 'facilities', 'location', 'environment')}
+    fields.update(ratings)
+    return Review.objects.create(hotel=hotel, user=user, overall_rating=overall, title='Nice', comment='Good stay', **fields)
+
+
+class ReviewStatsTests(TestCase):
+    def setUp(self):
+        self.hotel = make_hotel(rating=Decimal('0.00'))
+        self.users = [make_user(f'guest{i}@example.com') for i in range(3)]
+
+    def index_rating(self):
+        return facets.index._rows[facets.index._slots[self.hotel.id]].rating
+
+    def test_facet_index_follows_review_ratings(self):
+        # Ratings are written with update(), which sends no signals
+        facets.index.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            review = make_review(self.hotel, self.users[0], 9)
+        self.assertEqual(self.index_rating(), 9.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            review.delete()
+        self.assertEqual(self.index_rating(), 0.0)
+        Hotel.objects.filter(id=self.hotel.id).update(rating=Decimal('5.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_review_stats', stdout=StringIO())
+        self.assertEqual(self.index_rating(), 0.0)
+
+    def stats(self):
+        return HotelReviewStats.objects.get(hotel=self.hotel)
+
+    def test_writes_update_aggregates_and_hotel_rating(self):
+        make_review(self.hotel, self.users[0], 10, staff_rating=6)
+        review = make_review(self.hotel, self.users[1], 7, staff_rating=8)
+        self.hotel.refresh_from_db()
+        self.assertEqual((self.hotel.rating, self.hotel.total_reviews), (Decimal('8.50'), 2))
+        self.assertEqual(self.stats().average('staff'), 7.0)
+        self.assertEqual(self.stats().histogram[10], 1)
+        
+        review.overall_rating = 10
+        review.save()
+        self.hotel.refresh_from_db()
+        self.assertEqual(self.hotel.rating, Decimal('10.00'))
+        self.assertEqual((self.stats().histogram[7], self.stats().histogram[10]), (0, 2))
+        
+        review.delete()
+        self.hotel.refresh_from_db()
+        self.assertEqual((self.hotel.rating, self.hotel.total_reviews), (Decimal('10.00'), 1))
+        self.assertEqual(self.stats().staff_sum, 6)
+
+    def test_detail_reads_precomputed_summary(self):
+        make_review(self.hotel, self.users[0], 9, location_rating=5)
+        # The ETag lookup plus hotel, amenities and images
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('hotel_detail', args=[self.hotel.id]))
+        summary = response.json()['review_summary']
+        self.assertEqual(summary['averages']['location'], 5.0)
+        self.assertEqual(summary['histogram']['9'], 1)
+
+    def test_review_writes_change_the_detail_etag(self):
+        url = reverse('hotel_detail', args=[self.hotel.id])
+        before = self.client.get(url)['ETag']
+        make_review(self.hotel, self.users[0], 9)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=before).status_code, 200)
+
+    def test_rebuild_only_touches_hotels_whose_summary_changed(self):
+        make_review(self.hotel, self.users[0], 9)
+        other = make_hotel(name='Unreviewed', rating=Decimal('0.00'))
+        stamps = dict(Hotel.objects.values_list('id', 'updated_at'))
+        call_command('rebuild_review_stats', stdout=StringIO())
+        self.assertEqual(dict(Hotel.objects.values_list('id', 'updated_at')), stamps)
+        
+        HotelReviewStats.objects.filter(hotel=self.hotel).update(staff_sum=1)
+        call_command('rebuild_review_stats', stdout=StringIO())
+        self.assertGreater(Hotel.objects.get(id=self.hotel.id).updated_at, stamps[self.hotel.id])
+        self.assertEqual(Hotel.objects.get(id=other.id).updated_at, stamps[other.id])
+
+    def test_rebuild_matches_incremental_stats(self):
+        for user, overall in zip(self.users, (4, 8, 9)):
+            make_review(self.hotel, user, overall)
+        other = make_hotel(name='Unreviewed', total_reviews=12)
+        incremental = self.stats()
+        HotelReviewStats.objects.update(overall_sum=0, review_count=0)
+        Hotel.objects.filter(id=self.hotel.id).update(rating=0)
+        
+        call_command('rebuild_review_stats', stdout=StringIO())
+        rebuilt = self.stats()
+        self.assertEqual(rebuilt.overall_sum, incremental.overall_sum)
+        self.assertEqual(rebuilt.histogram, incremental.histogram)
+        self.hotel.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.hotel.rating, Decimal('7.00'))
+        self.assertEqual((other.rating, other.total_reviews), (Decimal('0.00'), 0))
+
+
+class CreateReviewTests(TestCase):
+    def setUp(self):
+        self.hotel = make_hotel()
+        self.client.force_login(make_user('guest@example.com'))
+        self.payload = {
+            'hotel_id': self.hotel.id, 'title': 'Great', 'comment': 'Loved it',
+            **{f'{category}_rating': 9 for category in ('overall', 'cleanliness', 'staff', 'facilities', 'location', 'environment')},
+        }
+
+    def post(self, **overrides):
+        return self.client.post(reverse('create_review'), {**self.payload, **overrides}, content_type='application/json')
+
+    def test_create_review_and_list(self):
+        self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(self.post().status_code, 409)
+        data = self.client.get(reverse('hotel_reviews', args=[self.hotel.id])).json()
+        self.assertEqual(data['summary']['total_reviews'], 1)
+        self.assertEqual(data['reviews'][0]['user'], 'guest')
+
+    def test_rejects_out_of_range_ratings(self):
+        self.assertEqual(self.post(staff_rating=11).status_code, 400)
+        self.assertFalse(HotelReviewStats.objects.exists())
+
+
+class ReviewListingTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.hotel = make_hotel()
+        for i in range(25):
+            make_review(self.hotel, make_user(f'guest{i}@example.com'), 1 + i % 10)
+        # Identical timestamps must still page without gaps or repeats
+        Review.objects.filter(id__lte=Review.objects.order_by('id')[10].id).update(created_at='2030-01-01T00:00:00Z')
+
+    def get(self, **params):
+        return self.client.get(reverse('hotel_reviews', args=[self.hotel.id]), params)
+
+    def test_keyset_pages_cover_every_review_once(self):
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(2):
+                data = self.get(limit=7, **({'cursor': cursor} if cursor else {})).json()
+            seen.extend(review['id'] for review in data['reviews'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        expected = list(Review.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.get(cursor='garbage').status_code, 400)
+
+    def test_tampered_cursors_are_rejected(self):
+        for values in (['abc', 'x'], [None, None], [{'a': 1}, 1], [float('inf'), 1], ['2030-01-01T00:00:00', 1.5]):
+            with self.subTest(values=values):
+                self.assertEqual(self.get(cursor=encode_cursor(values)).status_code, 400)
+        self.assertEqual(self.get(cursor=encode_cursor(['2030-01-01T00:00:00+00:00', 10 ** 6])).status_code, 200)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_first_page_is_cached_until_next_review(self):
+        first = self.get().json()
+        self.assertEqual(len(first['reviews']), 20)
+        self.assertEqual(first['summary']['total_reviews'], 25)
+        with self.assertNumQueries(0):
+            self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            make_review(self.hotel, make_user('late@example.com'), 10)
+        fresh = self.get().json()
+        self.assertEqual(fresh['summary']['total_reviews'], 26)
+        self.assertEqual(fresh['summary']['histogram']['10'], 3)
+
+    def test_unknown_or_hidden_hotel_is_404(self):
+        self.get()
+        Hotel.objects.filter(id=self.hotel.id).update(is_available=False)
+        self.hotel.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hotel.save()
+        self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.client.get(reverse('hotel_reviews', args=[0])).status_code, 404)
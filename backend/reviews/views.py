@@ -1,16 +1,78 @@
 # backend/reviews/views.py
+from django.db import IntegrityError
+from django.http import HttpResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 
+from hotels import cache
+from hotels.models import Hotel
+from hotels.pagination import InvalidPage, paginate, parse_limit
+from users.models import Review
+from .models import CATEGORIES, HotelReviewStats
+from .stats import FIRST_PAGE_TIMEOUT, first_page_namespace, ratings_of, summary
+
+# Newest first; id breaks ties between reviews saved in the same instant
+REVIEW_ORDERING = ['-created_at', '-id']
+REVIEW_PAGE_SIZE = 20
+REVIEW_MAX_PAGE_SIZE = 100
+
+
+def _author(user):
+    # Usernames are e-mail addresses; never expose them
+    return user.get_full_name() or user.username.split('@')[0]
+
+
+def _review_data(review):
+    return {
+        'id': review.id,
+        'hotel_id': review.hotel_id,
+        'user': _author(review.user),
+        'ratings': ratings_of(review),
+        'title': review.title,
+        'comment': review.comment,
+        'created_at': review.created_at.isoformat(),
+    }
+
+
+def _review_page(hotel_id, cursor, limit):
+    """One page of reviews plus the rating breakdown; raises Hotel.DoesNotExist"""
+    stats = HotelReviewStats.objects.filter(hotel_id=hotel_id, hotel__is_available=True).first()
+    if stats is None and not Hotel.objects.filter(id=hotel_id, is_available=True).exists():
+        raise Hotel.DoesNotExist
+    reviews = Review.objects.filter(hotel_id=hotel_id).select_related('user')
+    page, next_cursor = paginate(reviews, REVIEW_ORDERING, cursor, limit)
+    return {
+        'summary': summary(stats),
+        'reviews': [_review_data(review) for review in page],
+        'next_cursor': next_cursor,
+    }
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def hotel_reviews(request, hotel_id):
-    """Get all reviews for a specific hotel"""
+    """Get a keyset-paginated page of a hotel's reviews with its rating breakdown
+
+    The default first page is what almost every visitor sees, so it is cached
+    until the hotel's next review write.
+    """
     try:
-        # For now, return empty list - we'll implement this later
-        return Response([])
+        cursor = request.GET.get('cursor') or None
+        limit = parse_limit(request.GET.get('limit'), REVIEW_PAGE_SIZE, REVIEW_MAX_PAGE_SIZE)
+        if cursor is None and limit == REVIEW_PAGE_SIZE:
+            body = cache.cached_bytes(
+                first_page_namespace(hotel_id),
+                lambda: cache.render_json(_review_page(hotel_id, None, limit)),
+                FIRST_PAGE_TIMEOUT,
+            )
+            return HttpResponse(body, content_type='application/json')
+        return Response(_review_page(hotel_id, cursor, limit))
+    except Hotel.DoesNotExist:
+        return Response({'error': 'Otel bulunamadı'}, status=status.HTTP_404_NOT_FOUND)
+    except InvalidPage as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response(
             {'error': 'Yorumlar yüklenirken hata oluştu'},
@@ -20,44 +82,46 @@ def hotel_reviews(request, hotel_id):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def create_review(request):
-    """Create a new review"""
+    """Create a new review; the hotel's aggregates are updated in the same transaction"""
     try:
-        # For now, just return success - we'll implement this later
-        return Response({'message': 'Yorum oluşturuldu'}, status=status.HTTP_201_CREATED)
+        if not request.user.is_authenticated:
+            return Response({'error': 'Yorum yapmak için giriş yapmalısınız'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        data = request.data
+        ratings = {}
+        for category in CATEGORIES:
+            try:
+                value = int(data.get(f'{category}_rating'))
+            except (TypeError, ValueError):
+                value = None
+            if value is None or not 1 <= value <= 10:
+                return Response(
+                    {'error': f'{category}_rating 1 ile 10 arasında olmalıdır'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            ratings[f'{category}_rating'] = value
+        title = (data.get('title') or '').strip()
+        comment = (data.get('comment') or '').strip()
+        if not title or not comment:
+            return Response({'error': 'Başlık ve yorum gereklidir'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            hotel = Hotel.objects.filter(id=int(data.get('hotel_id')), is_available=True).first()
+        except (TypeError, ValueError):
+            hotel = None
+        if hotel is None:
+            return Response({'error': 'Otel bulunamadı'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            review = Review.objects.create(
+                hotel=hotel, user=request.user, title=title[:200], comment=comment, **ratings
+            )
+        except IntegrityError:
+            return Response({'error': 'Bu otel için zaten yorum yaptınız'}, status=status.HTTP_409_CONFLICT)
+        
+        return Response(_review_data(review), status=status.HTTP_201_CREATED)
     except Exception as e:
         return Response(
             {'error': 'Yorum oluşturulurken hata oluştu'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
-
-# backend/bookings/views.py
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
-from rest_framework.response import Response
-from rest_framework import status
-
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def create_booking(request):
-    """Create a new booking"""
-    try:
-        # For now, just return success - we'll implement this later
-        return Response({'message': 'Rezervasyon oluşturuldu'}, status=status.HTTP_201_CREATED)
-    except Exception as e:
-        return Response(
-            {'error': 'Rezervasyon oluşturulurken hata oluştu'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
-
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def user_bookings(request):
-    """Get user's bookings"""
-    try:
-        # For now, return empty list - we'll implement this later
-        return Response([])
-    except Exception as e:
-        return Response(
-            {'error': 'Rezervasyonlar yüklenirken hata oluştu'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
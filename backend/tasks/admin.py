@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'priority', 'attempts', 'max_attempts', 'run_after', 'duration_ms', 'created_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['worker', 'last_error', 'started_at', 'finished_at', 'duration_ms', 'created_at']
+    actions = ['retry']
+
+    @admin.action(description='Queue selected tasks again')
+    def retry(self, request, queryset):
+        count = queryset.exclude(status=Task.RUNNING).update(
+            status=Task.QUEUED, run_after=timezone.now(), attempts=0, last_error='',
+        )
+        self.message_user(request, f'{count} task(s) queued again')
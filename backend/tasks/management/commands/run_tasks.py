@@ -0,0 +1,84 @@
+# backend/tasks/management/commands/run_tasks.py
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from tasks import queue
+
+
+def work(stop, poll_interval):
+    """One worker process: claim and run tasks until ``stop`` is set"""
+    # The parent's signal handlers do not belong here; the parent stops us through ``stop``
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    worker = queue.worker_name()
+    while not stop.is_set():
+        close_old_connections()
+        claimed = queue.claim(worker)
+        if claimed is None:
+            stop.wait(poll_interval)
+            continue
+        queue.execute(claimed)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=getattr(settings, 'TASKS_PROCESSES', 2),
+            help='Worker processes to keep running',
+        )
+        parser.add_argument(
+            '--poll', type=float, default=getattr(settings, 'TASKS_POLL_INTERVAL', 1.0),
+            help='Seconds an idle worker waits before looking for tasks again',
+        )
+        parser.add_argument('--once', action='store_true', help='Run every due task in this process, then exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            requeued, failed = queue.requeue_stale()
+            ran = queue.run_pending()
+            self.stdout.write(self.style.SUCCESS(
+                f'Ran {ran} task(s); requeued {requeued} and failed {failed} abandoned task(s)'
+            ))
+            return
+        self.supervise(max(1, options['processes']), options['poll'])
+
+    def supervise(self, size, poll_interval):
+        # Forked children must open their own database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        # Only flag shutdown here: setting ``stop`` inside a handler can deadlock on its own lock
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+        pool = [None] * size
+        self.stdout.write(f'Starting {size} task worker(s)')
+        while not stopping:
+            for slot, process in enumerate(pool):
+                if process is None or not process.is_alive():
+                    if process is not None:
+                        self.stderr.write(f'Worker {process.pid} exited with {process.exitcode}; restarting')
+                    pool[slot] = context.Process(target=work, args=(stop, poll_interval), daemon=True)
+                    pool[slot].start()
+            close_old_connections()
+            requeued, failed = queue.requeue_stale()
+            if requeued or failed:
+                self.stderr.write(f'Requeued {requeued} and failed {failed} abandoned task(s)')
+            connections.close_all()
+            time.sleep(poll_interval)
+        # Let running tasks finish; the workers exit at their next check of ``stop``
+        stop.set()
+        deadline = time.monotonic() + getattr(settings, 'TASKS_SHUTDOWN_TIMEOUT', 30)
+        for process in pool:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        self.stdout.write('Task workers stopped')
@@ -0,0 +1,30 @@
+# backend/tasks/management/commands/task_stats.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from tasks import queue
+
+
+class Command(BaseCommand):
+    help = 'Report background task queue metrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print the raw metrics as JSON')
+        parser.add_argument('--prune', type=int, metavar='DAYS', help='First delete tasks finished more than DAYS ago')
+
+    def handle(self, *args, **options):
+        if options['prune'] is not None:
+            self.stdout.write(f'Pruned {queue.prune(options["prune"])} finished task(s)')
+        metrics = queue.stats()
+        if options['json']:
+            self.stdout.write(json.dumps(metrics, indent=2))
+            return
+        counts = ', '.join(f'{status} {count}' for status, count in metrics['status'].items())
+        self.stdout.write(f'Tasks: {counts}; lag {metrics["lag_seconds"]:.1f}s')
+        for row in metrics['tasks']:
+            timing = f'avg {row["avg_ms"]}ms, max {row["max_ms"]}ms' if row['avg_ms'] is not None else 'no runs yet'
+            self.stdout.write(
+                f'  {row["name"]}: {row["queued"]} queued, {row["running"]} running, {row["done"]} done, '
+                f'{row["failed"]} failed, {row["retried"]} retried; {timing}'
+            )
@@ -0,0 +1,182 @@
+# backend/tasks/queue.py
+"""A small database-backed task queue.
+
+Slow work (image processing, aggregate rebuilds) is registered with
+``@task`` and queued with ``enqueue``; the ``run_tasks`` command runs it in
+worker processes. No broker is needed: a queued task is a ``Task`` row,
+written in the caller's transaction, so it is only visible to workers once
+the change that needs it has committed.
+
+Workers claim a row with a conditional ``UPDATE`` (queued -> running), so two
+workers never run the same task even on SQLite, which has no ``SKIP
+LOCKED``. Failed attempts are retried with exponential backoff until
+``max_attempts``; rows a dead worker left running are requeued after
+``TASKS_VISIBILITY_TIMEOUT`` seconds.
+"""
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min, Q
+from django.utils import timezone
+
+from .models import Task
+
+REGISTRY = {}
+CLAIM_ORDERING = ['-priority', 'run_after', 'id']
+# Due tasks a worker considers per claim; losing a race moves on to the next one
+CLAIM_BATCH = 10
+ERROR_LIMIT = 4000
+
+
+class UnknownTask(LookupError):
+    pass
+
+
+def task(name, priority=0, max_attempts=3):
+    """Register the decorated function as task ``name`` with default options"""
+    def register(func):
+        if name in REGISTRY:
+            raise ValueError(f'Task {name} is already registered')
+        REGISTRY[name] = func
+        func.task_name = name
+        func.task_options = {'priority': priority, 'max_attempts': max_attempts}
+        return func
+    return register
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after ``attempts`` failures"""
+    base = getattr(settings, 'TASKS_RETRY_DELAY', 30)
+    return base * 2 ** (attempts - 1)
+
+
+def enqueue(name, args=(), kwargs=None, priority=None, delay=None):
+    """Queue task ``name`` (or a registered function); ``delay`` is in seconds
+
+    Arguments must be JSON serializable: pass ids, not model instances.
+    """
+    name = getattr(name, 'task_name', name)
+    if name not in REGISTRY:
+        raise UnknownTask(name)
+    options = REGISTRY[name].task_options
+    queued = Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=options['priority'] if priority is None else priority,
+        max_attempts=options['max_attempts'],
+        run_after=timezone.now() + timedelta(seconds=delay or 0),
+    )
+    if getattr(settings, 'TASKS_EAGER', False):
+        # Development without a worker: run once the caller's transaction commits
+        transaction.on_commit(lambda: run_pending(worker='eager'))
+    return queued
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker):
+    """Mark the most urgent due task as running and return it, or None"""
+    now = timezone.now()
+    due = Task.objects.filter(status=Task.QUEUED, run_after__lte=now).order_by(*CLAIM_ORDERING)
+    for task_id in due.values_list('id', flat=True)[:CLAIM_BATCH]:
+        claimed = Task.objects.filter(id=task_id, status=Task.QUEUED).update(
+            status=Task.RUNNING, worker=worker, started_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(id=task_id)
+    return None
+
+
+def execute(claimed):
+    """Run a claimed task and record the outcome; returns True on success"""
+    started = time.perf_counter()
+    try:
+        func = REGISTRY.get(claimed.name)
+        if func is None:
+            raise UnknownTask(claimed.name)
+        func(*claimed.args, **claimed.kwargs)
+    except Exception:
+        error = traceback.format_exc()[-ERROR_LIMIT:]
+        succeeded = False
+    else:
+        error = ''
+        succeeded = True
+    duration_ms = round((time.perf_counter() - started) * 1000)
+    now = timezone.now()
+    if succeeded:
+        update = {'status': Task.DONE, 'finished_at': now}
+    elif claimed.attempts < claimed.max_attempts:
+        update = {'status': Task.QUEUED, 'run_after': now + timedelta(seconds=retry_delay(claimed.attempts))}
+    else:
+        update = {'status': Task.FAILED, 'finished_at': now}
+    # Only the worker still holding the claim may record it; a requeued task belongs to someone else
+    Task.objects.filter(id=claimed.id, status=Task.RUNNING, worker=claimed.worker).update(
+        last_error=error, duration_ms=duration_ms, **update,
+    )
+    return succeeded
+
+
+def run_pending(worker=None, limit=None):
+    """Run due tasks in this process until none are left; returns how many ran"""
+    worker = worker or worker_name()
+    ran = 0
+    while limit is None or ran < limit:
+        claimed = claim(worker)
+        if claimed is None:
+            break
+        execute(claimed)
+        ran += 1
+    return ran
+
+
+def requeue_stale(timeout=None):
+    """Give up on running tasks whose worker stopped responding; returns (requeued, failed)"""
+    timeout = timeout if timeout is not None else getattr(settings, 'TASKS_VISIBILITY_TIMEOUT', 600)
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.RUNNING, started_at__lt=now - timedelta(seconds=timeout))
+    lost = 'Worker stopped before finishing the task'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=now, last_error=lost,
+    )
+    requeued = stale.update(status=Task.QUEUED, run_after=now, last_error=lost)
+    return requeued, failed
+
+
+def stats():
+    """Queue metrics: counts per status, and per task name its outcomes and timings"""
+    now = timezone.now()
+    by_status = dict(Task.objects.values_list('status').annotate(count=Count('id')).order_by())
+    oldest_due = Task.objects.filter(status=Task.QUEUED, run_after__lte=now).aggregate(oldest=Min('run_after'))['oldest']
+    per_task = Task.objects.values('name').annotate(
+        queued=Count('id', filter=Q(status=Task.QUEUED)),
+        running=Count('id', filter=Q(status=Task.RUNNING)),
+        done=Count('id', filter=Q(status=Task.DONE)),
+        failed=Count('id', filter=Q(status=Task.FAILED)),
+        retried=Count('id', filter=Q(attempts__gt=1)),
+        avg_ms=Avg('duration_ms', filter=Q(status=Task.DONE)),
+        max_ms=Max('duration_ms', filter=Q(status=Task.DONE)),
+    ).order_by('name')
+    return {
+        'status': {status: by_status.get(status, 0) for status, _ in Task.STATUS_CHOICES},
+        # Seconds the most overdue task has waited: the worker pool is falling behind when this grows
+        'lag_seconds': (now - oldest_due).total_seconds() if oldest_due else 0.0,
+        'tasks': [
+            {**row, 'avg_ms': round(row['avg_ms'], 1) if row['avg_ms'] is not None else None}
+            for row in per_task
+        ],
+    }
+
+
+def prune(days):
+    """Delete finished tasks older than ``days``; returns how many were removed"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(status__in=[Task.DONE, Task.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
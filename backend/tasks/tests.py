@@ -0,0 +1,95 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Task
+
+calls = []
+
+
+@queue.task('tests.record', priority=1)
+def record(value):
+    calls.append(value)
+
+
+@queue.task('tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_most_urgent_due_task_first(self):
+        queue.enqueue('tests.record', args=['low'], priority=0)
+        queue.enqueue(record, args=['default'])
+        queue.enqueue('tests.record', args=['urgent'], priority=9)
+        queue.enqueue('tests.record', args=['later'], priority=9, delay=60)
+        self.assertEqual(queue.run_pending(), 3)
+        self.assertEqual(calls, ['urgent', 'default', 'low'])
+        self.assertEqual(Task.objects.filter(status=Task.QUEUED).count(), 1)
+
+    def test_claim_is_exclusive(self):
+        queue.enqueue('tests.record', args=[1])
+        claimed = queue.claim('worker-a')
+        self.assertEqual((claimed.status, claimed.attempts, claimed.worker), (Task.RUNNING, 1, 'worker-a'))
+        self.assertIsNone(queue.claim('worker-b'))
+
+    @override_settings(TASKS_RETRY_DELAY=10)
+    def test_failures_back_off_then_give_up(self):
+        failing = queue.enqueue('tests.explode')
+        self.assertEqual(queue.run_pending(), 1)
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), (Task.QUEUED, 1))
+        self.assertIn('RuntimeError: boom', failing.last_error)
+        self.assertGreater(failing.run_after, timezone.now() + timedelta(seconds=9))
+
+        Task.objects.filter(id=failing.id).update(run_after=timezone.now())
+        queue.run_pending()
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), (Task.FAILED, 2))
+
+    def test_abandoned_tasks_are_requeued(self):
+        queue.enqueue('tests.record', args=['again'])
+        queue.enqueue('tests.explode')
+        Task.objects.update(
+            status=Task.RUNNING, attempts=1, started_at=timezone.now() - timedelta(hours=1), worker='gone',
+        )
+        Task.objects.filter(name='tests.explode').update(attempts=2)
+        self.assertEqual(queue.requeue_stale(timeout=60), (1, 1))
+        queue.run_pending()
+        self.assertEqual(calls, ['again'])
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(queue.UnknownTask):
+            queue.enqueue('tests.missing')
+
+    def test_stats_and_commands(self):
+        queue.enqueue('tests.record', args=[1])
+        queue.enqueue('tests.explode')
+        out = StringIO()
+        call_command('run_tasks', once=True, stdout=out)
+        self.assertIn('Ran 2 task(s)', out.getvalue())
+        metrics = queue.stats()
+        self.assertEqual(metrics['status'], {'queued': 1, 'running': 0, 'done': 1, 'failed': 0})
+        by_name = {row['name']: row for row in metrics['tasks']}
+        self.assertEqual(by_name['tests.record']['done'], 1)
+        self.assertIsNotNone(by_name['tests.record']['avg_ms'])
+
+        Task.objects.filter(status=Task.DONE).update(finished_at=timezone.now() - timedelta(days=10))
+        out = StringIO()
+        call_command('task_stats', prune=7, stdout=out)
+        self.assertIn('Pruned 1 finished task(s)', out.getvalue())
+        self.assertIn('tests.explode: 1 queued', out.getvalue())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue.enqueue('tests.record', args=['now'])
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['now'])
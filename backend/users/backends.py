@@ -0,0 +1,47 @@
+# backend/users/backends.py
+"""Authentication backend that serves ``request.user`` from the cache.
+
+``AuthenticationMiddleware`` loads the session's user on every request that
+touches ``request.user``. ``CachedModelBackend`` keeps that row in the cache
+for ``USER_CACHE_TIMEOUT`` seconds. Django still checks the session hash
+against the cached copy, so a password change logs other sessions out as
+before. Saves, deletes and logouts drop the entry (see signals.py); the
+short TTL bounds staleness from queryset ``update()`` calls, which send no
+signals. Settings only enable it when the cache is shared between workers,
+since a per-process cache would miss writes made by other workers.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.core.cache import cache
+
+
+def _key(user_id):
+    return f'users:user:{user_id}'
+
+
+def _timeout():
+    return getattr(settings, 'USER_CACHE_TIMEOUT', 60)
+
+
+def invalidate_user(user_id):
+    cache.delete(_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            # ModelBackend follows only for older sessions; it must not hash a failed password again
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        user = cache.get(_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(_key(user_id), user, _timeout())
+        # Re-checked on hits too; an inactive user is not let back in by the cache
+        return user if self.user_can_authenticate(user) else None
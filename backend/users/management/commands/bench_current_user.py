@@ -0,0 +1,59 @@
+# backend/users/management/commands/bench_current_user.py
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hotels.management.commands._bench import rolled_back
+from users.models import User
+
+# Stock Django against the cached session engine and cached user backend
+CONFIGURATIONS = {
+    'db session + ModelBackend': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    },
+    'cached_db + CachedModelBackend': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': ['users.backends.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend'],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure requests/sec and queries per request of /api/auth/current_user/ before and after caching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        url = reverse('current_user')
+        host = next((host for host in settings.ALLOWED_HOSTS if host not in ('*', '')), 'localhost')
+        with rolled_back():
+            user = User.objects.create_user(
+                email='bench-current-user@example.com', password='unused-password-1!',
+                first_name='Bench', last_name='User', country='Turkey', city='Istanbul',
+            )
+            for name, overrides in CONFIGURATIONS.items():
+                with override_settings(**overrides):
+                    cache.clear()
+                    # A fresh client loads the middleware, and with it the session engine, under these settings
+                    client = Client(SERVER_NAME=host)
+                    client.force_login(user)
+                    client.get(url)  # Warm up
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        for _ in range(options['requests']):
+                            response = client.get(url)
+                        elapsed = time.perf_counter() - start
+                    if response.json()['user'] is None:
+                        raise CommandError(f'{name}: the benchmark client is not logged in')
+                    self.stdout.write(
+                        f'{name:32} {options["requests"] / elapsed:9.0f} req/s  '
+                        f'{len(queries) / options["requests"]:4.1f} queries/request'
+                    )
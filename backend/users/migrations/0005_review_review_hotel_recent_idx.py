@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_booking_room_type_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['hotel', '-created_at', '-id'], name='review_hotel_recent_idx'),
+        ),
+    ]
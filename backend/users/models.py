@@ -70,9 +70,8 @@ class Hotel(models.Model):
     
     def get_member_price(self):
         """Calculate member price (10% discount if not explicitly set)"""
-        if self.member_price:
-            return self.member_price
-        return self.base_price * 0.9
+        from hotels import pricing
+        return pricing.from_cents(pricing.quote_hotel(self).member)
 
 class HotelImage(models.Model):
     hotel = models.ForeignKey(Hotel, related_name='images', on_delete=models.CASCADE)
@@ -105,7 +104,7 @@ class HotelAmenity(models.Model):
         unique_together = ['hotel', 'amenity']
 
 # backend/reviews/models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from hotels.models import Hotel
 
@@ -138,9 +137,27 @@ class Review(models.Model):
     class Meta:
         unique_together = ['hotel', 'user']  # One review per user per hotel
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pages of a hotel's reviews, newest first
+            models.Index(fields=['hotel', '-created_at', '-id'], name='review_hotel_recent_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.hotel.name} ({self.overall_rating}/10)"
+    
+    def save(self, *args, **kwargs):
+        """Save and move the hotel's review aggregates in the same transaction"""
+        from reviews.stats import apply_delta, ratings_of
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Review.objects.select_for_update().filter(pk=self.pk).first()
+            super().save(*args, **kwargs)
+            if previous is not None:
+                if (previous.hotel_id, ratings_of(previous)) == (self.hotel_id, ratings_of(self)):
+                    return
+                apply_delta(previous.hotel_id, ratings_of(previous), -1)
+            apply_delta(self.hotel_id, ratings_of(self), 1)
 
 # backend/bookings/models.py
 from django.db import models
@@ -159,6 +176,7 @@ class Booking(models.Model):
     
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE)
+    room_type = models.ForeignKey('bookings.RoomType', related_name='bookings', on_delete=models.PROTECT, null=True, blank=True)
     
     # Booking details
     check_in = models.DateField()
@@ -173,6 +191,9 @@ class Booking(models.Model):
     # Status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     
+    # Client-supplied key that makes create retries safe
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -181,4 +202,10 @@ class Booking(models.Model):
         return f"{self.user.username} - {self.hotel.name} ({self.check_in} to {self.check_out})"
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'], name='booking_idempotency_key_uniq',
+                condition=models.Q(idempotency_key__isnull=False),
+            ),
+        ]
\ No newline at end of file
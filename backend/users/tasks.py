@@ -0,0 +1,36 @@
+# backend/users/tasks.py
+"""Background tasks for users, run by the ``run_tasks`` worker pool."""
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from tasks.queue import task
+
+from .models import User
+
+# Profile photos are shown small; anything larger only costs bandwidth
+PHOTO_SIZE = (512, 512)
+
+
+@task('users.process_photo', priority=10)
+def process_photo(user_id, name):
+    """Rotate, downscale and strip metadata (EXIF, GPS) from an uploaded profile photo"""
+    user = User.objects.filter(id=user_id).only('id', 'photo').first()
+    # Replaced or removed since it was queued: the new upload queues its own task
+    if user is None or user.photo.name != name:
+        return
+    with user.photo.open('rb') as source, Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail(PHOTO_SIZE, Image.LANCZOS)
+        buffer = io.BytesIO()
+        # Saved without ``exif=``, so no metadata survives
+        image.convert('RGB').save(buffer, 'JPEG', quality=85, optimize=True)
+    storage = user.photo.storage
+    stem = os.path.splitext(os.path.basename(name))[0]
+    processed = storage.save(f'user_photos/{stem}.jpg', ContentFile(buffer.getvalue()))
+    if User.objects.filter(id=user_id, photo=name).update(photo=processed):
+        storage.delete(name)
+    else:
+        storage.delete(processed)
@@ -1,3 +1,117 @@
-from django.test import TestCase
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from tasks.models import Task
+from tasks.queue import run_pending
+from .models import User
+
+
+def make_photo(size=(2000, 1500)):
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera Maker'
+    Image.new('RGB', size, (10, 120, 200)).save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile('me.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+class RegisterPhotoTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_photo_is_processed_by_the_task_worker(self):
+        response = self.client.post(reverse('register'), {
+            'email': 'ayse@example.com',
+            'password': 'secret123!',
+            'first_name': 'Ayşe',
+            'last_name': 'Yılmaz',
+            'country': 'Turkey',
+            'city': 'Izmir',
+            'photo': make_photo(),
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(Task.objects.values_list('name', 'status')), [('users.process_photo', Task.QUEUED)])
+        original = User.objects.get().photo.name
+
+        self.assertEqual(run_pending(), 1)
+        user = User.objects.get()
+        self.assertNotEqual(user.photo.name, original)
+        self.assertFalse(user.photo.storage.exists(original))
+        with user.photo.open('rb') as stored, Image.open(stored) as photo:
+            self.assertEqual(photo.size, (512, 384))
+            self.assertEqual(len(photo.getexif()), 0)
+
+
+CACHED_AUTH = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'AUTHENTICATION_BACKENDS': ['users.backends.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend'],
+}
+
+
+@override_settings(**CACHED_AUTH)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='ayse@example.com', password='Gizli-sifre1!', first_name='Ayşe',
+            country='Turkey', city='Istanbul',
+        )
+        self.client.force_login(self.user)
+
+    def current_user(self):
+        return self.client.get(reverse('current_user')).json()['user']
+
+    def test_warm_requests_skip_the_database(self):
+        self.current_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.current_user()['email'], 'ayse@example.com')
+
+    def test_saving_the_user_refreshes_the_cached_copy(self):
+        self.current_user()
+        self.user.first_name = 'Zeynep'
+        self.user.save()
+        self.assertEqual(self.current_user()['first_name'], 'Zeynep')
+
+    def test_password_change_still_ends_other_sessions(self):
+        self.current_user()
+        self.user.set_password('Yeni-sifre2!')
+        self.user.save()
+        self.assertIsNone(self.current_user())
+
+    def test_logout_drops_the_cached_user(self):
+        self.current_user()
+        self.client.post(reverse('logout'))
+        self.assertIsNone(cache.get(f'users:user:{self.user.pk}'))
+        self.assertIsNone(self.current_user())
+
+    def test_sessions_from_the_stock_backend_still_resolve(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        self.assertEqual(self.current_user()['id'], self.user.id)
+
+    def test_password_login_and_failed_attempts(self):
+        self.client.logout()
+        url = reverse('login')
+        with patch('django.contrib.auth.backends.ModelBackend.authenticate', wraps=ModelBackend().authenticate) as checks:
+            bad = self.client.post(url, {'email': 'ayse@example.com', 'password': 'yanlis'}, content_type='application/json')
+        self.assertEqual(bad.status_code, 401)
+        self.assertEqual(checks.call_count, 1)  # Not re-checked by the ModelBackend fallback
+        good = self.client.post(url, {'email': 'ayse@example.com', 'password': 'Gizli-sifre1!'}, content_type='application/json')
+        self.assertEqual(good.status_code, 200)
+        self.assertEqual(self.current_user()['id'], self.user.id)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('bench_current_user', requests=5, stdout=out)
+        self.assertIn('0.0 queries/request', out.getvalue())
@@ -3,8 +3,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.contrib.auth import authenticate, login as django_login, logout as django_logout
 from django.contrib.auth.hashers import make_password
+from tasks.queue import enqueue
 from .models import User
 import re
 
@@ -47,8 +49,10 @@ def register(request):
         if 'photo' in request.FILES:
             user.photo = request.FILES['photo']
             user.save()
+            # Resizing and metadata stripping run in the task worker, not in this request
+            enqueue('users.process_photo', args=[user.id, user.photo.name])
         
-        django_login(request, user)
+        django_login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
         
         return Response({
             'user': {
@@ -117,7 +121,7 @@ def login(request):
                 user.save()
             
             # Kullanıcıyı login et
-            django_login(request, user)
+            django_login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
             
             return Response({
                 'user': {
@@ -57,6 +57,12 @@ export default {
       return apiClient.get(`/hotels/${id}/`)
     },
     
+    // Get several hotels in one request (favourites, recently viewed, comparison);
+    // the response is keyed by id and leaves out unavailable hotels
+    getHotelsBatch(ids) {
+      return apiClient.get('/hotels/batch/', { params: { ids: ids.join(',') } })
+    },
+    
     // Get map data for hotels
     getMapData(view = null) {
       const params = view ? { view } : {}
@@ -1,6 +1,27 @@
 // frontend/src/store/index.js
 import { createStore } from 'vuex'
 
+// Arama sonuçları sayfa sayfa gelir; sonraki sayfa X-Next-Cursor ile istenir
+async function fetchSearchPage(params, cursor = null) {
+  const pageParams = new URLSearchParams(params)
+  if (cursor) {
+    pageParams.set('cursor', cursor)
+  }
+  const response = await fetch(`http://127.0.0.1:8000/api/hotels/search/?${pageParams}`, {
+    method: 'GET',
+    credentials: 'include',
+    headers: {
+      'Content-Type': 'application/json'
+    }
+  })
+  
+  const data = await response.json()
+  if (!response.ok) {
+    throw new Error(data.error || 'Arama sırasında hata oluştu')
+  }
+  return { hotels: data, nextCursor: response.headers.get('X-Next-Cursor') }
+}
+
 export default createStore({
   state: {
     // Auth state
@@ -11,6 +32,9 @@ export default createStore({
     // Hotels state
     weekendHotels: [],
     searchResults: [],
+    searchParams: null,
+    searchNextCursor: null,
+    loadingMore: false,
     currentHotel: null,
     
     // UI state
@@ -46,6 +70,20 @@ export default createStore({
       state.searchResults = results
     },
     
+    APPEND_SEARCH_RESULTS(state, results) {
+      state.searchResults = [...state.searchResults, ...results]
+    },
+    
+    // Ayrı bayrak: sayfa eklenirken ekranlar yüklenme durumuna düşüp içeriği gizlemesin
+    SET_LOADING_MORE(state, loadingMore) {
+      state.loadingMore = loadingMore
+    },
+    
+    SET_SEARCH_PAGE(state, { params, nextCursor }) {
+      state.searchParams = params
+      state.searchNextCursor = nextCursor
+    },
+    
     SET_CURRENT_HOTEL(state, hotel) {
       state.currentHotel = hotel
     },
@@ -251,7 +289,9 @@ export default createStore({
         const params = new URLSearchParams({
           check_in: saturday.toISOString().split('T')[0],
           check_out: sunday.toISOString().split('T')[0],
-          country: state.currentUser?.country || 'Turkey'
+          country: state.currentUser?.country || 'Turkey',
+          // Kartlar açıklamayı göstermiyor; sunucu bu sütunu hiç okumasın
+          exclude: 'description'
         })
         
         const response = await fetch(`http://127.0.0.1:8000/api/hotels/weekend/?${params}`, {
@@ -285,21 +325,16 @@ export default createStore({
           destination: searchQuery.destination,
           check_in: searchQuery.checkIn,
           check_out: searchQuery.checkOut,
-          guests: searchQuery.guests
-        })
+          guests: searchQuery.guests,
+          exclude: 'description'
+        }).toString()
         
-        const response = await fetch(`http://127.0.0.1:8000/api/hotels/search/?${params}`, {
-          method: 'GET',
-          credentials: 'include',
-          headers: {
-            'Content-Type': 'application/json'
-          }
-        })
-        
-        const data = await response.json()
-        commit('SET_SEARCH_RESULTS', data)
+        // Yalnızca ilk sayfa; devamı loadMoreHotels ile kullanıcı isteyince gelir
+        const { hotels, nextCursor } = await fetchSearchPage(params)
+        commit('SET_SEARCH_RESULTS', hotels)
+        commit('SET_SEARCH_PAGE', { params, nextCursor })
         
-        return data
+        return hotels
       } catch (error) {
         const errorMessage = error.message || 'Arama sırasında hata oluştu'
         commit('SET_ERROR', errorMessage)
@@ -309,6 +344,28 @@ export default createStore({
       }
     },
 
+    async loadMoreHotels({ commit, state }) {
+      if (!state.searchNextCursor || state.loadingMore) {
+        return []
+      }
+      try {
+        commit('SET_LOADING_MORE', true)
+        commit('CLEAR_ERROR')
+        
+        const { hotels, nextCursor } = await fetchSearchPage(state.searchParams, state.searchNextCursor)
+        commit('APPEND_SEARCH_RESULTS', hotels)
+        commit('SET_SEARCH_PAGE', { params: state.searchParams, nextCursor })
+        
+        return hotels
+      } catch (error) {
+        const errorMessage = error.message || 'Sonraki sonuçlar yüklenirken hata oluştu'
+        commit('SET_ERROR', errorMessage)
+        throw error
+      } finally {
+        commit('SET_LOADING_MORE', false)
+      }
+    },
+
     async loadHotelDetail({ commit }, hotelId) {
       try {
         commit('SET_LOADING', true)
@@ -344,6 +401,7 @@ export default createStore({
     isAuthenticated: state => state.isAuthenticated,
     weekendHotels: state => state.weekendHotels,
     searchResults: state => state.searchResults,
+    hasMoreResults: state => !!state.searchNextCursor,
     currentHotel: state => state.currentHotel,
     lastSearchQuery: state => state.lastSearchQuery,
     